@@ -87,6 +87,9 @@ setup(
             'superflore-gen-ebuilds = superflore.generators.ebuild:main',
             'superflore-gen-oe-recipes = superflore.generators.bitbake:main',
             'superflore-check-ebuilds = superflore.test_integration.gentoo:main',
+            'superflore-prefetch = superflore.prefetch:main',
+            'superflore-cache-bundle = superflore.cache_bundle:main',
+            'superflore-cache-gc = superflore.cache_gc:main',
         ]
     }
 )
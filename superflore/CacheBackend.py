@@ -0,0 +1,192 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from superflore.utils import make_dir
+from superflore.utils import warn
+
+# how often the modification time of a used entry is updated, which is how
+# the garbage collection (see cache_gc) tells the least recently used ones
+TOUCH_INTERVAL = 10 * 60
+
+
+class CacheBackend:
+    """
+    Storage of cache entries: opaque bytes, stored under a name within a
+    namespace (e.g. 'package-xml' or 'srcrev'). The entries are never
+    modified once stored, so a backend doesn't need to handle conflicting
+    writes. A backend never raises for a failed operation: a failed get is
+    a miss, and a failed put is only reported.
+    """
+    def get(self, namespace, name):
+        """Return the entry, or None"""
+        raise NotImplementedError
+
+    def put(self, namespace, name, value):
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """Entries as files in a local directory"""
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_path(self, namespace, name):
+        return os.path.join(self.directory, namespace, name[:2], name)
+
+    def get(self, namespace, name):
+        path = self.get_path(namespace, name)
+        try:
+            with open(path, 'rb') as entry_file:
+                value = entry_file.read()
+            if time.time() - os.stat(path).st_mtime > TOUCH_INTERVAL:
+                os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            warn("Failed to read cache entry '%s': %s" % (path, e))
+            return None
+
+    def put(self, namespace, name, value):
+        path = self.get_path(namespace, name)
+        tmp_path = None
+        try:
+            make_dir(os.path.dirname(path))
+            # write to a temporary file first, so that concurrent readers
+            # never see a partially written entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(value)
+                self._sync(tmp_file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            warn("Failed to write cache entry '%s': %s" % (path, e))
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _sync(self, entry_file):
+        pass
+
+
+class SharedCacheBackend(LocalCacheBackend):
+    """
+    Entries as files on a filesystem shared by several machines (e.g. NFS).
+    An entry is only published, by renaming it into place, once it is
+    completely on disk, and entries which exist already aren't written
+    again.
+    """
+    def put(self, namespace, name, value):
+        if os.path.exists(self.get_path(namespace, name)):
+            return
+        super().put(namespace, name, value)
+
+    def _sync(self, entry_file):
+        entry_file.flush()
+        os.fsync(entry_file.fileno())
+
+
+class HttpCacheBackend(CacheBackend):
+    """
+    Entries on a plain HTTP cache server, as <url>/<namespace>/<name>:
+    entries are read with GET (a 404 is a miss) and stored with PUT.
+    """
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.failures = 0
+
+    def get_url(self, namespace, name):
+        return '{0}/{1}/{2}'.format(self.url, namespace, name)
+
+    def _failed(self, what, url, e):
+        with self.lock:
+            self.failures += 1
+            if self.failures > 1:
+                return
+        # only the first failure, to not flood the output when the server
+        # is down
+        warn("Failed to {0} cache entry '{1}': {2}".format(what, url, e))
+
+    def get(self, namespace, name):
+        url = self.get_url(namespace, name)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.content
+        except requests.RequestException as e:
+            self._failed('read', url, e)
+            return None
+
+    def put(self, namespace, name, value):
+        url = self.get_url(namespace, name)
+        try:
+            self.session.put(
+                url, data=value, timeout=self.timeout).raise_for_status()
+        except requests.RequestException as e:
+            self._failed('write', url, e)
+
+
+class TieredCacheBackend(CacheBackend):
+    """
+    Entries in several backends, fastest first: a get tries each of them
+    in turn and copies a hit into the faster ones, a put goes to all.
+    """
+    def __init__(self, backends):
+        self.backends = backends
+
+    def get(self, namespace, name):
+        for i, backend in enumerate(self.backends):
+            value = backend.get(namespace, name)
+            if value is not None:
+                for faster_backend in self.backends[:i]:
+                    faster_backend.put(namespace, name, value)
+                return value
+        return None
+
+    def put(self, namespace, name, value):
+        for backend in self.backends:
+            backend.put(namespace, name, value)
+
+
+def get_cache_backend(location):
+    """
+    Return the backend for location: an http(s) URL of a cache server, or
+    the path of a shared directory.
+    """
+    if location.startswith(('http://', 'https://')):
+        return HttpCacheBackend(location)
+    return SharedCacheBackend(location)
+
+
+shared_cache = None
+
+
+def set_shared_cache(location):
+    """Share cache entries with other machines through location"""
+    global shared_cache
+    shared_cache = get_cache_backend(location) if location else None
+
+
+def get_shared_cache():
+    return shared_cache
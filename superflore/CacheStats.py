@@ -0,0 +1,99 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import Counter
+import json
+import os
+import tempfile
+import threading
+
+FIELDS = ('hits', 'misses', 'evictions', 'hit_bytes', 'miss_bytes',
+          'hit_secs', 'miss_secs')
+
+
+class CacheStats:
+    """
+    Hits, misses and evictions of named caches, with the bytes and the time
+    spent on both hits and misses, to tell how much time each cache saves:
+    every hit is assumed to save the average time of a miss.
+    """
+    def __init__(self):
+        self.stats = dict()
+        self.lock = threading.Lock()
+        self.filename = None
+
+    def _add(self, name, **values):
+        with self.lock:
+            self.stats.setdefault(name, Counter()).update(values)
+
+    def hit(self, name, secs=0.0, size=0):
+        self._add(name, hits=1, hit_secs=secs, hit_bytes=size)
+
+    def miss(self, name, secs=0.0, size=0):
+        self._add(name, misses=1, miss_secs=secs, miss_bytes=size)
+
+    def evict(self, name, count=1):
+        self._add(name, evictions=count)
+
+    def get_summary(self):
+        """Return the statistics of each cache, including the time saved"""
+        with self.lock:
+            stats = {name: Counter(counts)
+                     for name, counts in self.stats.items()}
+        summary = dict()
+        for name, counts in sorted(stats.items()):
+            lookups = counts['hits'] + counts['misses']
+            summary[name] = dict(
+                {field: counts[field] for field in FIELDS},
+                hit_rate=counts['hits'] / lookups if lookups else None,
+                saved_secs=counts['hits'] * counts['miss_secs'] /
+                counts['misses'] - counts['hit_secs']
+                if counts['misses'] else None)
+        return summary
+
+    def log(self):
+        # imported here (as in save), as superflore.utils imports
+        # rosdep_support, which uses this module
+        from superflore.utils import info
+        for name, stats in self.get_summary().items():
+            msg = '{0} cache: {1} hits, {2} misses'.format(
+                name, stats['hits'], stats['misses'])
+            if stats['hit_rate'] is not None:
+                msg += ' ({0:.0%} hits)'.format(stats['hit_rate'])
+            if stats['evictions']:
+                msg += ', {0} evictions'.format(stats['evictions'])
+            msg += ', {0:.1f}s spent on misses'.format(stats['miss_secs'])
+            if stats['saved_secs'] is not None:
+                msg += ', ~{0:.1f}s saved'.format(stats['saved_secs'])
+            info(msg)
+
+    def save(self, filename=None):
+        """Write the statistics as JSON into filename (or self.filename)"""
+        filename = filename or self.filename
+        if not filename:
+            return
+        directory = os.path.dirname(os.path.abspath(filename))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(self.get_summary(), tmp_file, indent=1,
+                          sort_keys=True)
+            os.replace(tmp_path, filename)
+        except OSError as e:
+            from superflore.utils import warn
+            warn("Failed to save cache statistics '%s': %s" % (filename, e))
+
+
+cache_stats = CacheStats()
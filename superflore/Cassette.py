@@ -0,0 +1,138 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from urllib.error import HTTPError as UrlHTTPError
+
+from git.exc import GitCommandError
+import requests
+import rosdistro
+from superflore.exceptions import NoCassetteEntry
+from superflore.fetcher import fetcher
+from superflore.utils import make_dir
+from superflore.utils import warn
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+
+class Cassette:
+    """
+    Recorded responses of network operations, one JSON file per request
+    under directory. In RECORD mode every operation is carried out and its
+    response (or definite failure, like an HTTP 404) is stored; in REPLAY
+    mode the stored responses are served without touching the network.
+    Transient failures, like timeouts, are never recorded.
+    """
+    def __init__(self, directory, mode):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError("Unknown cassette mode '{0}'".format(mode))
+        self.directory = directory
+        self.mode = mode
+
+    def get_path(self, kind, request):
+        key = hashlib.sha256(
+            '{0}\n{1}'.format(kind, request).encode()).hexdigest()
+        return os.path.join(self.directory, kind, key[:2], key + '.json')
+
+    def play(self, kind, request, callback, *args):
+        """
+        Return the response of request, calling callback(*args) to carry it
+        out unless replaying.
+        """
+        path = self.get_path(kind, request)
+        if self.mode == REPLAY:
+            try:
+                with open(path, 'r') as entry_file:
+                    entry = json.load(entry_file)
+            except FileNotFoundError:
+                raise NoCassetteEntry(
+                    "No recorded {0} response for '{1}'".format(
+                        kind, request))
+            if 'error' in entry:
+                _raise_error(entry, request)
+            body = base64.b64decode(entry['body'])
+            return body.decode('utf-8') if entry['text'] else body
+        try:
+            response = callback(*args)
+        except Exception as e:
+            entry = _get_error_entry(e)
+            if entry:
+                self._save(path, dict(entry, request=request))
+            raise
+        text = isinstance(response, str)
+        body = response.encode('utf-8') if text else response
+        self._save(path, {
+            'request': request,
+            'text': text,
+            'body': base64.b64encode(body).decode('ascii'),
+        })
+        return response
+
+    def _save(self, path, entry):
+        try:
+            make_dir(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(entry, tmp_file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            warn("Failed to record '%s': %s" % (entry['request'], e))
+
+
+def _get_error_entry(e):
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return {'error': 'http', 'status': e.response.status_code,
+                'message': str(e)}
+    if isinstance(e, UrlHTTPError):
+        return {'error': 'url', 'status': e.code, 'message': e.msg}
+    if isinstance(e, GitCommandError) and isinstance(e.status, int):
+        return {'error': 'git', 'status': e.status, 'message': e.stderr,
+                'command': e.command}
+    return None
+
+
+def _raise_error(entry, request):
+    if entry['error'] == 'http':
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.url = request
+        raise requests.HTTPError(entry['message'], response=response)
+    if entry['error'] == 'url':
+        raise UrlHTTPError(request, entry['status'], entry['message'],
+                           None, None)
+    raise GitCommandError(entry['command'], entry['status'], entry['message'])
+
+
+_load_url = rosdistro.load_url
+
+
+def _load_rosdistro_url(url, retry=2, retry_period=1, timeout=10,
+                        skip_decode=False):
+    contents = fetcher.cassette.play(
+        'rosdistro', url, _load_url, url, retry, retry_period, timeout, True)
+    return contents if skip_decode else contents.decode('utf-8')
+
+
+def set_cassette(directory, mode):
+    """
+    Record or replay all network operations: the fetcher's, and rosdistro's
+    loading of the index and distribution files (e.g. by get_distro).
+    """
+    fetcher.cassette = Cassette(directory, mode) if directory else None
+    rosdistro.load_url = _load_rosdistro_url if directory else _load_url
@@ -0,0 +1,182 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
+import sys
+import zlib
+
+from catkin_pkg.package import parse_package_string
+from rosdistro.dependency_walker import DependencyWalker
+
+DEPEND_TYPES = ('build', 'buildtool', 'build_export', 'buildtool_export',
+                'exec', 'run', 'test', 'doc')
+
+CompactPackage = namedtuple('CompactPackage', ['name', 'repository_name'])
+
+
+class CompactRepository:
+    """The release repository of a CompactDistro"""
+    __slots__ = ('name', 'url', 'version', 'tags', 'package_names')
+
+    def __init__(self, repo):
+        self.name = sys.intern(repo.name)
+        self.url = repo.url
+        self.version = repo.version
+        self.tags = {'release': repo.tags['release']} \
+            if 'release' in repo.tags else {}
+        self.package_names = tuple(
+            sys.intern(name) for name in repo.package_names)
+
+    @property
+    def release_repository(self):
+        # as rosdistro's, for distro.repositories[name].release_repository
+        return self
+
+    def get_release_tag(self, pkg_name):
+        release_tag = self.tags['release'].replace('{package}', pkg_name)
+        if self.version:
+            release_tag = release_tag.replace(
+                '{version}', self.version).replace(
+                '{upstream_version}', self.version.split('-')[0])
+        return release_tag
+
+
+class _ReleasePackages(Mapping):
+    def __init__(self, distro):
+        self.distro = distro
+
+    def __getitem__(self, pkg_name):
+        i = self.distro._pkg_ids[pkg_name]
+        return CompactPackage(
+            self.distro._names[i],
+            self.distro._repo_names[self.distro._pkg_repos[i]])
+
+    def __contains__(self, pkg_name):
+        return pkg_name in self.distro._pkg_ids
+
+    def __iter__(self):
+        return iter(self.distro._names)
+
+    def __len__(self):
+        return len(self.distro._names)
+
+
+class CompactDistro:
+    """
+    A read-only copy of the parts of a rosdistro Distribution used while
+    generating: its release packages and repositories, the dependencies of
+    each package (conditions evaluated in evaluate_condition_context) and
+    the compressed package.xml files. The names are interned and the
+    per-package data is kept in arrays, which takes a fraction of the
+    memory of the Distribution and its distribution cache. It also stands
+    in for a DependencyWalker (see get_dependency_walker).
+    """
+    def __init__(self, distro, evaluate_condition_context=None):
+        self.name = distro.name
+        self.release_platforms = distro.release_platforms
+        self.evaluate_condition_context = evaluate_condition_context
+        self.repositories = {
+            name: CompactRepository(repo.release_repository)
+            for name, repo in distro.repositories.items()
+            if repo.release_repository}
+        self._repo_names = sorted(self.repositories)
+        repo_ids = {name: i for i, name in enumerate(self._repo_names)}
+        self._names = sorted(
+            sys.intern(name) for name, pkg in distro.release_packages.items()
+            if pkg.repository_name in repo_ids)
+        self._pkg_ids = {name: i for i, name in enumerate(self._names)}
+        self._pkg_repos = array('i', (
+            repo_ids[distro.release_packages[name].repository_name]
+            for name in self._names))
+        self.release_packages = _ReleasePackages(self)
+        # the names of all the dependencies, and for each dependency type
+        # the ids of the dependencies of package i in
+        # ids[offsets[i]:offsets[i + 1]]
+        self._strings = list(self._names)
+        string_ids = dict(self._pkg_ids)
+        self._depends = {
+            depend_type: (array('i', [0]), array('i'))
+            for depend_type in DEPEND_TYPES}
+        self._package_xmls = []
+        # the type and arguments of the exceptions of the packages which can't
+        # be walked (not the exceptions: their tracebacks would keep distro)
+        self._errors = dict()
+        for i, name in enumerate(self._names):
+            try:
+                pkg_xml = distro.get_release_package_xml(name)
+            except Exception:
+                pkg_xml = None
+            self._package_xmls.append(
+                zlib.compress(pkg_xml.encode('utf-8')) if pkg_xml else None)
+            repo = self.repositories[self._repo_names[self._pkg_repos[i]]]
+            try:
+                # as DependencyWalker._get_package, without keeping the
+                # parsed package
+                assert repo.version is not None, \
+                    "Package '%s' in repository '%s' has no version set" % (
+                        name, repo.name)
+                assert 'release' in repo.tags, \
+                    "Package '%s' in repository '%s' has no 'release' tag " \
+                    "set" % (name, repo.name)
+                pkg = parse_package_string(pkg_xml)
+                if evaluate_condition_context is not None:
+                    pkg.evaluate_conditions(evaluate_condition_context)
+            except Exception as e:
+                self._errors[name] = (type(e), e.args)
+                pkg = None
+            for depend_type, (offsets, ids) in self._depends.items():
+                if pkg:
+                    for dep in sorted({
+                            dep.name for dep in
+                            getattr(pkg, depend_type + '_depends')
+                            if dep.evaluated_condition is not False}):
+                        if dep not in string_ids:
+                            string_ids[dep] = len(self._strings)
+                            self._strings.append(sys.intern(dep))
+                        ids.append(string_ids[dep])
+                offsets.append(len(ids))
+
+    def get_release_package_xml(self, pkg_name):
+        pkg_xml = self._package_xmls[self._pkg_ids[pkg_name]]
+        return zlib.decompress(pkg_xml).decode('utf-8') if pkg_xml else None
+
+    def get_depends(self, pkg_name, depend_type, ros_packages_only=False):
+        """Return the names of the dependencies, as DependencyWalker"""
+        if pkg_name not in self._pkg_ids:
+            raise KeyError("Package '%s' not found" % pkg_name)
+        if pkg_name in self._errors:
+            error_type, args = self._errors[pkg_name]
+            raise error_type(*args)
+        i = self._pkg_ids[pkg_name]
+        offsets, ids = self._depends[depend_type]
+        deps = {self._strings[j] for j in ids[offsets[i]:offsets[i + 1]]}
+        if ros_packages_only:
+            deps &= self._pkg_ids.keys()
+        return deps
+
+
+def get_dependency_walker(distro, evaluate_condition_context=None):
+    """
+    Return a DependencyWalker of distro, or distro itself if it is a
+    CompactDistro (whose conditions were evaluated when built).
+    """
+    if isinstance(distro, CompactDistro):
+        if evaluate_condition_context != distro.evaluate_condition_context:
+            raise ValueError(
+                "The dependencies of distro '%s' were evaluated in another "
+                "condition context" % distro.name)
+        return distro
+    return DependencyWalker(distro, evaluate_condition_context)
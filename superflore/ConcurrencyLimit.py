@@ -0,0 +1,81 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+
+class ConcurrencyLimit:
+    """
+    Adaptive limit of the concurrent requests to one host. Every successful
+    request raises the limit by increase / limit (i.e. by about increase per
+    round of requests), while a rate limited one multiplies it by decrease
+    and pauses all requests for retry_after (or default_pause) seconds.
+    Requests which were already in flight when the limit was lowered don't
+    lower it again, so a burst of rate limited responses only counts once.
+    """
+    def __init__(self, initial=4, minimum=1, maximum=16, increase=1.0,
+                 decrease=0.5, default_pause=1.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.lowest = self.limit
+        self.increase = increase
+        self.decrease = decrease
+        self.default_pause = default_pause
+        self.active = 0
+        self.resume_at = 0.0
+        self.last_backoff = 0.0
+        self.backoffs = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        """Wait for a free slot, and return when it was acquired"""
+        with self.cond:
+            while True:
+                pause = self.resume_at - time.monotonic()
+                if pause > 0:
+                    self.cond.wait(pause)
+                elif self.active >= int(self.limit):
+                    self.cond.wait()
+                else:
+                    break
+            self.active += 1
+            return time.monotonic()
+
+    def release(self, acquired, rate_limited=False, retry_after=None):
+        """
+        Free the slot taken at acquired, adjusting the limit depending on
+        whether the request was rate limited.
+        """
+        with self.cond:
+            self.active -= 1
+            if not rate_limited:
+                self.limit = min(
+                    self.maximum, self.limit + self.increase / self.limit)
+            else:
+                now = time.monotonic()
+                if acquired >= self.last_backoff:
+                    self.last_backoff = now
+                    self.backoffs += 1
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self.lowest = min(self.lowest, self.limit)
+                if retry_after is None:
+                    retry_after = self.default_pause
+                self.resume_at = max(self.resume_at, now + retry_after)
+            self.cond.notify_all()
+
+    def get_limit(self):
+        with self.cond:
+            return int(self.limit)
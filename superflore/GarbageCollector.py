@@ -0,0 +1,328 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from superflore.distro_snapshot import load_snapshot_distro
+from superflore.distro_snapshot import SNAPSHOT_DIR
+from superflore.PackageXmlCache import NAMESPACE as PACKAGE_XML_DIR
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.ResolutionCache import FILENAME as RESOLUTIONS_FILE
+from superflore.ResolutionCache import ResolutionCache
+from superflore.SqliteCache import SqliteCache
+from superflore.utils import get_distros_by_status
+from superflore.utils import info
+from superflore.utils import warn
+
+GIT_MIRROR_DIR = 'git-mirrors'
+NEGATIVE_CACHE_FILE = 'negative-cache.json'
+# the end-of-life distros whose entries were already dropped
+DROPPED_FILE = 'dropped-distros.json'
+LOCK_FILE = 'gc.lock'
+# entries used more recently may be in use by a concurrent run
+MIN_AGE = 60 * 60
+# temporary files older than this were left behind by a crashed run
+STALE_TMP_AGE = 24 * 60 * 60
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3,
+              'T': 1024 ** 4}
+
+
+def parse_size(size):
+    """Parse a size in bytes, like 1048576, 512K or 10G"""
+    size = size.strip().upper().rstrip('B')
+    unit = size[-1:] if size[-1:] in SIZE_UNITS else ''
+    try:
+        return int(float(size[:len(size) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError("Invalid size '{0}'".format(size))
+
+
+def format_size(size):
+    for unit in ('', 'K', 'M', 'G'):
+        if size < 1024:
+            break
+        size /= 1024.0
+    return '{0:.1f} {1}iB'.format(size, unit) if unit else \
+        '{0} bytes'.format(size)
+
+
+def _read_dropped(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, DROPPED_FILE), 'r') as dropped_file:
+            return set(json.load(dropped_file))
+    except FileNotFoundError:
+        return set()
+    except (OSError, ValueError, TypeError) as e:
+        warn("Ignoring unreadable '%s': %s" % (DROPPED_FILE, e))
+        return set()
+
+
+def _write_dropped(cache_dir, dropped):
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(sorted(dropped), tmp_file)
+        os.replace(tmp_path, os.path.join(cache_dir, DROPPED_FILE))
+    except OSError as e:
+        warn("Failed to save '%s': %s" % (DROPPED_FILE, e))
+
+
+def forget_dropped_distro(cache_dir, distro_name):
+    """
+    Have the next garbage collection drop the entries of distro_name again,
+    as a run is adding some.
+    """
+    dropped = _read_dropped(cache_dir)
+    if distro_name in dropped:
+        _write_dropped(cache_dir, dropped - {distro_name})
+
+
+def _get_size(path):
+    if not os.path.isdir(path):
+        return os.lstat(path).st_size
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+class GarbageCollector:
+    """
+    Keeps the caches under cache_dir (and the SRCREV and archive checksum
+    caches srcrev_filename and checksum_filename) within max_bytes,
+    dropping the least recently used entries, the ones unused for max_age
+    seconds, and those of end-of-life distros. The single-file caches
+    count towards max_bytes, but only lose the entries of end-of-life
+    distros. The entries of an end-of-life distro are only dropped once
+    (until forget_dropped_distro). Entries used within the last min_age
+    seconds are never removed, so that it is safe to run while other
+    processes use the caches; entries are replaced atomically, and removed
+    directories are renamed out of the way first.
+    """
+    def __init__(self, cache_dir, srcrev_filename=None, max_bytes=None,
+                 max_age=None, min_age=MIN_AGE, checksum_filename=None):
+        self.cache_dir = cache_dir
+        self.srcrev_filename = srcrev_filename
+        self.checksum_filename = checksum_filename
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.min_age = min_age
+        self.removed = 0
+        self.reclaimed = 0
+        self.now = time.time()
+
+    def run(self, eol_distros=()):
+        """
+        Collect the garbage, returning False if another process is already
+        collecting it.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, LOCK_FILE), 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            self.now = time.time()
+            dropped = _read_dropped(self.cache_dir)
+            for distro_name in eol_distros:
+                if distro_name not in dropped:
+                    self.drop_distro(distro_name)
+                    dropped.add(distro_name)
+                    _write_dropped(self.cache_dir, dropped)
+            self.evict(self.get_entries())
+        return True
+
+    def _remove(self, path, size=None):
+        size = _get_size(path) if size is None else size
+        try:
+            if os.path.isdir(path):
+                # out of the way first, in case it is removed only partially
+                tmp_path = tempfile.mkdtemp(dir=os.path.dirname(path))
+                os.replace(path, tmp_path)
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            warn("Failed to remove '%s': %s" % (path, e))
+            return
+        self.removed += 1
+        self.reclaimed += size
+
+    def _is_in_use(self, last_used):
+        return self.now - last_used < self.min_age
+
+    def get_entries(self):
+        """
+        Return the removable entries, as (last use, size, path) tuples,
+        removing stale temporary files on the way.
+        """
+        entries = []
+        for subdir, depth in ((PACKAGE_XML_DIR, 2), (GIT_MIRROR_DIR, 1),
+                              (SNAPSHOT_DIR, 1)):
+            directory = os.path.join(self.cache_dir, subdir)
+            paths = [directory]
+            for _ in range(depth):
+                paths = [os.path.join(path, name) for path in paths
+                         if os.path.isdir(path)
+                         for name in sorted(os.listdir(path))]
+            for path in paths:
+                try:
+                    last_used = os.stat(path).st_mtime
+                except FileNotFoundError:
+                    continue
+                if os.path.basename(path).startswith('tmp'):
+                    if self.now - last_used > STALE_TMP_AGE:
+                        self._remove(path)
+                    continue
+                entries.append((last_used, _get_size(path), path))
+        return sorted(entries)
+
+    def get_files_size(self):
+        """Return the size of the single-file caches"""
+        size = 0
+        for path in (os.path.join(self.cache_dir, RESOLUTIONS_FILE),
+                     os.path.join(self.cache_dir, NEGATIVE_CACHE_FILE),
+                     self.srcrev_filename, self.checksum_filename):
+            if path and os.path.isfile(path):
+                size += os.path.getsize(path)
+        return size
+
+    def evict(self, entries):
+        """Remove the expired entries, and the oldest over the budget"""
+        total = self.get_files_size() + sum(size for _, size, _ in entries)
+        for last_used, size, path in entries:
+            if self._is_in_use(last_used):
+                break
+            expired = self.max_age is not None and \
+                self.now - last_used > self.max_age
+            if expired or (self.max_bytes is not None and
+                           total > self.max_bytes):
+                self._remove(path, size)
+                total -= size
+        if self.max_bytes is not None and total > self.max_bytes:
+            warn('The caches take {0}, more than {1}, as they are in '
+                 'use or are single-file caches'.format(
+                     format_size(total), format_size(self.max_bytes)))
+
+    def _rewrite_json(self, path, transform):
+        """
+        Replace the JSON file path with transform(its data), unless that
+        returns None.
+        """
+        try:
+            size = os.path.getsize(path)
+            with open(path, 'r') as json_file:
+                data = transform(json.load(json_file))
+            if data is None:
+                return
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(data, tmp_file, sort_keys=True)
+            self.reclaimed += size - os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            warn("Failed to clean up '%s': %s" % (path, e))
+
+    def drop_distro(self, distro_name):
+        """Remove all entries of distro_name"""
+        snapshot_dir = os.path.join(self.cache_dir, SNAPSHOT_DIR)
+        try:
+            distro = load_snapshot_distro(snapshot_dir, distro_name)
+        except Exception as e:
+            warn("Failed to load the '%s' distro snapshot: %s" % (
+                distro_name, e))
+            distro = None
+        if distro:
+            # the names of its package.xml entries are only known from it
+            names = PackageXmlCache.get_names(distro)
+            package_xml_dir = os.path.join(self.cache_dir, PACKAGE_XML_DIR)
+            for name in sorted(names):
+                path = os.path.join(package_xml_dir, name[:2], name)
+                if os.path.isfile(path):
+                    self._remove(path)
+            self._remove(os.path.join(snapshot_dir, distro_name + '.pickle'))
+
+        def drop_entries(entries, keep):
+            kept = {key: entry for key, entry in entries.items()
+                    if keep(key)}
+            if len(kept) == len(entries):
+                return None
+            self.removed += len(entries) - len(kept)
+            return kept
+
+        def drop_resolutions(data):
+            entries = drop_entries(
+                data['entries'],
+                lambda key: ResolutionCache.get_distro(key) != distro_name)
+            if entries is None:
+                return None
+            data['entries'] = entries
+            return data
+        self._rewrite_json(os.path.join(self.cache_dir, RESOLUTIONS_FILE),
+                           drop_resolutions)
+        self._rewrite_json(
+            os.path.join(self.cache_dir, NEGATIVE_CACHE_FILE),
+            lambda data: drop_entries(
+                data, lambda key: not key.startswith(distro_name + '/')))
+        for filename in (self.srcrev_filename, self.checksum_filename):
+            if not filename or not os.path.isfile(filename):
+                continue
+            size = os.path.getsize(filename)
+            with SqliteCache(filename) as cache:
+                # the SRC_URIs are those of the release tags of the distro
+                src_uris = [src_uri for src_uri in cache
+                            if '/release/{0}/'.format(distro_name) in src_uri]
+                if not src_uris:
+                    continue
+                for src_uri in src_uris:
+                    del cache[src_uri]
+                self.removed += len(src_uris)
+                cache.vacuum()
+            self.reclaimed += size - os.path.getsize(filename)
+
+
+def collect_garbage(cache_dir, srcrev_filename=None, max_bytes=None,
+                    max_age=None, drop_eol=True, checksum_filename=None):
+    """
+    Run a GarbageCollector, also dropping the entries of the end-of-life
+    distros if drop_eol, and report the reclaimed space.
+    """
+    eol_distros = []
+    try:
+        if drop_eol:
+            eol_distros = get_distros_by_status('end-of-life')
+    except Exception as e:
+        warn('Failed to look up the end-of-life distros: {0}'.format(e))
+    collector = GarbageCollector(cache_dir, srcrev_filename, max_bytes,
+                                 max_age, checksum_filename=checksum_filename)
+    if not collector.run(eol_distros):
+        info("Skipped collecting garbage in '{0}', as another process is "
+             "doing it".format(cache_dir))
+        return None
+    info("Reclaimed {0} in '{1}' ({2} entries removed)".format(
+        format_size(collector.reclaimed), cache_dir, collector.removed))
+    return collector
@@ -0,0 +1,90 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+from subprocess import DEVNULL, PIPE, run
+import threading
+import time
+
+from git.cmd import Git
+from git.exc import GitCommandError
+from superflore.CacheBackend import TOUCH_INTERVAL
+from superflore.utils import info
+from superflore.utils import make_dir
+from superflore.utils import warn
+
+
+class GitMirrors:
+    """
+    Local bare mirrors of release repositories under mirror_dir. Files at a
+    release tag are read with "git cat-file"; a mirror is refreshed with a
+    single "git fetch --tags" the first time a tag is missing from it, and
+    at most once per run.
+    """
+    def __init__(self, mirror_dir):
+        self.mirror_dir = mirror_dir
+        self.lock = threading.Lock()
+        self.repo_locks = dict()
+        self.refreshed = set()
+
+    def get_path(self, repo_url):
+        name = re.sub(r'^[a-z+]+://', '', repo_url)
+        name = re.sub(r'\.git$', '', name)
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', name)
+        return os.path.join(self.mirror_dir, name + '.git')
+
+    def _get_repo_lock(self, repo_url):
+        with self.lock:
+            return self.repo_locks.setdefault(repo_url, threading.Lock())
+
+    def _cat_file(self, path, tag, file_path):
+        # not through GitPython, which strips the trailing newline
+        cat_file = run(
+            ['git', 'cat-file', 'blob', '%s:%s' % (tag, file_path)],
+            cwd=path, stdout=PIPE, stderr=DEVNULL)
+        if cat_file.returncode:
+            return None
+        return cat_file.stdout
+
+    def refresh(self, repo_url):
+        path = self.get_path(repo_url)
+        if not os.path.isdir(path):
+            make_dir(path)
+            git = Git(path)
+            git.execute(['git', 'init', '--quiet', '--bare'])
+            git.execute(['git', 'remote', 'add', 'origin', repo_url])
+        info("Fetching tags of '%s' into '%s'" % (repo_url, path))
+        Git(path).execute(['git', 'fetch', '--quiet', '--tags', 'origin'])
+        self.refreshed.add(repo_url)
+
+    def get_file(self, repo_url, tag, file_path='package.xml'):
+        """Return the contents of file_path at tag, or None"""
+        path = self.get_path(repo_url)
+        with self._get_repo_lock(repo_url):
+            if os.path.isdir(path):
+                # mark it as used for the garbage collection
+                if time.time() - os.stat(path).st_mtime > TOUCH_INTERVAL:
+                    os.utime(path)
+                contents = self._cat_file(path, tag, file_path)
+                if contents is not None or repo_url in self.refreshed:
+                    return contents
+            try:
+                self.refresh(repo_url)
+            except (GitCommandError, OSError) as e:
+                warn("Failed to mirror '%s': %s" % (repo_url, e))
+                # don't retry it for every package of the repository
+                self.refreshed.add(repo_url)
+                return None
+            return self._cat_file(path, tag, file_path)
@@ -0,0 +1,63 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+import math
+import threading
+
+
+class LatencyStats:
+    """
+    Latencies of successful operations, per operation type (e.g.
+    'package.xml' or 'ls-remote'). Only the last max_samples latencies of
+    each type are kept, so the percentiles follow the current conditions.
+    """
+    def __init__(self, max_samples=10000):
+        self.max_samples = max_samples
+        self.samples = dict()
+        self.counts = dict()
+        self.lock = threading.Lock()
+
+    def add(self, op, secs):
+        with self.lock:
+            if op not in self.samples:
+                self.samples[op] = deque(maxlen=self.max_samples)
+                self.counts[op] = 0
+            self.samples[op].append(secs)
+            self.counts[op] += 1
+
+    def get_percentile(self, op, percent, min_samples=1):
+        """
+        Return the latency below which percent % of the samples of op are
+        (nearest rank), or None if there are less than min_samples.
+        """
+        with self.lock:
+            samples = sorted(self.samples.get(op, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        rank = max(1, math.ceil(percent / 100.0 * len(samples)))
+        return samples[rank - 1]
+
+    def get_summary(self):
+        with self.lock:
+            ops = dict(self.counts)
+        return {
+            op: {
+                'count': count,
+                'p50': self.get_percentile(op, 50),
+                'p95': self.get_percentile(op, 95),
+                'p99': self.get_percentile(op, 99),
+                'max': self.get_percentile(op, 100),
+            } for op, count in ops.items()
+        }
@@ -0,0 +1,85 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from superflore.utils import make_dir
+from superflore.utils import warn
+
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class NegativeCache:
+    """
+    Remembers releases which could not be fetched, e.g. because they are
+    not hosted on GitHub or their tag is gone, so that they aren't retried
+    for ttl seconds. Entries are kept in the JSON file filename (if given)
+    across runs.
+    """
+    def __init__(self, filename=None, ttl=DEFAULT_TTL):
+        self.filename = filename
+        self.ttl = ttl
+        self.entries = dict()
+        self.skipped = dict()
+        self.lock = threading.Lock()
+        if filename and os.path.isfile(filename):
+            try:
+                with open(filename, 'r') as cache_file:
+                    self.entries = json.load(cache_file)
+            except (OSError, ValueError) as e:
+                warn("Ignoring unreadable negative cache '%s': %s" % (
+                    filename, e))
+
+    @staticmethod
+    def get_key(distro_name, pkg_name, version):
+        return '{0}/{1}/{2}'.format(distro_name, pkg_name, version)
+
+    def get(self, distro_name, pkg_name, version):
+        """Return why the release can't be fetched, or None"""
+        key = self.get_key(distro_name, pkg_name, version)
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry or time.time() - entry['time'] >= self.ttl:
+                return None
+            self.skipped[key] = entry['reason']
+            return entry['reason']
+
+    def add(self, distro_name, pkg_name, version, reason):
+        key = self.get_key(distro_name, pkg_name, version)
+        with self.lock:
+            self.entries[key] = {'time': time.time(), 'reason': reason}
+            self._save()
+
+    def _save(self):
+        if not self.filename:
+            return
+        now = time.time()
+        entries = {
+            key: entry for key, entry in self.entries.items()
+            if now - entry['time'] < self.ttl
+        }
+        try:
+            make_dir(os.path.dirname(os.path.abspath(self.filename)))
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(self.filename)))
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(entries, tmp_file, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.filename)
+        except OSError as e:
+            warn("Failed to save negative cache '%s': %s" % (
+                self.filename, e))
@@ -0,0 +1,99 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import gzip
+import hashlib
+import threading
+
+from rosdistro.manifest_provider import get_release_tag
+from superflore.CacheBackend import LocalCacheBackend
+from superflore.CacheBackend import TieredCacheBackend
+from superflore.CacheStats import cache_stats
+from superflore.utils import warn
+
+NAMESPACE = 'package-xml'
+
+
+class PackageXmlCache:
+    """
+    Cache of package.xml contents keyed by release repository URL and
+    release tag. The content behind a release tag never changes, so the
+    entries never need to be invalidated. Entries are kept gzipped under
+    cache_dir and in shared_cache (a CacheBackend), if given, and the most
+    recently used ones in memory.
+    """
+    def __init__(self, cache_dir=None, max_entries=1024, shared_cache=None):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.local_cache = LocalCacheBackend(cache_dir) if cache_dir else None
+        self.backend = TieredCacheBackend(
+            [backend for backend in (self.local_cache, shared_cache)
+             if backend])
+
+    @staticmethod
+    def get_key(repo_url, release_tag):
+        key = '{0}\n{1}'.format(repo_url, release_tag)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def get_names(distro):
+        """Return the names of the entries of the packages of distro"""
+        names = set()
+        for pkg_name, pkg in distro.release_packages.items():
+            repo = distro.repositories[pkg.repository_name].release_repository
+            if repo is None or repo.version is None:
+                continue
+            names.add(PackageXmlCache.get_key(
+                repo.url, get_release_tag(repo, pkg_name)) + '.xml.gz')
+        return names
+
+    def get_path(self, key):
+        return self.local_cache.get_path(NAMESPACE, key + '.xml.gz')
+
+    def get(self, repo_url, release_tag):
+        key = self.get_key(repo_url, release_tag)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        compressed = self.backend.get(NAMESPACE, key + '.xml.gz')
+        if compressed is None:
+            return None
+        try:
+            package_xml = gzip.decompress(compressed)
+        except (OSError, EOFError) as e:
+            warn("Ignoring unreadable cached package.xml '%s': %s" % (
+                key, e))
+            return None
+        self._remember(key, package_xml)
+        return package_xml
+
+    def set(self, repo_url, release_tag, package_xml):
+        if isinstance(package_xml, str):
+            package_xml = package_xml.encode('utf-8')
+        key = self.get_key(repo_url, release_tag)
+        self._remember(key, package_xml)
+        self.backend.put(
+            NAMESPACE, key + '.xml.gz', gzip.compress(package_xml))
+
+    def _remember(self, key, package_xml):
+        with self.lock:
+            self.entries[key] = package_xml
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                cache_stats.evict('package.xml')
@@ -0,0 +1,128 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from superflore.rosdep_support import DEFAULT_ROS_DISTRO
+from superflore.utils import make_dir
+from superflore.utils import warn
+
+FILENAME = 'rosdep-resolutions.json'
+NAMESPACE = 'rosdep'
+
+
+class ResolutionCache:
+    """
+    Rosdep resolutions, and the keys which couldn't be resolved, kept in
+    the JSON file filename across runs. The resolutions depend on the rosdep
+    database, so the entries are dropped whenever stamp (which identifies
+    the state of the local rosdep sources cache) changes. The entries are
+    also looked up in and added to shared_cache (a CacheBackend), if given,
+    under names including the stamp.
+    """
+    def __init__(self, filename, stamp, shared_cache=None):
+        self.filename = filename
+        self.stamp = stamp
+        # without a stamp, entries of different rosdep databases would mix
+        self.shared_cache = shared_cache if stamp else None
+        self.entries = dict()
+        self.dirty = False
+        self.lock = threading.Lock()
+        if os.path.isfile(filename):
+            try:
+                with open(filename, 'r') as cache_file:
+                    data = json.load(cache_file)
+                if data.get('stamp') == stamp:
+                    self.entries = data['entries']
+            except (OSError, ValueError, KeyError) as e:
+                warn("Ignoring unreadable rosdep cache '%s': %s" % (
+                    filename, e))
+
+    @staticmethod
+    def get_key(key, os_name, os_version, ros_distro):
+        return '/'.join((key, os_name, os_version, ros_distro))
+
+    @staticmethod
+    def get_distro(key):
+        """
+        Return the ros distro the entry key was resolved for, or None for
+        those resolved for DEFAULT_ROS_DISTRO (all gentoo ones), which are
+        of any distro.
+        """
+        ros_distro = key.rsplit('/', 1)[-1]
+        return ros_distro if ros_distro != DEFAULT_ROS_DISTRO else None
+
+    def get(self, key, os_name, os_version, ros_distro):
+        """
+        Return the cached resolution, as a dict with either the 'resolution'
+        or the 'unresolved' reason, or None.
+        """
+        key = self.get_key(key, os_name, os_version, ros_distro)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None or not self.shared_cache:
+            return entry
+        value = self.shared_cache.get(NAMESPACE, self._get_shared_name(key))
+        if value is None:
+            return None
+        try:
+            entry = json.loads(value.decode('utf-8'))
+        except ValueError as e:
+            warn("Ignoring unreadable shared rosdep resolution of '%s': %s" % (
+                key, e))
+            return None
+        self._set(key, entry, share=False)
+        return entry
+
+    def set(self, key, os_name, os_version, ros_distro, resolution):
+        key = self.get_key(key, os_name, os_version, ros_distro)
+        self._set(key, {'resolution': list(resolution)})
+
+    def set_unresolved(self, key, os_name, os_version, ros_distro, reason):
+        key = self.get_key(key, os_name, os_version, ros_distro)
+        self._set(key, {'unresolved': reason})
+
+    def _get_shared_name(self, key):
+        name = '{0}\n{1}'.format(self.stamp, key)
+        return hashlib.sha256(name.encode()).hexdigest() + '.json'
+
+    def _set(self, key, entry, share=True):
+        with self.lock:
+            self.entries[key] = entry
+            self.dirty = True
+        if share and self.shared_cache:
+            self.shared_cache.put(
+                NAMESPACE, self._get_shared_name(key),
+                json.dumps(entry, sort_keys=True).encode('utf-8'))
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                make_dir(os.path.dirname(os.path.abspath(self.filename)))
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(os.path.abspath(self.filename)))
+                with os.fdopen(fd, 'w') as tmp_file:
+                    json.dump({'stamp': self.stamp, 'entries': self.entries},
+                              tmp_file, sort_keys=True)
+                os.replace(tmp_path, self.filename)
+                self.dirty = False
+            except OSError as e:
+                warn("Failed to save rosdep cache '%s': %s" % (
+                    self.filename, e))
@@ -0,0 +1,151 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections import Counter
+import random
+import threading
+import time
+
+from superflore.exceptions import HostUnavailable
+from superflore.exceptions import NoCassetteEntry
+from superflore.exceptions import NoPkgXml
+from superflore.utils import err
+from superflore.utils import info
+from superflore.utils import warn
+
+# failures which retrying won't fix
+FATAL_EXCEPTIONS = (NoPkgXml, HostUnavailable, NoCassetteEntry)
+
+retry_stats = dict()
+retry_stats_lock = threading.Lock()
+run_deadline = None
+
+
+def set_run_budget(secs):
+    """Stop retrying anything once secs seconds of this run have passed"""
+    global run_deadline
+    run_deadline = time.monotonic() + secs if secs is not None else None
+
+
+def _count(name, key):
+    with retry_stats_lock:
+        retry_stats.setdefault(name, Counter())[key] += 1
+
+
+def log_retry_stats():
+    with retry_stats_lock:
+        stats = {name: Counter(counts) for name, counts in retry_stats.items()}
+    for name, counts in sorted(stats.items()):
+        if not counts['retries'] and not counts['failures']:
+            continue
+        info('{0}: {1} calls, {2} retries, {3} failed'.format(
+            name, counts['calls'], counts['retries'], counts['failures']))
+
+
+class RetryPolicy:
+    """
+    Calls a callback until it succeeds, at most max_retries + 1 times.
+
+    Before the n-th retry it waits a random time between 0 and
+    min(max_secs, base_secs * 2 ** (n - 1)) seconds ("full jitter", so
+    that concurrent workers don't retry in lockstep), or backoff(n) seconds
+    if given. Exceptions which are fatal or not retryable are raised
+    right away, and no retry is started which would end after budget
+    seconds of the call or after the run budget (see set_run_budget).
+    The calls, retries and failures are counted per name.
+    """
+    def __init__(self, name, max_retries=5, base_secs=0.125, max_secs=8.0,
+                 budget=None, retryable=(Exception,), fatal=FATAL_EXCEPTIONS,
+                 backoff=None, retry_msg='', error_msg=''):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_secs = base_secs
+        self.max_secs = max_secs
+        self.budget = budget
+        self.retryable = retryable
+        self.fatal = fatal
+        self.backoff = backoff
+        self.retry_msg = retry_msg
+        self.error_msg = error_msg
+
+    def get_delay(self, num_retry):
+        if self.backoff:
+            return self.backoff(num_retry)
+        return random.uniform(
+            0, min(self.max_secs, self.base_secs * 2 ** (num_retry - 1)))
+
+    def _get_retry_delay(self, e, num_retry, start):
+        """
+        Return how long to wait before retrying after the exception e,
+        or None to give up.
+        """
+        if isinstance(e, self.fatal) or not isinstance(e, self.retryable):
+            return None
+        if num_retry > self.max_retries:
+            return None
+        delay = self.get_delay(num_retry)
+        end = time.monotonic() + delay
+        if self.budget is not None and end - start > self.budget:
+            return None
+        if run_deadline is not None and end > run_deadline:
+            return None
+        return delay
+
+    def _on_retry(self, e, num_retry):
+        _count(self.name, 'retries')
+        if self.retry_msg:
+            warn('{0} {1} {2}/{3}...'.format(
+                str(e), self.retry_msg, num_retry, self.max_retries))
+        elif num_retry == 1:
+            warn(str(e))
+
+    def _on_failure(self, e, num_retry):
+        _count(self.name, 'failures')
+        if self.error_msg:
+            err('{0} {1} {2}/{3}'.format(
+                str(e), self.error_msg, num_retry - 1, self.max_retries))
+
+    def call(self, callback, *args, **kwargs):
+        _count(self.name, 'calls')
+        start = time.monotonic()
+        num_retry = 0
+        while True:
+            try:
+                return callback(*args, **kwargs)
+            except Exception as e:
+                num_retry += 1
+                delay = self._get_retry_delay(e, num_retry, start)
+                if delay is None:
+                    self._on_failure(e, num_retry)
+                    raise
+                self._on_retry(e, num_retry)
+            time.sleep(delay)
+
+    async def call_async(self, callback, *args, **kwargs):
+        """Like call, for a coroutine function callback"""
+        _count(self.name, 'calls')
+        start = time.monotonic()
+        num_retry = 0
+        while True:
+            try:
+                return await callback(*args, **kwargs)
+            except Exception as e:
+                num_retry += 1
+                delay = self._get_retry_delay(e, num_retry, start)
+                if delay is None:
+                    self._on_failure(e, num_retry)
+                    raise
+                self._on_retry(e, num_retry)
+            await asyncio.sleep(delay)
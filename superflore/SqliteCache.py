@@ -0,0 +1,143 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import MutableMapping
+import os
+import pickle
+import sqlite3
+import threading
+
+from superflore.utils import info
+from superflore.utils import make_dir
+from superflore.utils import warn
+
+# bump whenever the schema changes
+SCHEMA_VERSION = 1
+
+
+class SqliteCache(MutableMapping):
+    """
+    A dict of strings kept in the SQLite database filename (in memory if
+    None), used as a context manager. Entries are looked up when accessed,
+    and every change is committed right away, so that opening and closing
+    the cache don't depend on its size, concurrent processes see each
+    other's entries, and a crash loses nothing. A new database is filled
+    once with the entries of the pickled dict legacy_filename
+    (by default, the file of the same name with a .pickle extension).
+    """
+    def __init__(self, filename, legacy_filename=None):
+        self.filename = filename
+        if legacy_filename is None and filename and \
+                filename.endswith('.sqlite'):
+            legacy_filename = filename[:-len('.sqlite')] + '.pickle'
+        self.legacy_filename = legacy_filename
+        self.lock = threading.Lock()
+        self.db = None
+
+    def __enter__(self):
+        if self.filename:
+            make_dir(os.path.dirname(os.path.abspath(self.filename)))
+        # autocommit; shared by the threads of generate_installers
+        self.db = sqlite3.connect(
+            self.filename or ':memory:', timeout=60, isolation_level=None,
+            check_same_thread=False)
+        if self.filename:
+            self.db.execute('PRAGMA journal_mode=WAL')
+        # the first process to get here creates the schema and migrates
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            version = self.db.execute('PRAGMA user_version').fetchone()[0]
+            if version == 0:
+                self.db.execute(
+                    'CREATE TABLE IF NOT EXISTS cache '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+                self._migrate()
+                self.db.execute('PRAGMA user_version=%d' % SCHEMA_VERSION)
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        if version > SCHEMA_VERSION:
+            self.db.close()
+            raise RuntimeError(
+                "Cache '%s' was created by a newer version of superflore" %
+                self.filename)
+        return self
+
+    def __exit__(self, *args):
+        with self.lock:
+            self.db.close()
+            self.db = None
+
+    def _migrate(self):
+        if not self.legacy_filename or \
+                not os.path.isfile(self.legacy_filename):
+            return
+        info("Migrating cached file '%s' into '%s'" % (
+            self.legacy_filename, self.filename))
+        try:
+            with open(self.legacy_filename, 'rb') as legacy_file:
+                entries = pickle.load(legacy_file)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+            warn("Not migrating unreadable cached file '%s': %s" % (
+                self.legacy_filename, e))
+            return
+        self.db.executemany(
+            'INSERT OR IGNORE INTO cache VALUES (?, ?)', entries.items())
+
+    def _execute(self, sql, *args):
+        with self.lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def __getitem__(self, key):
+        rows = self._execute('SELECT value FROM cache WHERE key = ?', key)
+        if not rows:
+            raise KeyError(key)
+        return rows[0][0]
+
+    def __contains__(self, key):
+        return bool(self._execute('SELECT 1 FROM cache WHERE key = ?', key))
+
+    def __setitem__(self, key, value):
+        self._execute('INSERT OR REPLACE INTO cache VALUES (?, ?)', key, value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._execute('DELETE FROM cache WHERE key = ?', key)
+
+    def __iter__(self):
+        return iter([row[0] for row in self._execute(
+            'SELECT key FROM cache ORDER BY key')])
+
+    def __len__(self):
+        return self._execute('SELECT COUNT(*) FROM cache')[0][0]
+
+    def update(self, entries=(), **kwargs):
+        """Add many entries in a single transaction"""
+        entries = dict(entries, **kwargs)
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                self.db.executemany(
+                    'INSERT OR REPLACE INTO cache VALUES (?, ?)',
+                    entries.items())
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+
+    def vacuum(self):
+        """Give the space of removed entries back to the filesystem"""
+        self._execute('VACUUM')
@@ -0,0 +1,337 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+
+from superflore.distro_snapshot import get_distro
+from superflore.distro_snapshot import get_snapshot_path
+from superflore.distro_snapshot import read_snapshot
+from superflore.distro_snapshot import save_snapshot
+from superflore.distro_snapshot import SCHEMA_VERSION
+from superflore.distro_snapshot import set_snapshot_dir
+from superflore.distro_snapshot import SNAPSHOT_DIR
+from superflore.exceptions import InvalidBundle
+from superflore.PackageXmlCache import NAMESPACE as PACKAGE_XML_DIR
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.parser import get_parser
+from superflore.ResolutionCache import FILENAME as RESOLUTIONS_FILE
+from superflore.ResolutionCache import ResolutionCache
+from superflore.rosdep_support import get_sources_stamp
+from superflore.SqliteCache import SqliteCache
+from superflore.utils import err
+from superflore.utils import get_srcrev_filename
+from superflore.utils import info
+from superflore.utils import make_dir
+from superflore.utils import ok
+from superflore.utils import warn
+
+# bump whenever the layout of the bundles changes
+BUNDLE_FORMAT = 1
+MANIFEST = 'MANIFEST.json'
+SRCREVS_FILE = 'srcrevs.json'
+
+
+def _list_files(directory):
+    """Return the relative paths of the files under directory"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        for name in files:
+            # skip files still being written (see tempfile.mkstemp)
+            if not name.startswith('tmp'):
+                paths.append(os.path.relpath(os.path.join(root, name),
+                                             directory))
+    return sorted(paths)
+
+
+def _get_members(cache_dir, srcrev_filename, distro_name):
+    """Return the bundle members, as (name, path or content) tuples"""
+    members = []
+    package_xml_dir = os.path.join(cache_dir, PACKAGE_XML_DIR)
+    names = PackageXmlCache.get_names(get_distro(distro_name)) \
+        if distro_name else None
+    for path in _list_files(package_xml_dir):
+        if names is None or os.path.basename(path) in names:
+            members.append((os.path.join(PACKAGE_XML_DIR, path),
+                            os.path.join(package_xml_dir, path)))
+    resolutions_file = os.path.join(cache_dir, RESOLUTIONS_FILE)
+    if os.path.isfile(resolutions_file):
+        with open(resolutions_file, 'r') as cache_file:
+            resolutions = json.load(cache_file)
+        if distro_name:
+            resolutions['entries'] = {
+                key: entry for key, entry in resolutions['entries'].items()
+                if ResolutionCache.get_distro(key) in (None, distro_name)}
+        members.append((RESOLUTIONS_FILE, json.dumps(
+            resolutions, sort_keys=True).encode('utf-8')))
+    if srcrev_filename:
+        with SqliteCache(srcrev_filename) as srcrev_cache:
+            srcrevs = dict(srcrev_cache)
+        if distro_name:
+            # the SRC_URIs are those of the release tags of the distro
+            srcrevs = {
+                src_uri: srcrev for src_uri, srcrev in srcrevs.items()
+                if '/release/{0}/'.format(distro_name) in src_uri}
+        members.append((SRCREVS_FILE, json.dumps(
+            srcrevs, sort_keys=True).encode('utf-8')))
+    snapshot_dir = os.path.join(cache_dir, SNAPSHOT_DIR)
+    for path in _list_files(snapshot_dir):
+        name, ext = os.path.splitext(path)
+        if ext != '.pickle' or distro_name and name != distro_name:
+            continue
+        # as JSON, as unpickling a bundled file could run any code
+        snapshot = read_snapshot(os.path.join(snapshot_dir, path))
+        if snapshot is None:
+            continue
+        try:
+            members.append((os.path.join(SNAPSHOT_DIR, name + '.json'),
+                            json.dumps(snapshot, sort_keys=True).encode()))
+        except (TypeError, ValueError) as e:
+            warn("Not exporting the '%s' distro snapshot: %s" % (name, e))
+    return members
+
+
+def _read(content):
+    if isinstance(content, bytes):
+        return content
+    with open(content, 'rb') as member_file:
+        return member_file.read()
+
+
+def export_bundle(bundle, cache_dir, srcrev_filename=None, distro_name=None):
+    """
+    Write the package.xml cache and rosdep resolutions of cache_dir, the
+    distro snapshots and the SRCREV cache in srcrev_filename (if given)
+    into the gzipped tarball bundle, optionally only those of distro_name.
+    The first member lists the sha256 of all other members. Returns the
+    number of members.
+    """
+    members = _get_members(cache_dir, srcrev_filename, distro_name)
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'distro': distro_name,
+        'created': int(time.time()),
+        'files': {name: hashlib.sha256(_read(content)).hexdigest()
+                  for name, content in members},
+    }
+    bundle_dir = os.path.dirname(os.path.abspath(bundle))
+    make_dir(bundle_dir)
+    fd, tmp_path = tempfile.mkstemp(dir=bundle_dir)
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            with tarfile.open(fileobj=tmp_file, mode='w:gz') as tar:
+                manifest_data = json.dumps(manifest, sort_keys=True).encode()
+                for name, content in [(MANIFEST, manifest_data)] + members:
+                    data = _read(content)
+                    member = tarfile.TarInfo(name)
+                    member.size = len(data)
+                    member.mtime = manifest['created']
+                    tar.addfile(member, io.BytesIO(data))
+        os.replace(tmp_path, bundle)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return len(members)
+
+
+def _check_name(name):
+    if os.path.isabs(name) or '..' in name.split('/') or \
+            name.split('/')[0] not in (PACKAGE_XML_DIR, SNAPSHOT_DIR,
+                                       RESOLUTIONS_FILE, SRCREVS_FILE):
+        raise InvalidBundle("Unexpected bundle member '{0}'".format(name))
+
+
+def _extract(tar, staging_dir):
+    """Extract tar into staging_dir, checking it against its manifest"""
+    member = tar.next()
+    if member is None or member.name != MANIFEST:
+        raise InvalidBundle('No manifest')
+    try:
+        manifest = json.load(tar.extractfile(member))
+    except ValueError as e:
+        raise InvalidBundle('Unreadable manifest: {0}'.format(e))
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise InvalidBundle('Unknown bundle format {0}'.format(
+            manifest.get('format')))
+    extracted = set()
+    for member in tar:
+        if member.name == MANIFEST:
+            continue
+        if member.name not in manifest['files'] or not member.isfile():
+            raise InvalidBundle("Unexpected bundle member '{0}'".format(
+                member.name))
+        _check_name(member.name)
+        data = tar.extractfile(member).read()
+        if hashlib.sha256(data).hexdigest() != manifest['files'][member.name]:
+            raise InvalidBundle("Checksum mismatch of '{0}'".format(
+                member.name))
+        path = os.path.join(staging_dir, member.name)
+        make_dir(os.path.dirname(path))
+        with open(path, 'wb') as member_file:
+            member_file.write(data)
+        extracted.add(member.name)
+    missing = set(manifest['files']) - extracted
+    if missing:
+        raise InvalidBundle('Missing bundle members: {0}'.format(
+            ', '.join(sorted(missing))))
+    return manifest
+
+
+def _merge_resolutions(path, cache_dir):
+    """
+    Merge the rosdep resolutions of cache_dir into the bundled ones in path,
+    returning whether they should replace those of cache_dir.
+    """
+    with open(path, 'r') as bundle_file:
+        resolutions = json.load(bundle_file)
+    try:
+        with open(os.path.join(cache_dir, RESOLUTIONS_FILE), 'r') as f:
+            current = json.load(f)
+    except (OSError, ValueError):
+        return True
+    if current.get('stamp') == resolutions['stamp']:
+        resolutions['entries'].update(current['entries'])
+    elif current.get('stamp') == get_sources_stamp():
+        warn('Not importing the rosdep resolutions of a different rosdep '
+             'database')
+        return False
+    with open(path, 'w') as bundle_file:
+        json.dump(resolutions, bundle_file, sort_keys=True)
+    return True
+
+
+def _import_snapshot(path, cache_dir, name):
+    """Save the distro snapshot of the bundle member name, read from path"""
+    distro_name, ext = os.path.splitext(os.path.basename(name))
+    if ext != '.json':
+        # e.g. the pickled snapshots of older bundles, which are rebuilt
+        warn("Not importing the distro snapshot '%s'" % name)
+        return
+    with open(path, 'r') as snapshot_file:
+        snapshot = json.load(snapshot_file)
+    if not isinstance(snapshot, dict) or \
+            snapshot.get('schema') != SCHEMA_VERSION or \
+            not isinstance(snapshot.get('data'), dict):
+        warn("Not importing the distro snapshot '%s' of another schema" %
+             name)
+        return
+    save_snapshot(
+        get_snapshot_path(os.path.join(cache_dir, SNAPSHOT_DIR), distro_name),
+        snapshot['data'], snapshot.get('url'), snapshot.get('sha256'),
+        snapshot.get('etag'), snapshot.get('last_modified'))
+
+
+def import_bundle(bundle, cache_dir, srcrev_filename=None):
+    """
+    Add the contents of bundle (see export_bundle) to the caches. Nothing
+    is changed unless the whole bundle is intact, and every cache file is
+    replaced atomically. Returns the manifest of the bundle.
+    """
+    make_dir(cache_dir)
+    # in cache_dir, so that the files can be moved into place atomically
+    staging_dir = tempfile.mkdtemp(dir=cache_dir, prefix='tmp-bundle-')
+    try:
+        try:
+            with tarfile.open(bundle, 'r:gz') as tar:
+                manifest = _extract(tar, staging_dir)
+        except (tarfile.TarError, EOFError, OSError) as e:
+            if isinstance(e, FileNotFoundError):
+                raise
+            raise InvalidBundle('Unreadable bundle: {0}'.format(e))
+        for name in sorted(manifest['files']):
+            path = os.path.join(staging_dir, name)
+            if name == RESOLUTIONS_FILE:
+                if not _merge_resolutions(path, cache_dir):
+                    continue
+            elif name == SRCREVS_FILE:
+                if not srcrev_filename:
+                    warn('Not importing the SRCREVs without a tar archive '
+                         'directory')
+                    continue
+                with open(path, 'r') as srcrevs_file:
+                    srcrevs = json.load(srcrevs_file)
+                with SqliteCache(srcrev_filename) as srcrev_cache:
+                    srcrev_cache.update(srcrevs)
+                continue
+            elif name.startswith(SNAPSHOT_DIR + '/'):
+                _import_snapshot(path, cache_dir, name)
+                continue
+            make_dir(os.path.dirname(os.path.join(cache_dir, name)))
+            os.replace(path, os.path.join(cache_dir, name))
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return manifest
+
+
+def main():
+    parser = get_parser(
+        'Export the caches into a bundle, or import a bundle into the '
+        'caches, e.g. to seed the caches of a new machine',
+        is_generator=False)
+    parser.add_argument(
+        'command',
+        help='export the caches into BUNDLE, or import BUNDLE',
+        choices=['export', 'import']
+    )
+    parser.add_argument(
+        'bundle',
+        help='the bundle file (a .tar.gz)',
+        metavar='BUNDLE'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='location of the caches (see --cache-dir of the generators)',
+        type=str,
+        default=os.getenv('SUPERFLORE_CACHE_DIR')
+    )
+    parser.add_argument(
+        '--tar-archive-dir',
+        help='location of the SRCREV cache of superflore-gen-oe-recipes',
+        type=str
+    )
+    parser.add_argument(
+        '--ros-distro',
+        help='only export the data of the specified distro',
+        type=str
+    )
+    args = parser.parse_args(sys.argv[1:])
+    if not args.cache_dir:
+        parser.error('Invalid args! no --cache-dir (or SUPERFLORE_CACHE_DIR)')
+    if args.ros_distro and args.command == 'import':
+        parser.error('Invalid args! --ros-distro is only used by export')
+    srcrev_filename = get_srcrev_filename(args.tar_archive_dir)
+    if args.command == 'export':
+        set_snapshot_dir(args.cache_dir)
+        count = export_bundle(args.bundle, args.cache_dir, srcrev_filename,
+                              args.ros_distro)
+        ok("Exported {0} cache files into '{1}'".format(count, args.bundle))
+        return
+    try:
+        manifest = import_bundle(args.bundle, args.cache_dir, srcrev_filename)
+    except InvalidBundle as e:
+        err("Failed to import '{0}': {1}".format(args.bundle, e.message))
+        sys.exit(1)
+    info('Bundle of {0} created at {1}'.format(
+        "distro '%s'" % manifest['distro'] if manifest['distro']
+        else 'all distros',
+        time.strftime('%Y-%m-%d %H:%M', time.localtime(manifest['created']))))
+    ok("Imported {0} cache files into '{1}'".format(
+        len(manifest['files']), args.cache_dir))
@@ -0,0 +1,66 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+
+from superflore.GarbageCollector import collect_garbage
+from superflore.GarbageCollector import parse_size
+from superflore.parser import get_parser
+from superflore.utils import get_checksum_filename
+from superflore.utils import get_srcrev_filename
+
+
+def main():
+    parser = get_parser(
+        'Remove the least recently used data from the caches, and the data '
+        'of end-of-life distros',
+        is_generator=False)
+    parser.add_argument(
+        '--cache-dir',
+        help='location of the caches (see --cache-dir of the generators)',
+        type=str,
+        default=os.getenv('SUPERFLORE_CACHE_DIR')
+    )
+    parser.add_argument(
+        '--tar-archive-dir',
+        help='location of the SRCREV and archive checksum caches of '
+             'superflore-gen-oe-recipes',
+        type=str
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        help='size (e.g. 10G) to keep the caches within',
+        type=parse_size
+    )
+    parser.add_argument(
+        '--cache-max-age',
+        help='days after which unused data is removed',
+        type=float
+    )
+    parser.add_argument(
+        '--keep-eol',
+        help='keep the data of end-of-life distros',
+        action='store_true'
+    )
+    args = parser.parse_args(sys.argv[1:])
+    if not args.cache_dir:
+        parser.error('Invalid args! no --cache-dir (or SUPERFLORE_CACHE_DIR)')
+    max_age = args.cache_max_age * 24 * 60 * 60 \
+        if args.cache_max_age is not None else None
+    srcrev_filename = get_srcrev_filename(args.tar_archive_dir)
+    collect_garbage(args.cache_dir, srcrev_filename, args.cache_max_size,
+                    max_age, drop_eol=not args.keep_eol,
+                    checksum_filename=get_checksum_filename(
+                        args.tar_archive_dir))
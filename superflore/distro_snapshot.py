@@ -0,0 +1,197 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import hashlib
+import os
+import pickle
+import tempfile
+from urllib.parse import urlparse
+
+from rosdistro import get_cached_distribution
+from rosdistro import get_distribution_cache
+from rosdistro import get_distribution_file
+from rosdistro import get_index
+from rosdistro import get_index_url
+from rosdistro.distribution import Distribution
+from rosdistro.distribution_cache import DistributionCache
+from rosdistro.rosdistro import RosPackage
+from superflore import manifest_provider
+from superflore.fetcher import fetcher
+from superflore.manifest_provider import DISTRIBUTION_CACHE
+from superflore.manifest_provider import get_package_xml
+from superflore.utils import info
+from superflore.utils import make_dir
+from superflore.utils import warn
+import yaml
+
+SNAPSHOT_DIR = 'distro-snapshots'
+# bump whenever the layout of the snapshot files changes
+SCHEMA_VERSION = 2
+
+snapshot_dir = None
+
+
+def set_snapshot_dir(cache_dir):
+    """Keep snapshots of the loaded distribution caches in cache_dir"""
+    global snapshot_dir
+    snapshot_dir = os.path.join(cache_dir, SNAPSHOT_DIR) if cache_dir \
+        else None
+
+
+def get_snapshot_path(directory, distro_name):
+    return os.path.join(directory, distro_name + '.pickle')
+
+
+def read_snapshot(path):
+    """
+    Return the snapshot path, a dict of the distribution cache data with
+    the url, sha256, etag and last_modified of the cache it was parsed from
+    (see save_snapshot), or None.
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        warn("Ignoring unreadable distro snapshot '%s': %s" % (path, e))
+        return None
+    if not isinstance(snapshot, dict) or \
+            snapshot.get('schema') != SCHEMA_VERSION:
+        return None
+    return snapshot
+
+
+def load_snapshot(path):
+    """Return the distribution cache data of the snapshot path, or None"""
+    snapshot = read_snapshot(path)
+    return snapshot['data'] if snapshot else None
+
+
+def save_snapshot(path, data, url=None, sha256=None, etag=None,
+                  last_modified=None):
+    try:
+        make_dir(os.path.dirname(path))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as tmp_file:
+            pickle.dump({
+                'schema': SCHEMA_VERSION, 'data': data, 'url': url,
+                'sha256': sha256, 'etag': etag,
+                'last_modified': last_modified,
+            }, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        warn("Failed to save distro snapshot '%s': %s" % (path, e))
+
+
+def load_snapshot_distro(directory, distro_name):
+    """Return the distro of the snapshot in directory, or None"""
+    data = load_snapshot(get_snapshot_path(directory, distro_name))
+    if data is None:
+        return None
+    return get_cached_distribution(
+        None, distro_name, cache=DistributionCache(distro_name, data))
+
+
+def _get_cache_url(distro_name):
+    index = get_index(get_index_url())
+    if distro_name not in index.distributions:
+        raise RuntimeError(
+            "Unknown distribution: '{0}'. Valid distribution names are: "
+            "{1}".format(distro_name, ', '.join(sorted(index.distributions))))
+    if 'distribution_cache' not in index.distributions[distro_name]:
+        raise RuntimeError("Distribution has no cache: '%s'" % distro_name)
+    return index, index.distributions[distro_name]['distribution_cache']
+
+
+def _parse_cache(url, body):
+    if url.endswith('.yaml.gz'):
+        body = gzip.decompress(body)
+    elif not url.endswith('.yaml'):
+        raise NotImplementedError(
+            'The url of the cache must end with either ".yaml" or ".yaml.gz"')
+    return yaml.safe_load(body.decode('utf-8'))
+
+
+def update_snapshot(distro_name, path):
+    """
+    Return the distribution cache data of distro_name, from the snapshot
+    path (if given) when the upstream cache didn't change: it is only
+    downloaded if its ETag or Last-Modified changed, and only parsed if its
+    content changed, the snapshot being updated then.
+    """
+    index, url = _get_cache_url(distro_name)
+    if urlparse(url).scheme not in ('http', 'https'):
+        data = get_distribution_cache(index, distro_name).get_data()
+        if path:
+            save_snapshot(path, data, url)
+        return data
+    snapshot = read_snapshot(path) if path else None
+    if snapshot and snapshot['url'] != url:
+        snapshot = None
+    body, etag, last_modified = fetcher.get_if_modified(
+        url, snapshot and snapshot['etag'],
+        snapshot and snapshot['last_modified'], op='distribution-cache')
+    if body is None:
+        info("The '%s' distribution cache is unchanged" % distro_name)
+        return snapshot['data']
+    sha256 = hashlib.sha256(body).hexdigest()
+    if snapshot and snapshot['sha256'] == sha256:
+        data = snapshot['data']
+    else:
+        data = _parse_cache(url, body)
+    if path:
+        save_snapshot(path, data, url, sha256, etag, last_modified)
+    return data
+
+
+def get_distro(distro_name):
+    """
+    Like rosinstall_generator's get_distro, but keeps a snapshot of the
+    distribution cache in the cache directory (see set_snapshot_dir), which
+    is used as long as the distribution cache doesn't change, and when it
+    can't be loaded.
+    """
+    path = get_snapshot_path(snapshot_dir, distro_name) if snapshot_dir \
+        else None
+    try:
+        data = update_snapshot(distro_name, path)
+    except Exception as e:
+        data = load_snapshot(path) if path else None
+        if data is None:
+            raise
+        warn("Failed to load the '{0}' distribution cache, using the "
+             "snapshot '{1}': {2}".format(distro_name, path, e))
+    # the index is only needed without a cache
+    return get_cached_distribution(
+        None, distro_name, cache=DistributionCache(distro_name, data))
+
+
+def get_light_distro(distro_name):
+    """
+    Return the distro distro_name loaded from its distribution.yaml only,
+    rather than from the whole distribution cache; the package.xml files
+    are fetched when needed by get_package_xml (and kept in its caches).
+    """
+    if manifest_provider.manifest_provider == DISTRIBUTION_CACHE:
+        return get_distro(distro_name)
+
+    def get_release_package_xml(_, repo, pkg_name):
+        return get_package_xml(
+            distro, RosPackage(pkg_name, repo)).decode('utf-8')
+    distro = Distribution(
+        get_distribution_file(get_index(get_index_url()), distro_name),
+        [get_release_package_xml])
+    return distro
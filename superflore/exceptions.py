@@ -39,3 +39,21 @@ class UnknownBuildType(Exception):
     """Raised when we don't know what to inherit to build the package"""
     def __init__(self, msg):
         self.message = msg
+
+
+class HostUnavailable(Exception):
+    """Raised when requests to a host are suspended after failures"""
+    def __init__(self, message):
+        self.message = message
+
+
+class NoCassetteEntry(Exception):
+    """Raised when replaying a request which wasn't recorded"""
+    def __init__(self, message):
+        self.message = message
+
+
+class InvalidBundle(Exception):
+    """Raised when a cache bundle is corrupt or of an unknown format"""
+    def __init__(self, message):
+        self.message = message
@@ -0,0 +1,550 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatchcase
+import hashlib
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from git.cmd import Git
+from git.exc import GitCommandError
+import requests
+from requests.adapters import HTTPAdapter
+from superflore.ConcurrencyLimit import ConcurrencyLimit
+from superflore.exceptions import HostUnavailable
+from superflore.LatencyStats import LatencyStats
+from superflore.utils import info
+from superflore.utils import warn
+
+# total time in seconds an operation may take, once it got a slot
+DEFAULT_TIMEOUTS = {'package.xml': 60, 'ls-remote': 120, 'sources': 600,
+                    'archive': 600, 'distribution-cache': 300}
+# bytes of an archive read at once by Fetcher.sha256
+CHUNK_SIZE = 64 * 1024
+# how many latencies of an operation type are needed before hedging it
+HEDGE_MIN_SAMPLES = 20
+# the git smart HTTP protocol, see gitprotocol-http(5)
+UPLOAD_PACK_SERVICE = 'git-upload-pack'
+SMART_HTTP_HEADERS = {'User-Agent': 'git/superflore'}
+# the options of git ls-remote supported by filter_refs
+TAGS_OPTIONS = ('--tags', '-t')
+HEADS_OPTIONS = ('--heads', '-h', '--branches', '-b')
+LS_REMOTE_OPTIONS = TAGS_OPTIONS + HEADS_OPTIONS + ('--refs',)
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.rate_limited = 0
+        self.total_secs = 0.0
+        self.max_secs = 0.0
+
+    def add(self, secs, failed):
+        self.requests += 1
+        self.failures += 1 if failed else 0
+        self.total_secs += secs
+        self.max_secs = max(self.max_secs, secs)
+
+
+class CircuitBreaker:
+    """
+    Suspends requests to a host for cooldown seconds once threshold
+    consecutive requests to it failed. After the cooldown, a single request
+    is let through (half-open) while the others are still rejected: if it
+    succeeds the host is used again, and if it fails requests are suspended
+    again. A probe which isn't recorded within cooldown seconds is replaced
+    by another one.
+    """
+    def __init__(self, threshold=5, cooldown=60):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.failures = dict()
+        self.opened = dict()
+        # the start of the probe request of each half-open host
+        self.probing = dict()
+
+    def check(self, host):
+        """Raise HostUnavailable if requests to host are suspended"""
+        with self.lock:
+            if host not in self.opened and host not in self.probing:
+                return
+            now = time.monotonic()
+            if host in self.opened:
+                if now - self.opened[host] < self.cooldown:
+                    raise HostUnavailable(
+                        "Not contacting '{0}' after {1} consecutive "
+                        "failures".format(host, self.failures[host]))
+                del self.opened[host]
+            elif now - self.probing[host] < self.cooldown:
+                raise HostUnavailable(
+                    "Not contacting '{0}' until a request to it "
+                    "succeeds".format(host))
+            self.probing[host] = now
+            self.failures[host] = self.threshold - 1
+
+    def record(self, host, failed):
+        with self.lock:
+            self.probing.pop(host, None)
+            if not failed:
+                self.failures.pop(host, None)
+                return
+            self.failures[host] = self.failures.get(host, 0) + 1
+            if self.failures[host] >= self.threshold \
+                    and host not in self.opened:
+                warn("Suspending requests to '{0}' for {1}s after {2} "
+                     "consecutive failures".format(
+                         host, self.cooldown, self.failures[host]))
+                self.opened[host] = time.monotonic()
+
+
+def get_retry_after(response, max_pause=900):
+    """
+    Return how many seconds a rate limited response asks to wait, from its
+    Retry-After or GitHub's X-RateLimit-Reset header, or None.
+    """
+    retry_after = response.headers.get('Retry-After')
+    reset = response.headers.get('X-RateLimit-Reset')
+    secs = None
+    if retry_after:
+        try:
+            secs = float(retry_after)
+        except ValueError:
+            try:
+                secs = parsedate_to_datetime(retry_after).timestamp() - \
+                    time.time()
+            except (TypeError, ValueError):
+                pass
+    elif reset and response.headers.get('X-RateLimit-Remaining') == '0':
+        try:
+            secs = float(reset) - time.time()
+        except ValueError:
+            pass
+    if secs is None:
+        return None
+    return min(max(secs, 0.0), max_pause)
+
+
+def parse_ref_advertisement(data):
+    """
+    Return the (commit, ref) pairs of a smart HTTP ref advertisement, the
+    response to GET <repo>/info/refs?service=git-upload-pack, including the
+    commits of annotated tags (<tag>^{}), raising ValueError if data isn't
+    one.
+    """
+    refs = []
+    pos = 0
+    service = None
+    while pos < len(data):
+        length = int(data[pos:pos + 4], 16)
+        if length == 0:
+            # flush-pkt
+            pos += 4
+            continue
+        line = data[pos + 4:pos + length]
+        if length < 4 or len(line) != length - 4:
+            raise ValueError('Invalid pkt-line at offset %d' % pos)
+        pos += length
+        # the first ref is followed by the capabilities
+        line = line.rstrip(b'\n').split(b'\0')[0].decode('utf-8')
+        if service is None:
+            if line != '# service=' + UPLOAD_PACK_SERVICE:
+                raise ValueError('Not a smart HTTP ref advertisement')
+            service = line
+            continue
+        commit, _, ref = line.partition(' ')
+        if not re.match(r'^[0-9a-f]{40}$', commit) or not ref:
+            raise ValueError("Invalid ref line '%s'" % line)
+        # advertised instead of the refs of an empty repository
+        if ref != 'capabilities^{}':
+            refs.append((commit, ref))
+    if service is None:
+        raise ValueError('Not a smart HTTP ref advertisement')
+    return refs
+
+
+def filter_refs(refs, args):
+    """
+    Return the (commit, ref) pairs of refs which "git ls-remote <args>"
+    prints, args being patterns and LS_REMOTE_OPTIONS.
+    """
+    patterns = [arg for arg in args if not arg.startswith('-')]
+    prefixes = []
+    if set(args) & set(TAGS_OPTIONS):
+        prefixes.append('refs/tags/')
+    if set(args) & set(HEADS_OPTIONS):
+        prefixes.append('refs/heads/')
+    # as git, a pattern matches the end of the ref after a slash
+    return [
+        (commit, ref) for commit, ref in refs
+        if (not prefixes or ref.startswith(tuple(prefixes))) and
+        ('--refs' not in args or
+         ref.startswith('refs/') and not ref.endswith('^{}')) and
+        (not patterns or any(fnmatchcase('/' + ref, '*/' + pattern)
+                             for pattern in patterns))]
+
+
+def is_rate_limited(response):
+    if response.status_code == 429:
+        return True
+    # GitHub signals its (secondary) rate limits with 403 responses
+    return response.status_code == 403 and (
+        'Retry-After' in response.headers or
+        response.headers.get('X-RateLimit-Remaining') == '0')
+
+
+class Fetcher:
+    """
+    Fetches files over a shared keep-alive session, so that connections to
+    e.g. raw.githubusercontent.com are reused between requests. The number
+    of concurrent requests to each host adapts to its rate limiting, between
+    1 and max_per_host (see ConcurrencyLimit), and a host which keeps
+    failing is not contacted for a while (see CircuitBreaker).
+
+    The refs of HTTP git repositories are listed in-process over the same
+    session, falling back to "git ls-remote" if this fails (smart_http).
+
+    Each operation type (op) has its own timeout. With hedging enabled, a
+    second identical request is started when the first one takes longer
+    than the 95th percentile latency of its type, and whichever finishes
+    first is used.
+    """
+    def __init__(self, max_per_host=16, initial_per_host=4, timeout=60,
+                 circuit_breaker=None, rate_limit_retries=3, timeouts=None,
+                 hedge=False, smart_http=True):
+        self.max_per_host = max_per_host
+        self.initial_per_host = initial_per_host
+        self.timeout = timeout
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.hedge = hedge
+        self.smart_http = smart_http
+        # hosts on which listing the refs in-process failed, and those which
+        # don't support it, see _ls_remote
+        self.smart_http_failed = set()
+        self.dumb_hosts = set()
+        self.latency_stats = LatencyStats()
+        self.hedge_stats = Counter()
+        self.hedge_executor = None
+        # see superflore.Cassette
+        self.cassette = None
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.rate_limit_retries = rate_limit_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.lock = threading.Lock()
+        self.host_limits = dict()
+        self.host_stats = dict()
+
+    def get_host_limit(self, host):
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = ConcurrencyLimit(
+                    initial=self.initial_per_host, maximum=self.max_per_host)
+            return self.host_limits[host]
+
+    def _count_rate_limited(self, host):
+        with self.lock:
+            self.host_stats.setdefault(host, HostStats()).rate_limited += 1
+
+    def _record(self, host, secs, failed):
+        with self.lock:
+            self.host_stats.setdefault(host, HostStats()).add(secs, failed)
+
+    def set_timeouts(self, timeouts):
+        """Set the timeouts of operation types from 'op=secs' strings"""
+        for timeout in timeouts:
+            op, _, secs = timeout.partition('=')
+            try:
+                self.timeouts[op.strip()] = float(secs)
+            except ValueError:
+                raise ValueError(
+                    "Invalid timeout '{0}', expected OP=SECS".format(timeout))
+
+    def get_timeout(self, op):
+        return self.timeouts.get(op, self.timeout)
+
+    def _timed(self, op, callback, *args):
+        start = time.monotonic()
+        result = callback(*args)
+        self.latency_stats.add(op, time.monotonic() - start)
+        return result
+
+    def _call(self, op, callback, *args):
+        """Call callback, hedging it if enabled"""
+        delay = None
+        if self.hedge:
+            delay = self.latency_stats.get_percentile(
+                op, 95, min_samples=HEDGE_MIN_SAMPLES)
+        if delay is None:
+            return self._timed(op, callback, *args)
+        with self.lock:
+            if not self.hedge_executor:
+                self.hedge_executor = ThreadPoolExecutor(
+                    max_workers=4 * self.max_per_host)
+        attempts = [self.hedge_executor.submit(
+            self._timed, op, callback, *args)]
+        done, _ = wait(attempts, timeout=delay)
+        if not done:
+            with self.lock:
+                self.hedge_stats[op, 'hedged'] += 1
+            attempts.append(self.hedge_executor.submit(
+                self._timed, op, callback, *args))
+        # the slower attempt is left to finish in the background
+        pending = attempts
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    if attempt is not attempts[0]:
+                        with self.lock:
+                            self.hedge_stats[op, 'won'] += 1
+                    return attempt.result()
+        # every attempt failed
+        return attempts[0].result()
+
+    def get(self, url, timeout=None, op='http'):
+        """Return the body of url, raising on any non-2xx response"""
+        timeout = timeout or self.get_timeout(op)
+        if self.cassette:
+            return self.cassette.play(
+                'http', url, self._call, op, self._get, url, timeout)
+        return self._call(op, self._get, url, timeout)
+
+    def get_if_modified(self, url, etag=None, last_modified=None,
+                        timeout=None, op='http'):
+        """
+        Return the body of url with its ETag and Last-Modified headers, or
+        None as body if it didn't change since the response with etag and
+        last_modified.
+        """
+        timeout = timeout or self.get_timeout(op)
+        if self.cassette:
+            return self.get(url, timeout, op), None, None
+        headers = dict()
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return self._call(
+            op, self._get, url, timeout, headers, self._read_if_modified)
+
+    def _read_if_modified(self, response, deadline):
+        if response.status_code == 304:
+            body = None
+        else:
+            body = self._read(response, deadline)
+        return body, response.headers.get('ETag'), \
+            response.headers.get('Last-Modified')
+
+    def sha256(self, url, timeout=None, op='archive'):
+        """
+        Return the sha256 of the body of url, read in chunks of CHUNK_SIZE
+        rather than kept in memory.
+        """
+        timeout = timeout or self.get_timeout(op)
+        if self.cassette:
+            return self.cassette.play(
+                'sha256', url, self._call, op, self._get, url, timeout, None,
+                self._sha256)
+        return self._call(op, self._get, url, timeout, None, self._sha256)
+
+    def _get(self, url, timeout, headers=None, read=None):
+        host = urlparse(url).netloc
+        try:
+            self.circuit_breaker.check(host)
+        except HostUnavailable:
+            with self.lock:
+                self.host_stats.setdefault(host, HostStats()).rejected += 1
+            raise
+        host_limit = self.get_host_limit(host)
+        for attempt in range(self.rate_limit_retries + 1):
+            acquired = host_limit.acquire()
+            failed = True
+            # only errors of the host itself count for the circuit breaker,
+            # not e.g. a missing file
+            host_failed = True
+            rate_limited = False
+            retry_after = None
+            response = None
+            try:
+                response = self.session.get(
+                    url, timeout=timeout, stream=True, headers=headers)
+                host_failed = response.status_code >= 500
+                rate_limited = is_rate_limited(response)
+                if rate_limited:
+                    retry_after = get_retry_after(response)
+                    self._count_rate_limited(host)
+                    if attempt < self.rate_limit_retries:
+                        continue
+                response.raise_for_status()
+                content = (read or self._read)(response, acquired + timeout)
+                failed = False
+                return content
+            finally:
+                if response is not None:
+                    response.close()
+                host_limit.release(acquired, rate_limited, retry_after)
+                self._record(host, time.monotonic() - acquired, failed)
+                self.circuit_breaker.record(host, host_failed)
+
+    def _read(self, response, deadline):
+        # the timeout of requests only applies to each read, so a server
+        # trickling the response would keep us waiting indefinitely
+        chunks = []
+        for chunk in response.iter_content(chunk_size=16 * 1024):
+            if time.monotonic() > deadline:
+                raise requests.Timeout(
+                    "Reading '{0}' timed out".format(response.url))
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _sha256(self, response, deadline):
+        sha256 = hashlib.sha256()
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if time.monotonic() > deadline:
+                raise requests.Timeout(
+                    "Reading '{0}' timed out".format(response.url))
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def ls_remote(self, repo_url, *refs, timeout=None, op='ls-remote'):
+        """
+        Return the output of "git ls-remote repo_url refs", sharing the
+        concurrency limit of the repository's host with the HTTP fetches.
+        """
+        timeout = timeout or self.get_timeout(op)
+        if self.cassette:
+            return self.cassette.play(
+                'ls-remote', ' '.join((repo_url,) + refs), self._call, op,
+                self._ls_remote, repo_url, refs, timeout)
+        return self._call(op, self._ls_remote, repo_url, refs, timeout)
+
+    def _ls_remote(self, repo_url, refs, timeout):
+        host = urlparse(repo_url).netloc
+        with self.lock:
+            smart_http = self.smart_http and host not in self.dumb_hosts and \
+                urlparse(repo_url).scheme in ('http', 'https') and all(
+                    ref in LS_REMOTE_OPTIONS for ref in refs
+                    if ref.startswith('-'))
+        if smart_http:
+            try:
+                return self._ls_remote_http(repo_url, refs, timeout)
+            except (requests.RequestException, HostUnavailable,
+                    ValueError) as e:
+                with self.lock:
+                    first = host not in self.smart_http_failed
+                    self.smart_http_failed.add(host)
+                    # e.g. a dumb HTTP server, not worth asking again
+                    if isinstance(e, ValueError):
+                        self.dumb_hosts.add(host)
+                if first:
+                    warn("Failed to list the refs of '{0}' over HTTP, "
+                         "using git: {1}".format(repo_url, e))
+        return self._ls_remote_git(repo_url, refs, timeout)
+
+    def _ls_remote_http(self, repo_url, refs, timeout):
+        data = self._get(
+            '{0}/info/refs?service={1}'.format(
+                repo_url.rstrip('/'), UPLOAD_PACK_SERVICE),
+            timeout, headers=SMART_HTTP_HEADERS)
+        return '\n'.join(
+            '{0}\t{1}'.format(commit, ref) for commit, ref in
+            filter_refs(parse_ref_advertisement(data), refs))
+
+    def _ls_remote_git(self, repo_url, refs, timeout):
+        host = urlparse(repo_url).netloc
+        host_limit = self.get_host_limit(host)
+        for attempt in range(self.rate_limit_retries + 1):
+            acquired = host_limit.acquire()
+            failed = True
+            rate_limited = False
+            try:
+                # options after the repository would be taken as patterns
+                output = Git().execute(
+                    ['git', 'ls-remote'] +
+                    [ref for ref in refs if ref.startswith('-')] +
+                    [repo_url] +
+                    [ref for ref in refs if not ref.startswith('-')],
+                    kill_after_timeout=timeout)
+                failed = False
+                return output
+            except GitCommandError as e:
+                rate_limited = bool(re.search(
+                    r'\b429\b|rate limit', str(e.stderr), re.IGNORECASE))
+                if rate_limited:
+                    self._count_rate_limited(host)
+                if not rate_limited or attempt == self.rate_limit_retries:
+                    raise
+            finally:
+                host_limit.release(acquired, rate_limited)
+                self._record(host, time.monotonic() - acquired, failed)
+
+    def get_host_stats(self):
+        with self.lock:
+            host_stats = {
+                host: dict(vars(stats))
+                for host, stats in self.host_stats.items()
+            }
+            host_limits = dict(self.host_limits)
+        for host, host_limit in host_limits.items():
+            stats = host_stats.setdefault(host, vars(HostStats()))
+            stats['limit'] = host_limit.get_limit()
+            stats['lowest_limit'] = int(host_limit.lowest)
+        return host_stats
+
+    def log_host_stats(self):
+        for host, stats in sorted(self.get_host_stats().items()):
+            msg = '{0}: {1} requests ({2} failed)'.format(
+                host, stats['requests'], stats['failures'])
+            if stats['requests']:
+                msg += ', {0:.2f}s average, {1:.2f}s max'.format(
+                    stats['total_secs'] / stats['requests'],
+                    stats['max_secs'])
+            if stats['rate_limited']:
+                msg += ', {0} rate limited (concurrency lowered to ' \
+                    '{1})'.format(stats['rate_limited'], stats['lowest_limit'])
+            if 'limit' in stats:
+                msg += ', concurrency limit {0}'.format(stats['limit'])
+            if stats['rejected']:
+                msg += ', {0} not sent while suspended'.format(
+                    stats['rejected'])
+            info(msg)
+
+    def log_op_stats(self):
+        with self.lock:
+            hedge_stats = Counter(self.hedge_stats)
+        for op, stats in sorted(self.latency_stats.get_summary().items()):
+            msg = '{0}: {1} done, {2:.2f}s p50, {3:.2f}s p95, {4:.2f}s ' \
+                'p99, {5:.2f}s max'.format(
+                    op, stats['count'], stats['p50'], stats['p95'],
+                    stats['p99'], stats['max'])
+            if hedge_stats[op, 'hedged']:
+                msg += ', {0} hedged ({1} won)'.format(
+                    hedge_stats[op, 'hedged'], hedge_stats[op, 'won'])
+            info(msg)
+
+
+fetcher = Fetcher()
@@ -12,8 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
+
 from rosinstall_generator.distro import get_package_names
+from superflore.CacheStats import cache_stats
 from superflore.exceptions import UnknownBuildType
+from superflore.fetcher import fetcher
+from superflore.manifest_provider import log_manifest_stats
+from superflore.RetryPolicy import log_retry_stats
 from superflore.utils import err
 from superflore.utils import get_pkg_version
 from superflore.utils import info
@@ -39,59 +45,92 @@ def generate_installers(
     succeeded = 0
     failed = 0
     what_generating = 'recipe' if kwargs.get('is_oe', False) else 'ebuild'
+    jobs = kwargs.get('jobs') or 1
+
+    def gen_pkg(pkg):
+        return gen_pkg_func(overlay, pkg, distro, preserve_existing, *args)
+
+    # With more than one job, the packages are generated on a worker pool,
+    # but the results are still collected in sorted package order below so
+    # that the counters, changes and messages match those of a serial run.
+    executor = None
+    pending = dict()
+    if jobs > 1:
+        executor = ThreadPoolExecutor(max_workers=jobs)
+        for pkg in sorted(pkg_names[0]):
+            if 'skip_keys' in kwargs and pkg in kwargs['skip_keys']:
+                continue
+            pending[pkg] = executor.submit(gen_pkg, pkg)
 
     info("Generating %ss for distro '%s'" % (what_generating, distro_name))
-    for i, pkg in enumerate(sorted(pkg_names[0])):
-        if 'skip_keys' in kwargs and pkg in kwargs['skip_keys']:
-            warn("Package '%s' is in skip-keys list, skipping..." % pkg)
-            continue
-        version = get_pkg_version(distro, pkg, **kwargs)
-        percent = '%.1f' % (100 * (float(i) / total))
-        try:
-            current, current_info, installer_name = gen_pkg_func(
-                overlay, pkg, distro, preserve_existing, *args
-            )
-            if not current:
-                if current_info:
-                    # we are missing dependencies
-                    borkd_pkgs[pkg] = current_info
-                elif preserve_existing:
-                    # don't replace the installer
-                    succeeded += 1
-                    continue
-                failed_msg = "{0}%: Failed to generate".format(percent)
-                failed_msg += " %s for package '%s'!" % (what_generating, pkg)
-                err(failed_msg)
-                failed = failed + 1
+    try:
+        for i, pkg in enumerate(sorted(pkg_names[0])):
+            if 'skip_keys' in kwargs and pkg in kwargs['skip_keys']:
+                warn("Package '%s' is in skip-keys list, skipping..." % pkg)
                 continue
-            success_msg = 'Successfully generated %s for package' % \
-                what_generating
-            ok('{0}%: {1} \'{2}\'.'.format(percent, success_msg, pkg))
-            succeeded += 1
-            if not current_info:
-                changes.append('{0} {1}'.format(installer_name, version))
-            elif current_info != version:
-                changes.append(
-                    '{0} {1} --> {2}'.format(
-                        installer_name, current_info, version
+            version = get_pkg_version(distro, pkg, **kwargs)
+            percent = '%.1f' % (100 * (float(i) / total))
+            try:
+                if executor:
+                    result = pending.pop(pkg).result()
+                else:
+                    result = gen_pkg(pkg)
+                current, current_info, installer_name = result
+                if not current:
+                    if current_info:
+                        # we are missing dependencies
+                        borkd_pkgs[pkg] = current_info
+                    elif preserve_existing:
+                        # don't replace the installer
+                        succeeded += 1
+                        continue
+                    failed_msg = "{0}%: Failed to generate".format(percent)
+                    failed_msg += " %s for package '%s'!" % (
+                        what_generating, pkg)
+                    err(failed_msg)
+                    failed = failed + 1
+                    continue
+                success_msg = 'Successfully generated %s for package' % \
+                    what_generating
+                ok('{0}%: {1} \'{2}\'.'.format(percent, success_msg, pkg))
+                succeeded += 1
+                if not current_info:
+                    changes.append('{0} {1}'.format(installer_name, version))
+                elif current_info != version:
+                    changes.append(
+                        '{0} {1} --> {2}'.format(
+                            installer_name, current_info, version
+                        )
+                    )
+                installers.append(pkg)
+            except UnknownBuildType as ub:
+                err(
+                    "{0}%: Unknown Build type '{1}' for package '{2}'".format(
+                        percent, str(ub), pkg
                     )
                 )
-            installers.append(pkg)
-        except UnknownBuildType as ub:
-            err(
-                "{0}%: Unknown Build type '{1}' for package '{2}'".format(
-                    percent, str(ub), pkg
-                )
-            )
-            failed = failed + 1
-        except KeyError:
-            failed_msg = 'Failed to generate %s' % what_generating
-            err("{0}%: {1} for package {2}!".format(percent, failed_msg, pkg))
-            bad_installers.append(pkg)
-            failed = failed + 1
+                failed = failed + 1
+            except KeyError:
+                failed_msg = 'Failed to generate %s' % what_generating
+                err("{0}%: {1} for package {2}!".format(
+                    percent, failed_msg, pkg))
+                bad_installers.append(pkg)
+                failed = failed + 1
+    finally:
+        if executor:
+            # drop any queued work if we bail out early
+            for future in pending.values():
+                future.cancel()
+            executor.shutdown()
     results = 'Generated {0} / {1}'.format(succeeded, failed + succeeded)
     results += ' for distro {0}'.format(distro_name)
     info("------ {0} ------\n".format(results))
+    log_manifest_stats()
+    fetcher.log_host_stats()
+    fetcher.log_op_stats()
+    log_retry_stats()
+    cache_stats.log()
+    cache_stats.save()
 
     if len(borkd_pkgs) > 0:
         warn("Unresolved:")
@@ -12,34 +12,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
+import weakref
+
 from catkin_pkg.package import InvalidPackage
-from rosdistro.dependency_walker import DependencyWalker
 from rosdistro.manifest_provider import get_release_tag
 from rosdistro.rosdistro import RosPackage
 from rosinstall_generator.distro import _generate_rosinstall
 from rosinstall_generator.distro import get_package_names
+from superflore.CompactDistro import get_dependency_walker
 from superflore.exceptions import NoPkgXml
 from superflore.generators.bitbake.yocto_recipe import yoctoRecipe
+from superflore.manifest_provider import get_package_xml
 from superflore.utils import err
 from superflore.utils import get_pkg_version
+from superflore.utils import info
 from superflore.utils import make_dir
 from superflore.utils import ok
-from superflore.utils import retry_on_exception
 from superflore.utils import warn
 
 org = "Open Source Robotics Foundation"
+# the result of get_package_names for each distro
+_package_names = weakref.WeakKeyDictionary()
+
+
+def _get_package_names(rosdistro):
+    """Like get_package_names, but only walks the distro once"""
+    if rosdistro not in _package_names:
+        released_names, unreleased_names = get_package_names(rosdistro)
+        _package_names[rosdistro] = (set(released_names), unreleased_names)
+    return _package_names[rosdistro]
 
 
 def regenerate_pkg(
     overlay, pkg, rosdistro, preserve_existing, srcrev_cache,
     skip_keys
 ):
-    pkg_names = get_package_names(rosdistro)[0]
-    if pkg not in pkg_names:
+    pkg_names = _get_package_names(rosdistro)
+    if pkg not in pkg_names[0]:
         yoctoRecipe.not_generated_recipes.add(pkg)
         raise RuntimeError("Unknown package '%s' available packages"
-                           " in selected distro: %s" %
-                           (pkg, get_package_names(rosdistro)))
+                           " in selected distro: %s" % (pkg, pkg_names))
     try:
         version = get_pkg_version(rosdistro, pkg, is_oe=True)
     except KeyError as ke:
@@ -55,7 +68,8 @@ def regenerate_pkg(
         rosdistro.name,
         recipe
     )
-    existing = overlay.repo.git.status('--porcelain', '--', prefix)
+    with overlay.repo.lock:
+        existing = overlay.repo.git.status('--porcelain', '--', prefix)
     if existing:
         # The git status --porcelain output will look like this:
         # D  meta-ros2-eloquent/generated-recipes/variants/ros-base_0.8.3-1.bb
@@ -162,8 +176,8 @@ def _gen_recipe_for_package(
     rosdistro, pkg_name, pkg, repo, ros_pkg,
     pkg_rosinstall, srcrev_cache, skip_keys
 ):
-    pkg_names = get_package_names(rosdistro)
-    pkg_dep_walker = DependencyWalker(
+    pkg_names = _get_package_names(rosdistro)
+    pkg_dep_walker = get_dependency_walker(
         rosdistro,
         evaluate_condition_context=yoctoRecipe._get_condition_context(
             rosdistro.name))
@@ -179,9 +193,9 @@ def _gen_recipe_for_package(
 
     # parse through package xml
     err_msg = 'Failed to fetch metadata for package {}'.format(pkg_name)
-    pkg_xml = retry_on_exception(ros_pkg.get_package_xml, rosdistro.name,
-                                 retry_msg='Could not get package xml!',
-                                 error_msg=err_msg)
+    pkg_xml = get_package_xml(rosdistro, ros_pkg,
+                              retry_msg='Could not get package xml!',
+                              error_msg=err_msg)
 
     pkg_recipe = yoctoRecipe(
         pkg.repository_name,
@@ -220,6 +234,99 @@ def _gen_recipe_for_package(
     return pkg_recipe
 
 
+def get_repo_src_uri(repo):
+    """Return the URL of repo as yoctoRecipe.get_repo_src_uri would"""
+    repo_src_uri = repo.url.replace('https://', '')
+    if repo_src_uri.endswith('.git'):
+        repo_src_uri = repo_src_uri[:-len('.git')]
+    return repo_src_uri
+
+
+def get_src_uris(repo):
+    """Map the src_uri of each package of release repository repo to its tag"""
+    return {get_src_uri(repo, pkg_name): get_release_tag(repo, pkg_name)
+            for pkg_name in repo.package_names}
+
+
+def get_src_uri(repo, pkg_name):
+    """Return the release archive of pkg_name in release repository repo"""
+    return _generate_rosinstall(
+        pkg_name, repo.url, get_release_tag(repo, pkg_name),
+        True)[0]['tar']['uri']
+
+
+def fill_srcrev_cache(repo, srcrev_cache):
+    """
+    Look up the SRCREVs of all the packages of release repository repo at
+    once, rather than with one git ls-remote per package. Return the tags
+    which were not found.
+    """
+    if 'github.com' not in repo.url:
+        return []
+    return yoctoRecipe.fill_srcrev_cache(
+        srcrev_cache, get_repo_src_uri(repo), get_src_uris(repo))
+
+
+def prefetch_srcrevs(rosdistro, pkg_names, srcrev_cache, jobs=None):
+    """
+    Look up the SRCREVs of the packages pkg_names before generating their
+    recipes, one release repository per job, and report all the failures.
+    Return the number of repositories which failed.
+    """
+    repos = dict()
+    for pkg_name in pkg_names:
+        pkg = rosdistro.release_packages.get(pkg_name)
+        if pkg:
+            repos[pkg.repository_name] = \
+                rosdistro.repositories[pkg.repository_name].release_repository
+    info("Looking up the SRCREVs of %d repositories" % len(repos))
+    with ThreadPoolExecutor(max_workers=jobs or 1) as executor:
+        futures = {
+            repo_name: executor.submit(fill_srcrev_cache, repo, srcrev_cache)
+            for repo_name, repo in repos.items()}
+    failed = 0
+    for repo_name, future in sorted(futures.items()):
+        try:
+            missing = future.result()
+        except Exception as e:
+            err("Failed to look up the SRCREVs of repository '%s': %s" %
+                (repo_name, e))
+            failed += 1
+            continue
+        if missing:
+            err("Tags not found in repository '%s': %s" %
+                (repo_name, ', '.join(missing)))
+            failed += 1
+    if failed:
+        err("Failed to look up the SRCREVs of %d / %d repositories" %
+            (failed, len(repos)))
+    return failed
+
+
+def prefetch_checksums(rosdistro, pkg_names, jobs=None):
+    """
+    Compute the sha256 of the release archives of the packages pkg_names
+    before generating their recipes (see yoctoRecipe.get_sha256), jobs at
+    a time, each download taking at most fetcher.CHUNK_SIZE of memory.
+    Return the number of archives which failed.
+    """
+    src_uris = set()
+    for pkg_name in pkg_names:
+        pkg = rosdistro.release_packages.get(pkg_name)
+        if pkg:
+            src_uris.add(get_src_uri(
+                rosdistro.repositories[pkg.repository_name]
+                .release_repository, pkg_name))
+    info("Computing the sha256 of %d release archives" % len(src_uris))
+    with ThreadPoolExecutor(max_workers=jobs or 1) as executor:
+        sha256s = list(executor.map(yoctoRecipe.get_sha256, sorted(src_uris)))
+    failed = sha256s.count(None)
+    if failed:
+        err("Failed to compute the sha256 of %d / %d release archives" %
+            (failed, len(src_uris)))
+    return failed
+
+
 class oe_recipe(object):
     def __init__(
         self, rosdistro, pkg_name, srcrev_cache, skip_keys
@@ -231,6 +338,7 @@ class oe_recipe(object):
         pkg_rosinstall = _generate_rosinstall(
             pkg_name, repo.url, get_release_tag(repo, pkg_name), True
         )
+        fill_srcrev_cache(ros_pkg.repository, srcrev_cache)
 
         self.recipe = _gen_recipe_for_package(
             rosdistro, pkg_name, pkg, repo, ros_pkg, pkg_rosinstall,
@@ -15,21 +15,29 @@
 import os
 import sys
 
-from rosinstall_generator.distro import get_distro
 from rosinstall_generator.distro import get_package_names
-from superflore.CacheManager import CacheManager
+from superflore.CompactDistro import CompactDistro
+from superflore.distro_snapshot import get_distro
+from superflore.distro_snapshot import get_light_distro
 from superflore.generate_installers import generate_installers
+from superflore.generators.bitbake.gen_packages import prefetch_checksums
+from superflore.generators.bitbake.gen_packages import prefetch_srcrevs
 from superflore.generators.bitbake.gen_packages import regenerate_pkg
 from superflore.generators.bitbake.ros_meta import RosMeta
 from superflore.generators.bitbake.yocto_recipe import yoctoRecipe
+from superflore.manifest_provider import DISTRIBUTION_CACHE
+from superflore.parser import configure_fetching
 from superflore.parser import get_parser
 from superflore.repo_instance import RepoInstance
+from superflore.SqliteCache import SqliteCache
 from superflore.TempfileManager import TempfileManager
 from superflore.utils import clean_up
 from superflore.utils import err
 from superflore.utils import file_pr
 from superflore.utils import gen_delta_msg
+from superflore.utils import get_checksum_filename
 from superflore.utils import get_pr_text
+from superflore.utils import get_srcrev_filename
 from superflore.utils import get_utcnow_timestamp_str
 from superflore.utils import info
 from superflore.utils import load_pr
@@ -51,14 +59,25 @@ def main():
         help='location to store archived packages',
         type=str
     )
+    parser.add_argument(
+        '--tarball-checksums',
+        help='add the sha256 of the release archive to each recipe, '
+             'cached in --tar-archive-dir',
+        action='store_true'
+    )
     args = parser.parse_args(sys.argv[1:])
     pr_comment = args.pr_comment
+    if args.manifest_provider == DISTRIBUTION_CACHE:
+        # LIC_FILES_CHKSUM has to be computed from the verbatim package.xml
+        parser.error('Invalid args! the distribution cache only has '
+                     'sanitized package.xml files')
+    configure_fetching(parser, args)
     skip_keys = set(args.skip_keys) if args.skip_keys else set()
 
     ######################
     if args.input_repos:
         import yaml
-        distro = get_distro(args.ros_distro)
+        distro = get_light_distro(args.ros_distro)
         file_paths = args.input_repos
         repos = []
         for file_path in file_paths:
@@ -134,13 +153,21 @@ def main():
         # generate installers
         total_installers = dict()
         total_changes = dict()
-        if args.tar_archive_dir:
-            srcrev_filename = '%s/srcrev_cache.pickle' % args.tar_archive_dir
-        else:
-            srcrev_filename = None
-        with CacheManager(srcrev_filename) as srcrev_cache:
+        srcrev_filename = get_srcrev_filename(args.tar_archive_dir)
+        checksum_filename = get_checksum_filename(args.tar_archive_dir) \
+            if args.tarball_checksums else None
+        with SqliteCache(srcrev_filename) as srcrev_cache, \
+                SqliteCache(checksum_filename) as checksum_cache:
+            if args.tarball_checksums:
+                yoctoRecipe.checksum_cache = checksum_cache
             if args.only:
-                distro = get_distro(args.ros_distro)
+                # only the requested package.xml files are needed, not the
+                # whole distribution cache
+                distro = get_light_distro(args.ros_distro)
+                pkg_names = [pkg for pkg in args.only if pkg not in skip_keys]
+                prefetch_srcrevs(distro, pkg_names, srcrev_cache, args.jobs)
+                if args.tarball_checksums:
+                    prefetch_checksums(distro, pkg_names, args.jobs)
                 for pkg in args.only:
                     if pkg in skip_keys:
                         warn("Package '%s' is in skip-keys list, skipping..."
@@ -187,7 +214,14 @@ def main():
             overlay.clean_ros_recipe_dirs(args.ros_distro)
             for adistro in selected_targets:
                 yoctoRecipe.reset()
-                distro = get_distro(adistro)
+                distro = CompactDistro(
+                    get_distro(adistro),
+                    yoctoRecipe._get_condition_context(adistro))
+                pkg_names = [pkg for pkg in get_package_names(distro)[0]
+                             if pkg not in skip_keys]
+                prefetch_srcrevs(distro, pkg_names, srcrev_cache, args.jobs)
+                if args.tarball_checksums:
+                    prefetch_checksums(distro, pkg_names, args.jobs)
 
                 distro_installers, _, distro_changes =\
                     generate_installers(
@@ -199,6 +233,7 @@ def main():
                         skip_keys,
                         skip_keys=skip_keys,
                         is_oe=True,
+                        jobs=args.jobs,
                     )
                 total_changes[adistro] = distro_changes
                 total_installers[adistro] = distro_installers
@@ -26,9 +26,15 @@
 from collections import defaultdict
 import hashlib
 from subprocess import DEVNULL, PIPE, Popen
+from tempfile import TemporaryFile
+import threading
+import time
 
+from superflore.CacheBackend import get_shared_cache
+from superflore.CacheStats import cache_stats
 from superflore.exceptions import NoPkgXml
 from superflore.exceptions import UnresolvedDependency
+from superflore.fetcher import fetcher
 from superflore.PackageMetadata import PackageMetadata
 from superflore.utils import err
 from superflore.utils import get_distros
@@ -59,14 +65,25 @@ class yoctoRecipe(object):
     not_generated_recipes = set()
     platform_deps = set()
     max_component_name = 0
+    # guards the class-level state above when recipes are generated by
+    # several workers at once
+    lock = threading.RLock()
+    # repositories whose SRCREVs fill_srcrev_cache looked up, with a lock
+    # each so that only one worker calls git ls-remote for them
+    srcrev_repos = set()
+    srcrev_locks = defaultdict(threading.Lock)
+    # the sha256 of the release archive of each src_uri, None unless the
+    # recipes should include them (see get_sha256)
+    checksum_cache = None
 
     def __init__(
         self, component_name, num_pkgs, pkg_name, pkg_xml, rosdistro, src_uri,
         srcrev_cache, skip_keys
     ):
         self.component = component_name
-        yoctoRecipe.max_component_name = max(
-            yoctoRecipe.max_component_name, len(component_name))
+        with yoctoRecipe.lock:
+            yoctoRecipe.max_component_name = max(
+                yoctoRecipe.max_component_name, len(component_name))
         self.oe_component = yoctoRecipe.convert_to_oe_name(component_name)
         self.num_pkgs = num_pkgs
         self.name = pkg_name
@@ -122,8 +139,12 @@ class yoctoRecipe(object):
         self.license_line = None
         self.license_md5 = None
         if self.src_uri not in srcrev_cache:
+            start = time.monotonic()
             srcrev_cache[self.src_uri] = self.get_srcrev()
+            cache_stats.miss('SRCREV', time.monotonic() - start)
         self.srcrev = srcrev_cache[self.src_uri]
+        self.sha256 = yoctoRecipe.get_sha256(self.src_uri) \
+            if yoctoRecipe.checksum_cache is not None else None
         self.skip_keys = skip_keys
 
     def get_license_line(self):
@@ -184,28 +205,131 @@ class yoctoRecipe(object):
             dirs[3], dirs[4], dirs[5], dirs[6]).replace('.tar.gz', '')
 
     def get_srcrev(self):
+        return yoctoRecipe.fetch_srcrev(
+            self.get_repo_src_uri(), self.get_repo_tag_name())
+
+    @staticmethod
+    def _get_srcrev_name(repo_src_uri, tag_name):
+        return hashlib.sha256('{0}\n{1}'.format(
+            repo_src_uri, tag_name).encode()).hexdigest()
+
+    @staticmethod
+    def fetch_srcrev(repo_src_uri, tag_name):
+        """
+        Look up the commit of release tag tag_name in the repository
+        repo_src_uri (see get_repo_src_uri and get_repo_tag_name), in the
+        shared cache first (see set_shared_cache).
+        """
         # e.g. git ls-remote https://github.com/ros2-gbp/ament_lint-release \
         #                    release/bouncy/ament_cmake_copyright/0.5.2-0
         # 48bf1aa1cb083a884fbc8520ced00523255aeaed \
         #     refs/tags/release/bouncy/ament_cmake_copyright/0.5.2-0
         # from https://github.com/ros2-gbp/ament_lint-release/archive/ \
         #     release/bouncy/ament_cmake_copyright/0.5.2-0.tar.gz
-        from git.cmd import Git
-
-        g = Git()
-        for ref in g.execute(["git",
-                              "ls-remote",
-                              "https://%s" % self.get_repo_src_uri(),
-                              "refs/tags/%s" % self.get_repo_tag_name()
-                              ]).split('\n'):
-            srcrev, tag = ref.split('\t')
-            if tag == "refs/tags/%s" % self.get_repo_tag_name():
-                return srcrev
+        srcrev = yoctoRecipe.fetch_srcrevs(
+            repo_src_uri, [tag_name], "refs/tags/%s" % tag_name).get(tag_name)
+        if srcrev:
+            return srcrev
         err("Cannot map refs/tags/%s to srcrev in https://%s repository with "
-            "git ls-remote" % (self.get_repo_tag_name(),
-                               self.get_repo_src_uri()))
+            "git ls-remote" % (tag_name, repo_src_uri))
         return "INVALID"
 
+    @staticmethod
+    def fetch_srcrevs(repo_src_uri, tag_names, *refs):
+        """
+        Look up the commits of all the release tags tag_names in the
+        repository repo_src_uri with a single "git ls-remote" of refs (all
+        the tags by default), in the shared cache first. Return a dict of
+        the tags found to their commits.
+        """
+        shared_cache = get_shared_cache()
+        srcrevs = dict()
+        pending = set()
+        for tag_name in tag_names:
+            srcrev = shared_cache.get(
+                'srcrev', yoctoRecipe._get_srcrev_name(
+                    repo_src_uri, tag_name)) if shared_cache else None
+            if srcrev:
+                srcrevs[tag_name] = srcrev.decode('ascii')
+            else:
+                pending.add(tag_name)
+        if not pending:
+            return srcrevs
+        output = fetcher.ls_remote(
+            "https://%s" % repo_src_uri, *(refs or ('--tags',)))
+        for ref in output.split('\n'):
+            if '\t' not in ref:
+                continue
+            srcrev, tag = ref.split('\t')
+            # the tag itself, as git ls-remote refs/tags/<tag> gives first,
+            # rather than the commit of an annotated tag (<tag>^{})
+            tag_name = tag[len('refs/tags/'):]
+            if tag.startswith('refs/tags/') and tag_name in pending:
+                pending.remove(tag_name)
+                srcrevs[tag_name] = srcrev
+                if shared_cache:
+                    shared_cache.put(
+                        'srcrev',
+                        yoctoRecipe._get_srcrev_name(repo_src_uri, tag_name),
+                        srcrev.encode('ascii'))
+        return srcrevs
+
+    @staticmethod
+    def fill_srcrev_cache(srcrev_cache, repo_src_uri, tag_names):
+        """
+        Add the SRCREVs of all the packages of the repository repo_src_uri
+        to srcrev_cache with a single "git ls-remote" (see fetch_srcrevs),
+        once per run; tag_names maps the src_uri of each package to its
+        release tag. Return the tags which were not found.
+        """
+        with yoctoRecipe.lock:
+            repo_lock = yoctoRecipe.srcrev_locks[repo_src_uri]
+        with repo_lock:
+            if repo_src_uri in yoctoRecipe.srcrev_repos:
+                return []
+            pending = dict()
+            for src_uri, tag_name in tag_names.items():
+                if src_uri in srcrev_cache:
+                    cache_stats.hit('SRCREV')
+                else:
+                    pending[src_uri] = tag_name
+            missing = []
+            if pending:
+                start = time.monotonic()
+                srcrevs = yoctoRecipe.fetch_srcrevs(
+                    repo_src_uri, pending.values())
+                secs = time.monotonic() - start
+                found = {src_uri: srcrevs[tag_name]
+                         for src_uri, tag_name in pending.items()
+                         if tag_name in srcrevs}
+                srcrev_cache.update(found)
+                # the missing ones are counted when looked up one by one
+                for _ in found:
+                    cache_stats.miss('SRCREV', secs / len(found))
+                missing = sorted(tag_name for tag_name in pending.values()
+                                 if tag_name not in srcrevs)
+            yoctoRecipe.srcrev_repos.add(repo_src_uri)
+            return missing
+
+    @staticmethod
+    def get_sha256(src_uri):
+        """
+        Return the sha256 of the release archive src_uri, streamed without
+        storing it, from checksum_cache if possible; None if it failed.
+        """
+        if src_uri in yoctoRecipe.checksum_cache:
+            cache_stats.hit('sha256')
+            return yoctoRecipe.checksum_cache[src_uri]
+        start = time.monotonic()
+        try:
+            sha256 = fetcher.sha256(src_uri)
+        except Exception as e:
+            err("Failed to compute the sha256 of '%s': %s" % (src_uri, e))
+            return None
+        yoctoRecipe.checksum_cache[src_uri] = sha256
+        cache_stats.miss('sha256', time.monotonic() - start)
+        return sha256
+
     def add_build_depend(self, bdepend, internal=True):
         if bdepend not in self.skip_keys:
             if internal:
@@ -354,13 +478,15 @@ class yoctoRecipe(object):
             try:
                 results = resolve_dep(dep, 'openembedded', self.distro)[0]
                 if not results:
-                    yoctoRecipe.rosdep_cache[dep] = []
+                    with yoctoRecipe.lock:
+                        yoctoRecipe.rosdep_cache[dep] = []
                     continue
                 for res in results:
                     recipe = self.convert_to_oe_name(res, is_native)
                     dependencies.add(recipe)
                     system_dependencies.add(recipe)
-                    yoctoRecipe.rosdep_cache[dep].add(res)
+                    with yoctoRecipe.lock:
+                        yoctoRecipe.rosdep_cache[dep].add(res)
                     info('External dependency add: ' + recipe)
             except UnresolvedDependency:
                 oe_dep = self.convert_to_oe_name(dep, is_native)
@@ -372,7 +498,8 @@ class yoctoRecipe(object):
                 rosdep_dep = self.convert_to_oe_name(dep, False)
                 rosdep_name = UNRESOLVED_DEP_REF_PREFIX\
                     + rosdep_dep + '}'
-                yoctoRecipe.rosdep_cache[dep].add(rosdep_name)
+                with yoctoRecipe.lock:
+                    yoctoRecipe.rosdep_cache[dep].add(rosdep_name)
                 info('Unresolved external dependency add: ' + recipe)
 
         return dependencies, system_dependencies
@@ -423,36 +550,32 @@ class yoctoRecipe(object):
         ret += 'ROS_CN = "' + self.component + '"\n'
         ret += 'ROS_BPN = "' + self.name + '"\n\n'
         # depends
-        deps, sys_deps = self.get_dependencies(
+        deps, platform_deps = self.get_dependencies(
             self.depends, self.depends_external)
-        yoctoRecipe.platform_deps |= sys_deps
         buildtool_native_deps, sys_deps = self.get_dependencies(
             self.buildtool_depends,
             self.buildtool_depends_external,
             is_native=True
         )
         native_deps = set(buildtool_native_deps)
-        yoctoRecipe.platform_deps |= sys_deps
+        platform_deps |= sys_deps
         export_deps, sys_deps = self.get_dependencies(
             self.export_depends, self.export_depends_external)
-        yoctoRecipe.platform_deps |= sys_deps
+        platform_deps |= sys_deps
         buildtool_export_native_deps, sys_deps = self.get_dependencies(
             self.buildtool_export_depends,
             self.buildtool_export_depends_external,
             is_native=True
         )
         native_deps |= buildtool_export_native_deps
-        yoctoRecipe.platform_deps |= sys_deps
-        yoctoRecipe.generated_native_recipes |= native_deps
+        platform_deps |= sys_deps
         exec_deps, sys_deps = self.get_dependencies(
             self.rdepends, self.rdepends_external)
-        yoctoRecipe.platform_deps |= sys_deps
+        platform_deps |= sys_deps
         test_deps, sys_deps = self.get_dependencies(self.tdepends,
                                                     self.tdepends_external)
-        yoctoRecipe.platform_deps |= sys_deps
-        yoctoRecipe.generated_non_test_deps |= deps | export_deps | \
-            native_deps | exec_deps
-        yoctoRecipe.generated_test_deps |= test_deps
+        platform_deps |= sys_deps
+        non_test_deps = deps | export_deps | native_deps | exec_deps
         ret += yoctoRecipe.generate_multiline_variable(
             'ROS_BUILD_DEPENDS', deps) + '\n'
         ret += yoctoRecipe.generate_multiline_variable(
@@ -466,12 +589,18 @@ class yoctoRecipe(object):
                 is_native=True
             )
             buildtool_export_native_deps |= ament_cmake_native_deps
-            yoctoRecipe.generated_non_test_deps |= ament_cmake_native_deps
-            yoctoRecipe.generated_native_recipes |= ament_cmake_native_deps
-            yoctoRecipe.platform_deps |= sys_deps
+            non_test_deps |= ament_cmake_native_deps
+            native_deps |= ament_cmake_native_deps
+            platform_deps |= sys_deps
         else:
             ret += yoctoRecipe.generate_multiline_variable(
                 'ROS_EXPORT_DEPENDS', export_deps) + '\n'
+        # the recipes may be generated in parallel
+        with yoctoRecipe.lock:
+            yoctoRecipe.platform_deps |= platform_deps
+            yoctoRecipe.generated_native_recipes |= native_deps
+            yoctoRecipe.generated_non_test_deps |= non_test_deps
+            yoctoRecipe.generated_test_deps |= test_deps
         ret += yoctoRecipe.generate_multiline_variable(
             'ROS_BUILDTOOL_EXPORT_DEPENDS',
             buildtool_export_native_deps) + '\n'
@@ -491,6 +620,8 @@ class yoctoRecipe(object):
         ret += 'RDEPENDS:${PN} += "${ROS_EXEC_DEPENDS}"' + '\n\n'
         # SRC_URI
         ret += '# matches with: ' + self.src_uri + '\n'
+        if self.sha256:
+            ret += '# sha256sum: ' + self.sha256 + '\n'
         ret += 'ROS_BRANCH ?= "branch=' + self.get_repo_branch_name() + '"\n'
         ret += 'SRC_URI = "git://' + self.get_repo_src_uri() + \
             ';${ROS_BRANCH};protocol=https"\n'
@@ -729,9 +860,8 @@ class yoctoRecipe(object):
             newer_sys_comps_dir)
         ros_version = yoctoRecipe._get_ros_version(distro)
         str_distro = 'ros' if ros_version == 1 else 'ros{}'.format(ros_version)
-        args1_wget = ['wget', '-O', '-', 'http://packages.ros.org/'
-                      + str_distro
-                      + '/ubuntu/dists/bionic/main/source/Sources.gz']
+        sources_url = 'http://packages.ros.org/' + str_distro \
+            + '/ubuntu/dists/bionic/main/source/Sources.gz'
         args2_gunzip = ['gunzip', '-']
         args3_grep = ['grep', '-E', '^(Package|Version|Build-Depends)']
         args4_awk = ['awk', '$1 ~ /^Package:/ && $2 !~ /^ros-/ '
@@ -741,16 +871,18 @@ class yoctoRecipe(object):
         args5_sort = ['sort', '-t', ';', '-k', '1,1']
         try:
             make_dir(newer_sys_comps_dir)
-            wget = Popen(args1_wget, stdout=PIPE, stderr=DEVNULL)
-            gunzip = Popen(args2_gunzip, stdin=wget.stdout,
-                           stdout=PIPE, stderr=DEVNULL)
+            with TemporaryFile() as sources:
+                sources.write(fetcher.get(sources_url, op='sources'))
+                sources.seek(0)
+                gunzip = Popen(args2_gunzip, stdin=sources,
+                               stdout=PIPE, stderr=DEVNULL)
             grep = Popen(args3_grep, stdin=gunzip.stdout,
                          stdout=PIPE, stderr=DEVNULL)
             awk = Popen(args4_awk, stdin=grep.stdout,
                         stdout=PIPE, stderr=DEVNULL)
             sort = Popen(args5_sort, env={'LC_ALL': 'C'},
                          stdin=awk.stdout, stdout=PIPE, stderr=DEVNULL)
-            cmds = [wget, gunzip, grep, awk]
+            cmds = [gunzip, grep, awk]
             # Allow previous process to receive a SIGPIPE
             # if the next one in the pipeline exits.
             for cmd in cmds:
@@ -786,3 +918,4 @@ class yoctoRecipe(object):
         yoctoRecipe.not_generated_recipes = set()
         yoctoRecipe.platform_deps = set()
         yoctoRecipe.max_component_name = 0
+        yoctoRecipe.srcrev_repos = set()
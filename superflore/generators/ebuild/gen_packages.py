@@ -14,22 +14,23 @@
 
 import glob
 import os
+import weakref
 
-from rosdistro.dependency_walker import DependencyWalker
 from rosdistro.manifest_provider import get_release_tag
 from rosdistro.rosdistro import RosPackage
 from rosinstall_generator.distro import _generate_rosinstall
 from rosinstall_generator.distro import get_package_names
+from superflore.CompactDistro import get_dependency_walker
 from superflore.exceptions import UnresolvedDependency
 from superflore.generators.ebuild.ebuild import Ebuild
 from superflore.generators.ebuild.metadata_xml import metadata_xml
+from superflore.manifest_provider import get_package_xml
 from superflore.PackageMetadata import PackageMetadata
 from superflore.utils import err
 from superflore.utils import get_distros
 from superflore.utils import get_pkg_version
 from superflore.utils import make_dir
 from superflore.utils import ok
-from superflore.utils import retry_on_exception
 from superflore.utils import warn
 
 # TODO(allenh1): This is a blacklist of things that
@@ -41,6 +42,16 @@ no_python3 = ['tf']
 
 org = "Open Source Robotics Foundation"
 org_license = "BSD"
+# the result of get_package_names for each distro
+_package_names = weakref.WeakKeyDictionary()
+
+
+def _get_package_names(distro):
+    """Like get_package_names, but only walks the distro once"""
+    if distro not in _package_names:
+        released_names, unreleased_names = get_package_names(distro)
+        _package_names[distro] = (set(released_names), unreleased_names)
+    return _package_names[distro]
 
 
 def regenerate_pkg(overlay, pkg, distro, preserve_existing=False):
@@ -52,7 +63,7 @@ def regenerate_pkg(overlay, pkg, distro, preserve_existing=False):
     patch_path = overlay.repo.repo_dir + patch_path
     is_ros2 = get_distros()[distro.name]['distribution_type'] == 'ros2'
     has_patches = os.path.exists(patch_path)
-    pkg_names = get_package_names(distro)[0]
+    pkg_names = _get_package_names(distro)[0]
     patches = None
     if os.path.exists(patch_path):
         patches = [
@@ -125,7 +136,7 @@ def _gen_metadata_for_package(
 ):
     pkg_metadata_xml = metadata_xml()
     try:
-        pkg_xml = retry_on_exception(ros_pkg.get_package_xml, distro.name)
+        pkg_xml = get_package_xml(distro, ros_pkg)
     except Exception:
         warn("fetch metadata for package {}".format(pkg_name))
         return pkg_metadata_xml
@@ -145,8 +156,8 @@ def _gen_ebuild_for_package(
 
     pkg_ebuild.distro = distro.name
     pkg_ebuild.src_uri = pkg_rosinstall[0]['tar']['uri']
-    pkg_names = get_package_names(distro)
-    pkg_dep_walker = DependencyWalker(distro)
+    pkg_names = _get_package_names(distro)
+    pkg_dep_walker = get_dependency_walker(distro)
 
     pkg_buildtool_deps = pkg_dep_walker.get_depends(pkg_name, "buildtool")
     pkg_build_deps = pkg_dep_walker.get_depends(pkg_name, "build")
@@ -177,7 +188,7 @@ def _gen_ebuild_for_package(
 
     # parse through package xml
     try:
-        pkg_xml = retry_on_exception(ros_pkg.get_package_xml, distro.name)
+        pkg_xml = get_package_xml(distro, ros_pkg)
     except Exception:
         warn("fetch metadata for package {}".format(pkg_name))
         return pkg_ebuild
@@ -15,11 +15,14 @@
 import os
 import sys
 
-from rosinstall_generator.distro import get_distro
+from superflore.CompactDistro import CompactDistro
+from superflore.distro_snapshot import get_distro
+from superflore.distro_snapshot import get_light_distro
 from superflore.exceptions import NoGitHubAuthToken
 from superflore.generate_installers import generate_installers
 from superflore.generators.ebuild.gen_packages import regenerate_pkg
 from superflore.generators.ebuild.overlay_instance import RosOverlay
+from superflore.parser import configure_fetching
 from superflore.parser import get_parser
 from superflore.repo_instance import RepoInstance
 from superflore.TempfileManager import TempfileManager
@@ -43,13 +46,14 @@ def main():
     parser = get_parser('Deploy ROS packages into Gentoo Linux')
     args = parser.parse_args(sys.argv[1:])
     pr_comment = args.pr_comment
+    configure_fetching(parser, args)
     skip_keys = args.skip_keys or []
     selected_targets = None
 
     ######################
     if args.input_repos:
         import yaml
-        distro = get_distro(args.ros_distro)
+        distro = get_light_distro(args.ros_distro)
         file_paths = args.input_repos
         repos = []
         for file_path in file_paths:
@@ -142,6 +146,9 @@ def main():
             missing_depends = set()
             to_commit = set()
             will_file_pr = False
+            # only the requested package.xml files are needed, not the
+            # whole distribution cache
+            distro = get_light_distro(args.ros_distro)
             for pkg in args.only:
                 if pkg in skip_keys:
                     warn("Package '%s' is in skip-keys list, skipping..."
@@ -152,7 +159,7 @@ def main():
                     ebuild, deps, version = regenerate_pkg(
                         overlay,
                         pkg,
-                        get_distro(args.ros_distro),
+                        distro,
                         preserve_existing
                     )
                     if not ebuild:
@@ -194,11 +201,12 @@ def main():
         for distro in selected_targets:
             distro_installers, distro_broken, distro_changes =\
                 generate_installers(
-                    get_distro(distro),
+                    CompactDistro(get_distro(distro)),
                     overlay=overlay,
                     gen_pkg_func=regenerate_pkg,
                     preserve_existing=preserve_existing,
                     skip_keys=skip_keys,
+                    jobs=args.jobs,
                 )
             for key in distro_broken.keys():
                 for pkg in distro_broken[key]:
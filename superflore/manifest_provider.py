@@ -0,0 +1,207 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import Counter
+import os
+import threading
+import time
+
+import requests
+from rosdistro.manifest_provider import get_release_tag
+from superflore.CacheBackend import get_shared_cache
+from superflore.CacheStats import cache_stats
+from superflore.exceptions import HostUnavailable
+from superflore.exceptions import NoPkgXml
+from superflore.fetcher import fetcher
+from superflore.GitMirrors import GitMirrors
+from superflore.NegativeCache import DEFAULT_TTL
+from superflore.NegativeCache import NegativeCache
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.RetryPolicy import RetryPolicy
+from superflore.utils import info
+from superflore.utils import warn
+
+NETWORK = 'network'
+DISTRIBUTION_CACHE = 'distribution-cache'
+GIT_MIRROR = 'git-mirror'
+MANIFEST_PROVIDERS = [NETWORK, DISTRIBUTION_CACHE, GIT_MIRROR]
+
+package_xml_cache = PackageXmlCache()
+negative_cache = NegativeCache()
+git_mirrors = None
+manifest_provider = NETWORK
+manifest_stats = Counter()
+manifest_stats_lock = threading.Lock()
+
+
+def set_cache_dir(cache_dir, negative_cache_ttl=DEFAULT_TTL):
+    """
+    Persist fetched package.xml files under cache_dir (and in the shared
+    cache, see set_shared_cache), and remember the ones which can't be
+    fetched for negative_cache_ttl seconds.
+    """
+    global package_xml_cache, negative_cache
+    package_xml_cache = PackageXmlCache(
+        cache_dir, shared_cache=get_shared_cache())
+    negative_cache = NegativeCache(
+        os.path.join(cache_dir, 'negative-cache.json') if cache_dir else None,
+        negative_cache_ttl)
+
+
+def set_manifest_provider(provider):
+    """
+    Select where package.xml files come from. With DISTRIBUTION_CACHE they
+    are read from the distribution cache loaded by get_distro(), and only
+    fetched over the network when the cache has no entry. Note that the
+    distribution cache holds sanitized files (no comments, squashed
+    whitespace), so this is only suitable when the verbatim file is not
+    needed. With GIT_MIRROR they are read from local bare mirrors of the
+    release repositories, kept under the cache directory.
+    """
+    global manifest_provider, git_mirrors
+    if provider not in MANIFEST_PROVIDERS:
+        raise ValueError("Unknown manifest provider '%s'" % provider)
+    if provider == GIT_MIRROR:
+        if not package_xml_cache.cache_dir:
+            raise ValueError(
+                "Manifest provider '%s' requires a cache directory" %
+                provider)
+        git_mirrors = GitMirrors(
+            os.path.join(package_xml_cache.cache_dir, 'git-mirrors'))
+    manifest_provider = provider
+
+
+def _count(source):
+    with manifest_stats_lock:
+        manifest_stats[source] += 1
+
+
+def _get_from_distribution_cache(rosdistro, pkg_name):
+    # The Distribution returned by get_distro() resolves this from the
+    # loaded cache; DependencyWalker reads the very same entries.
+    try:
+        pkg_xml = rosdistro.get_release_package_xml(pkg_name)
+    except Exception:
+        return None
+    if isinstance(pkg_xml, str):
+        pkg_xml = pkg_xml.encode('utf-8')
+    return pkg_xml
+
+
+def _is_not_found(e):
+    return isinstance(e, requests.HTTPError) and \
+        e.response is not None and e.response.status_code == 404
+
+
+def fetch_package_xml(ros_pkg, distro_name):
+    """
+    Fetch the released package.xml of ros_pkg from GitHub, trying the
+    legacy tag layout if needed (as rosdistro's RosPackage does). Raises
+    NoPkgXml if it definitely doesn't exist there.
+    """
+    repo = ros_pkg.repository
+    if 'github.com' not in repo.url:
+        raise NoPkgXml(
+            "Can't fetch package.xml of '{0}' from non-GitHub repository "
+            "'{1}'".format(ros_pkg.name, repo.url))
+    release_tag = 'release/{0}/{1}/{2}'.format(
+        distro_name, ros_pkg.name, repo.version)
+    url = repo.url.replace('.git', '/{0}/package.xml'.format(release_tag))
+    url = url.replace('git://', 'https://')
+    url = url.replace('https://', 'https://raw.')
+    try:
+        return fetcher.get(url, op='package.xml')
+    except HostUnavailable:
+        raise
+    except Exception as e:
+        msg = "Failed to read package.xml file from url '{0}': {1}".format(
+            url, e)
+        not_found = _is_not_found(e)
+    warn(msg)
+    legacy_release_tag = 'release/{0}/{1}'.format(
+        ros_pkg.name, repo.version.split('-')[0])
+    url = url.replace(release_tag, legacy_release_tag)
+    info("Trying to read from legacy-style url '{0}' instead".format(url))
+    try:
+        return fetcher.get(url, op='package.xml')
+    except HostUnavailable:
+        raise
+    except Exception as e:
+        msg += "\nAND\nFailed to read package.xml file from url " \
+            "'{0}': {1}".format(url, e)
+        if not_found and _is_not_found(e):
+            raise NoPkgXml(msg)
+        raise RuntimeError(msg)
+
+
+def get_package_xml(rosdistro, ros_pkg, **kwargs):
+    """
+    Return the released package.xml of ros_pkg, fetching it with a
+    RetryPolicy (which receives kwargs) only if it is not available
+    locally.
+    """
+    if manifest_provider == DISTRIBUTION_CACHE:
+        pkg_xml = _get_from_distribution_cache(rosdistro, ros_pkg.name)
+        if pkg_xml:
+            _count('distribution cache')
+            return pkg_xml
+    repo = ros_pkg.repository
+    release_tag = get_release_tag(repo, ros_pkg.name)
+    start = time.monotonic()
+    pkg_xml = package_xml_cache.get(repo.url, release_tag)
+    if pkg_xml is not None:
+        _count('package.xml cache')
+        cache_stats.hit('package.xml', time.monotonic() - start, len(pkg_xml))
+        return pkg_xml
+    if manifest_provider == GIT_MIRROR:
+        pkg_xml = git_mirrors.get_file(repo.url, release_tag)
+        if pkg_xml is not None:
+            _count('git mirror')
+            cache_stats.miss(
+                'package.xml', time.monotonic() - start, len(pkg_xml))
+            package_xml_cache.set(repo.url, release_tag, pkg_xml)
+            return pkg_xml
+    reason = negative_cache.get(rosdistro.name, ros_pkg.name, repo.version)
+    if reason:
+        _count('skipped as unfetchable')
+        cache_stats.hit('negative', time.monotonic() - start)
+        raise NoPkgXml(reason)
+    try:
+        pkg_xml = RetryPolicy('package.xml fetch', **kwargs).call(
+            fetch_package_xml, ros_pkg, rosdistro.name)
+    except NoPkgXml as e:
+        cache_stats.miss('negative', time.monotonic() - start)
+        negative_cache.add(
+            rosdistro.name, ros_pkg.name, repo.version, e.message)
+        raise
+    _count('network')
+    cache_stats.miss('package.xml', time.monotonic() - start, len(pkg_xml))
+    package_xml_cache.set(repo.url, release_tag, pkg_xml)
+    return pkg_xml
+
+
+def log_manifest_stats():
+    with manifest_stats_lock:
+        if not manifest_stats:
+            return
+        sources = ', '.join(
+            '{0} {1}'.format(
+                manifest_stats[source],
+                source if source.startswith('skipped') else 'from ' + source)
+            for source in sorted(manifest_stats))
+    info('package.xml files: {0}'.format(sources))
+    if negative_cache.skipped:
+        warn('Skipped fetching known unfetchable package.xml files:')
+        for key, reason in sorted(negative_cache.skipped.items()):
+            warn('  {0}: {1}'.format(key, reason.split('\n')[0]))
@@ -13,6 +13,42 @@
 # limitations under the License.
 
 import argparse
+import atexit
+import os
+
+from superflore.CacheBackend import set_shared_cache
+from superflore.CacheStats import cache_stats
+from superflore.Cassette import RECORD
+from superflore.Cassette import REPLAY
+from superflore.Cassette import set_cassette
+from superflore.distro_snapshot import set_snapshot_dir
+from superflore.fetcher import fetcher
+from superflore.GarbageCollector import collect_garbage
+from superflore.GarbageCollector import forget_dropped_distro
+from superflore.GarbageCollector import parse_size
+from superflore.manifest_provider import DISTRIBUTION_CACHE
+from superflore.manifest_provider import GIT_MIRROR
+from superflore.manifest_provider import MANIFEST_PROVIDERS
+from superflore.manifest_provider import NETWORK
+from superflore.manifest_provider import set_cache_dir
+from superflore.manifest_provider import set_manifest_provider
+from superflore.NegativeCache import DEFAULT_TTL
+from superflore.RetryPolicy import set_run_budget
+from superflore.rosdep_support import set_resolution_cache_dir
+from superflore.utils import get_checksum_filename
+from superflore.utils import get_srcrev_filename
+
+
+def positive_int(value):
+    """Parse an integer of at least 1, for argparse"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            "invalid positive integer: '{0}'".format(value))
+    return number
 
 
 # set up a parser and return it
@@ -87,4 +123,126 @@ def get_parser(
             nargs='+',
             help='packages to skip during regeneration'
         )
+        add_fetch_arguments(parser)
     return parser
+
+
+def add_fetch_arguments(parser):
+    """Add the options controlling how (and where) data is fetched"""
+    parser.add_argument(
+        '--jobs',
+        help='number of packages to generate in parallel',
+        type=positive_int,
+        default=1
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='location to persist fetched data between runs',
+        type=str,
+        default=os.getenv('SUPERFLORE_CACHE_DIR')
+    )
+    parser.add_argument(
+        '--shared-cache',
+        help='directory on a shared filesystem, or http(s) URL of a cache '
+             'server (GET/PUT), to share fetched data with other machines',
+        type=str,
+        default=os.getenv('SUPERFLORE_SHARED_CACHE')
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        help='size (e.g. 10G) to keep --cache-dir within after the run, '
+             'removing the least recently used data',
+        type=parse_size
+    )
+    parser.add_argument(
+        '--cache-max-age',
+        help='days after which unused data is removed from --cache-dir',
+        type=float
+    )
+    parser.add_argument(
+        '--cache-stats',
+        help='write the hits and misses of each cache as JSON into this file',
+        metavar='FILE'
+    )
+    parser.add_argument(
+        '--negative-cache-ttl',
+        help='seconds to remember releases which could not be fetched',
+        type=int,
+        default=DEFAULT_TTL
+    )
+    parser.add_argument(
+        '--timeout',
+        help='timeout of a network operation (package.xml, ls-remote, '
+             'sources or archive), e.g. ls-remote=30',
+        action='append',
+        default=[],
+        metavar='OP=SECS'
+    )
+    parser.add_argument(
+        '--hedge',
+        help='duplicate network operations slower than usual',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--record',
+        help='record all network responses into this directory',
+        metavar='DIR'
+    )
+    parser.add_argument(
+        '--replay',
+        help='serve all network responses from a --record directory',
+        metavar='DIR'
+    )
+    parser.add_argument(
+        '--retry-budget',
+        help='seconds after which failed fetches are no longer retried',
+        type=int
+    )
+    parser.add_argument(
+        '--manifest-provider',
+        help='where to read package.xml files from: "{0}" reads them '
+             'from the rosdistro distribution cache, "{1}" from local '
+             'mirrors of the release repositories under --cache-dir; '
+             'missing ones are fetched'.format(
+                 DISTRIBUTION_CACHE, GIT_MIRROR),
+        choices=MANIFEST_PROVIDERS,
+        default=NETWORK
+    )
+
+
+def configure_fetching(parser, args):
+    """Apply the options added by add_fetch_arguments"""
+    if args.record and args.replay:
+        parser.error('Invalid args! --record and --replay are exclusive')
+    if args.record:
+        set_cassette(args.record, RECORD)
+    elif args.replay:
+        set_cassette(args.replay, REPLAY)
+    set_shared_cache(args.shared_cache)
+    if args.cache_dir:
+        # have superflore-cache-gc drop its entries again if it is EOL
+        if getattr(args, 'ros_distro', None):
+            forget_dropped_distro(args.cache_dir, args.ros_distro)
+        # registered first, to run after the caches are saved at exit; the
+        # end-of-life distros are left to superflore-cache-gc, as finding
+        # their entries takes reading all of the caches
+        atexit.register(
+            collect_garbage, args.cache_dir,
+            get_srcrev_filename(getattr(args, 'tar_archive_dir', None)),
+            args.cache_max_size,
+            args.cache_max_age * 24 * 60 * 60
+            if args.cache_max_age is not None else None,
+            drop_eol=False,
+            checksum_filename=get_checksum_filename(
+                getattr(args, 'tar_archive_dir', None)))
+    set_cache_dir(args.cache_dir, args.negative_cache_ttl)
+    set_resolution_cache_dir(args.cache_dir)
+    set_snapshot_dir(args.cache_dir)
+    set_run_budget(args.retry_budget)
+    cache_stats.filename = args.cache_stats
+    fetcher.hedge = args.hedge
+    try:
+        set_manifest_provider(args.manifest_provider)
+        fetcher.set_timeouts(args.timeout)
+    except ValueError as e:
+        parser.error('Invalid args! {0}'.format(e))
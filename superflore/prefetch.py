@@ -0,0 +1,156 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import sys
+
+from rosdistro.dependency_walker import DependencyWalker
+from rosdistro.rosdistro import RosPackage
+from rosinstall_generator.distro import get_package_names
+from superflore.CacheStats import cache_stats
+from superflore.distro_snapshot import get_distro
+from superflore.exceptions import UnresolvedDependency
+from superflore.fetcher import fetcher
+from superflore.generators.bitbake.gen_packages import fill_srcrev_cache
+from superflore.manifest_provider import get_package_xml
+from superflore.manifest_provider import log_manifest_stats
+from superflore.parser import add_fetch_arguments
+from superflore.parser import configure_fetching
+from superflore.parser import get_parser
+from superflore.RetryPolicy import log_retry_stats
+from superflore.SqliteCache import SqliteCache
+from superflore.utils import get_srcrev_filename
+from superflore.utils import info
+from superflore.utils import ok
+from superflore.utils import resolve_dep
+from superflore.utils import warn
+
+DEPENDENCY_TYPES = [
+    'buildtool', 'buildtool_export', 'build', 'build_export', 'run', 'exec',
+    'test',
+]
+ROSDEP_PLATFORMS = ['openembedded', 'gentoo']
+
+
+def _run_all(executor, callback, items, what):
+    """Call callback for all items on executor, reporting the failures"""
+    futures = {item: executor.submit(callback, item) for item in items}
+    failed = 0
+    for item, future in sorted(futures.items()):
+        try:
+            future.result()
+        except Exception as e:
+            warn("Failed to prefetch {0} of '{1}': {2}".format(
+                what, item, e))
+            failed += 1
+    info('Prefetched {0} / {1} {2}'.format(
+        len(futures) - failed, len(futures), what))
+
+
+def _get_release_repository(distro, pkg_name):
+    pkg = distro.release_packages[pkg_name]
+    return distro.repositories[pkg.repository_name].release_repository
+
+
+def prefetch_package_xmls(distro, pkg_names, executor):
+    def fetch(pkg_name):
+        repo = _get_release_repository(distro, pkg_name)
+        get_package_xml(distro, RosPackage(pkg_name, repo))
+    _run_all(executor, fetch, pkg_names, 'package.xml files')
+
+
+def prefetch_srcrevs(distro, pkg_names, srcrev_cache, executor):
+    # the same src_uri as used by superflore-gen-oe-recipes as key, with a
+    # single git ls-remote per release repository
+    repos = dict()
+    for pkg_name in pkg_names:
+        repo = _get_release_repository(distro, pkg_name)
+        repos[repo.name] = repo
+
+    def fetch(repo_name):
+        missing = fill_srcrev_cache(repos[repo_name], srcrev_cache)
+        if missing:
+            raise RuntimeError('no such tags: ' + ', '.join(missing))
+    _run_all(executor, fetch, repos, 'SRCREV repositories')
+
+
+def prefetch_rosdep_resolutions(distro, pkg_names):
+    walker = DependencyWalker(distro)
+    keys = set()
+    for pkg_name in pkg_names:
+        for dependency_type in DEPENDENCY_TYPES:
+            try:
+                keys |= walker.get_depends(pkg_name, dependency_type)
+            except Exception as e:
+                warn("Failed to get the {0} dependencies of '{1}': {2}"
+                     .format(dependency_type, pkg_name, e))
+                break
+    keys -= set(pkg_names)
+    resolved = 0
+    for key in sorted(keys):
+        for os_name in ROSDEP_PLATFORMS:
+            try:
+                resolve_dep(key, os_name, distro.name)
+            except UnresolvedDependency:
+                pass
+            except Exception as e:
+                warn('Failed to resolve rosdep keys: {0}'.format(e))
+                return
+            resolved += 1
+    info('Prefetched {0} rosdep resolutions of {1} keys'.format(
+        resolved, len(keys)))
+
+
+def main():
+    parser = get_parser(
+        'Fetch the data needed to generate the packages of a ROS '
+        'distribution into the caches, without touching any repository',
+        is_generator=False)
+    parser.add_argument(
+        '--ros-distro',
+        help='prefetch the data of the specified distro',
+        required=True,
+        type=str
+    )
+    parser.add_argument(
+        '--tar-archive-dir',
+        help='location of the SRCREV cache of superflore-gen-oe-recipes',
+        type=str
+    )
+    add_fetch_arguments(parser)
+    parser.set_defaults(jobs=8)
+    args = parser.parse_args(sys.argv[1:])
+    if not args.cache_dir:
+        parser.error('Invalid args! no --cache-dir (or SUPERFLORE_CACHE_DIR) '
+                     'to prefetch into')
+    configure_fetching(parser, args)
+    # rosdistro doesn't keep the distribution cache on disk; it is
+    # loaded here to walk the packages
+    distro = get_distro(args.ros_distro)
+    pkg_names = sorted(get_package_names(distro)[0])
+    srcrev_filename = get_srcrev_filename(args.tar_archive_dir)
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        prefetch_package_xmls(distro, pkg_names, executor)
+        if srcrev_filename:
+            with SqliteCache(srcrev_filename) as srcrev_cache:
+                prefetch_srcrevs(distro, pkg_names, srcrev_cache, executor)
+    prefetch_rosdep_resolutions(distro, pkg_names)
+    log_manifest_stats()
+    fetcher.log_host_stats()
+    fetcher.log_op_stats()
+    log_retry_stats()
+    cache_stats.log()
+    cache_stats.save()
+    ok("Prefetched distro '{0}' into '{1}'".format(
+        args.ros_distro, args.cache_dir))
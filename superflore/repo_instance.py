@@ -14,14 +14,15 @@
 
 import os
 import shutil
+import threading
 
 from git import Repo
 from git.exc import GitCommandError as GitGotGot
 from github import Github
+from superflore.RetryPolicy import RetryPolicy
 from superflore.utils import err
 from superflore.utils import info
 from superflore.utils import ok
-from superflore.utils import retry_on_exception
 
 
 class RepoInstance(object):
@@ -42,6 +43,8 @@ class RepoInstance(object):
         else:
             self.repo = Repo(repo_dir)
         self.git = self.repo.git
+        # serializes index-touching git commands from generator workers
+        self.lock = threading.RLock()
 
     def clone(self, branch=None):
         shutil.rmtree(self.repo_dir)
@@ -57,7 +60,8 @@ class RepoInstance(object):
 
     def remove_file(self, filename, ignore_fail=False):
         try:
-            self.git.rm('-f', filename)
+            with self.lock:
+                self.git.rm('-f', filename)
         except GitGotGot as g:
             if ignore_fail:
                 return
@@ -105,11 +109,10 @@ class RepoInstance(object):
         forked_repo = self.gh_user.create_fork(self.gh_upstream)
         info('Pushing changes to fork...')
         self.git.remote('add', 'github', forked_repo.html_url)
-        retry_on_exception(
-            self.git.push, '-u', 'github', self.branch or branch,
-            retry_msg='Could not push', error_msg='Error during push',
-            sleep_secs=0.0,
-        )
+        RetryPolicy(
+            'git push', base_secs=1.0, retry_msg='Could not push',
+            error_msg='Error during push',
+        ).call(self.git.push, '-u', 'github', self.branch or branch)
         info('Filing pull-request...')
         pr_head = '%s:%s' % (self.gh_user.login, self.branch)
         pr = self.gh_upstream.create_pull(
@@ -30,27 +30,114 @@
 # ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import atexit
+from collections import defaultdict
+import hashlib
+import os
+import threading
+import time
+
 from rosdep2 import create_default_installer_context
 from rosdep2.catkin_support import get_catkin_view
 from rosdep2.lookup import ResolutionError
 from rosdep2.rosdistrohelper import get_index
+from rosdep2.sources_list import CACHE_INDEX
+from rosdep2.sources_list import get_sources_cache_dir
+from superflore.CacheStats import cache_stats
 from superflore.exceptions import UnresolvedDependency
 
 DEFAULT_ROS_DISTRO = 'indigo'
 view_cache = {}
+view_locks = defaultdict(threading.Lock)
+resolution_cache = None
+# the outcome of each resolution of this process, keyed by (key, os_name,
+# os_version, ros_distro): ('resolution', resolution) or ('unresolved',
+# reason)
+resolutions = dict()
+resolution_locks = defaultdict(threading.Lock)
+# (installer, os installer keys, default installer key) of each OS
+os_installers = dict()
+os_installers_lock = threading.Lock()
 
 
 def get_cached_index():
     return get_index()
 
 
+def get_sources_stamp():
+    """
+    Identify the state of rosdep's sources cache (see "rosdep update") by
+    its contents, so that machines with the same rosdep database share it.
+    """
+    sources_cache_dir = get_sources_cache_dir()
+    if not os.path.isfile(os.path.join(sources_cache_dir, CACHE_INDEX)):
+        return None
+    stamp = hashlib.sha256()
+    try:
+        for name in sorted(os.listdir(sources_cache_dir)):
+            path = os.path.join(sources_cache_dir, name)
+            if not os.path.isfile(path):
+                continue
+            stamp.update(name.encode() + b'\0')
+            with open(path, 'rb') as sources_file:
+                stamp.update(hashlib.sha256(sources_file.read()).digest())
+    except OSError:
+        return None
+    return stamp.hexdigest()
+
+
+def set_resolution_cache_dir(cache_dir):
+    """Keep the rosdep resolutions in cache_dir (if given) across runs"""
+    # imported here, as superflore.utils imports this module
+    from superflore.CacheBackend import get_shared_cache
+    from superflore.ResolutionCache import FILENAME
+    from superflore.ResolutionCache import ResolutionCache
+    global resolution_cache
+    if not cache_dir:
+        resolution_cache = None
+        return
+    resolution_cache = ResolutionCache(
+        os.path.join(cache_dir, FILENAME),
+        get_sources_stamp(), shared_cache=get_shared_cache())
+    atexit.register(resolution_cache.save)
+
+
 def get_view(os_name, os_version, ros_distro):
     global view_cache
     key = os_name + os_version + ros_distro
-    if key not in view_cache:
-        value = get_catkin_view(ros_distro, os_name, os_version, False)
-        view_cache[key] = value
-    return view_cache[key]
+    # a view takes seconds to build: build each one once
+    with view_locks[key]:
+        if key not in view_cache:
+            start = time.monotonic()
+            value = get_catkin_view(ros_distro, os_name, os_version, False)
+            view_cache[key] = value
+            cache_stats.miss('rosdep view', time.monotonic() - start)
+        else:
+            cache_stats.hit('rosdep view')
+        return view_cache[key]
+
+
+def get_os_installer(os_name):
+    """
+    Return the default installer of os_name, the installer keys of os_name
+    and the default installer key, from a single installer context.
+
+    :raises: :exc:`KeyError` if os_name has no default installer
+    """
+    with os_installers_lock:
+        if os_name not in os_installers:
+            ctx = create_default_installer_context()
+            try:
+                installer_key = ctx.get_default_os_installer_key(os_name)
+            except KeyError:
+                os_installers[os_name] = None
+            else:
+                os_installers[os_name] = (
+                    ctx.get_installer(installer_key),
+                    ctx.get_os_installer_keys(os_name), installer_key)
+        if os_installers[os_name] is None:
+            raise KeyError(os_name)
+        return os_installers[os_name]
 
 
 def resolve_more_for_os(rosdep_key, view, installer, os_name, os_version):
@@ -64,13 +151,11 @@ def resolve_more_for_os(rosdep_key, view, installer, os_name, os_version):
     :raises: :exc:`rosdep2.ResolutionError`
     """
     d = view.lookup(rosdep_key)
-    ctx = create_default_installer_context()
-    os_installers = ctx.get_os_installer_keys(os_name)
-    default_os_installer = ctx.get_default_os_installer_key(os_name)
+    _, installer_keys, default_os_installer = get_os_installer(os_name)
     inst_key, rule = d.get_rule_for_platform(os_name, os_version,
-                                             os_installers,
+                                             installer_keys,
                                              default_os_installer)
-    assert inst_key in os_installers
+    assert inst_key in installer_keys
     return installer.resolve(rule), inst_key, default_os_installer
 
 
@@ -81,17 +166,57 @@ def resolve_rosdep_key(
     ros_distro=None,
     ignored=None
 ):
+    ros_distro = ros_distro or DEFAULT_ROS_DISTRO
+    memo_key = (key, os_name, os_version, ros_distro)
+    # concurrent lookups of a key wait for the first one
+    with resolution_locks[memo_key]:
+        if memo_key in resolutions:
+            cache_stats.hit('rosdep memo')
+        else:
+            cache_stats.miss('rosdep memo')
+            resolutions[memo_key] = _get_resolution(
+                key, os_name, os_version, ros_distro, ignored)
+        outcome, value = resolutions[memo_key]
+    if outcome == 'unresolved':
+        raise UnresolvedDependency(value)
+    return value
+
+
+def _get_resolution(key, os_name, os_version, ros_distro, ignored):
+    """Return the outcome of resolving key, as stored in resolutions"""
+    cache = resolution_cache
+    start = time.monotonic()
+    cached = cache.get(key, os_name, os_version, ros_distro) \
+        if cache else None
+    if cached:
+        cache_stats.hit('rosdep resolution', time.monotonic() - start)
+        if 'unresolved' in cached:
+            return 'unresolved', cached['unresolved']
+        return 'resolution', tuple(cached['resolution'])
+    try:
+        resolution = _resolve_rosdep_key(
+            key, os_name, os_version, ros_distro, ignored)
+    except UnresolvedDependency as e:
+        if cache:
+            cache_stats.miss('rosdep resolution', time.monotonic() - start)
+            cache.set_unresolved(
+                key, os_name, os_version, ros_distro, e.message)
+        return 'unresolved', e.message
+    if cache:
+        cache_stats.miss('rosdep resolution', time.monotonic() - start)
+        cache.set(key, os_name, os_version, ros_distro, resolution)
+    return 'resolution', resolution
+
+
+def _resolve_rosdep_key(key, os_name, os_version, ros_distro, ignored):
     ignored = ignored or []
-    ctx = create_default_installer_context()
     try:
-        installer_key = ctx.get_default_os_installer_key(os_name)
+        installer = get_os_installer(os_name)[0]
     except KeyError:
         raise UnresolvedDependency(
             "could not resolve package {} for os {}."
             .format(key, os_name)
         )
-    installer = ctx.get_installer(installer_key)
-    ros_distro = ros_distro or DEFAULT_ROS_DISTRO
     view = get_view(os_name, os_version, ros_distro)
     try:
         return resolve_more_for_os(key, view, installer, os_name, os_version)
@@ -112,6 +112,20 @@ def make_dir(dirname):
             raise e
 
 
+def get_srcrev_filename(tar_archive_dir):
+    """Return the SRCREV cache file in tar_archive_dir (if given)"""
+    if not tar_archive_dir:
+        return None
+    return os.path.join(tar_archive_dir, 'srcrev_cache.sqlite')
+
+
+def get_checksum_filename(tar_archive_dir):
+    """Return the archive checksum cache file in tar_archive_dir (if given)"""
+    if not tar_archive_dir:
+        return None
+    return os.path.join(tar_archive_dir, 'checksum_cache.sqlite')
+
+
 def get_pkg_version(distro, pkg_name, **kwargs):
     pkg = distro.release_packages[pkg_name]
     repo = distro.repositories[pkg.repository_name].release_repository
@@ -761,29 +775,30 @@ def url_to_repo_org(url):
 
 
 def retry_on_exception(callback, *args, max_retries=5, num_retry=0,
-                       retry_msg='', error_msg='', sleep_secs=0.125):
-    try:
-        return callback(*args)
-    except Exception as e:
-        if num_retry >= max_retries or max_retries < 0 or num_retry < 0:
-            if error_msg:
-                err('{0} {1} {2}/{3}'.format(str(e), error_msg,
-                    num_retry, max_retries))
-            raise e from None
-        if num_retry > 0:
-            if retry_msg:
-                warn('{0} {1} {2}/{3}...'.format(str(e), retry_msg,
-                     num_retry, max_retries))
-            time.sleep(sleep_secs)
-            if num_retry <= 6:
-                sleep_secs *= 2
-            else:
-                sleep_secs = 0.125
-        elif num_retry == 0:
-            warn('{0}'.format(str(e)))
-        return retry_on_exception(callback, *args, max_retries=max_retries,
-                                  num_retry=num_retry+1, retry_msg=retry_msg,
-                                  error_msg=error_msg, sleep_secs=sleep_secs)
+                       retry_msg='', error_msg='', sleep_secs=0.125,
+                       name=None):
+    """
+    Compatibility wrapper around RetryPolicy, keeping the old deterministic
+    schedule: no wait before the first retry, then sleep_secs doubling up
+    to 64 * sleep_secs, then sleep_secs again.
+    """
+    from superflore.RetryPolicy import RetryPolicy
+
+    first_retry = num_retry
+
+    def backoff(num_retry):
+        num_retry += first_retry - 1
+        if num_retry == 0:
+            return 0
+        if num_retry <= 7:
+            return sleep_secs * 2 ** (num_retry - 1)
+        return sleep_secs
+
+    policy = RetryPolicy(
+        name or getattr(callback, '__name__', 'unknown'),
+        max_retries=max_retries - num_retry if num_retry >= 0 else -1,
+        backoff=backoff, retry_msg=retry_msg, error_msg=error_msg)
+    return policy.call(callback, *args)
 
 
 def get_superflore_version():
@@ -0,0 +1,109 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the memory held by a Distribution walked with a DependencyWalker
+and by a CompactDistro, for a synthetic distro (or a real one):
+
+    python -m tests.benchmark_compact_distro --packages 1500
+    python -m tests.benchmark_compact_distro --distro humble
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from rosdistro.dependency_walker import DependencyWalker
+from superflore.CompactDistro import CompactDistro
+from superflore.CompactDistro import DEPEND_TYPES
+from tests.test_CompactDistro import make_distro
+
+
+def synthetic_distro(n_packages, n_depends):
+    packages = dict()
+    for i in range(n_packages):
+        depends = ''.join(
+            '<depend>pkg%d</depend>' % ((i * 7 + j) % n_packages)
+            for j in range(n_depends))
+        depends += '<exec_depend>libfoo%d</exec_depend>' % (i % 50)
+        packages.setdefault('repo%d' % (i // 4), ('1.0.%d-1' % i, dict()))[
+            1]['pkg%d' % i] = depends
+    # as in real distros, a repository released without a version
+    packages['unreleased'] = (None, {'unreleased': ''})
+    return make_distro(packages)
+
+
+def walk(walker, pkg_names):
+    for pkg_name in pkg_names:
+        for depend_type in DEPEND_TYPES:
+            try:
+                walker.get_depends(pkg_name, depend_type)
+            except Exception:
+                break
+
+
+def measure(name, build, pkg_names):
+    gc.collect()
+    tracemalloc.start()
+    start = time.monotonic()
+    kept = build()
+    walk(kept[-1], pkg_names)
+    secs = time.monotonic() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print('{0:>17}: {1:8.1f}KiB held, built and walked in {2:.2f}s'.format(
+        name, size / 1024, secs))
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--packages', type=int, default=1500)
+    parser.add_argument('--depends', type=int, default=8,
+                        help='dependencies per package')
+    parser.add_argument('--distro', help='use this distro instead')
+    args = parser.parse_args()
+
+    if args.distro:
+        from superflore.distro_snapshot import get_distro
+
+        def load():
+            return get_distro(args.distro)
+    else:
+        def load():
+            return synthetic_distro(args.packages, args.depends)
+    pkg_names = sorted(load().release_packages)
+
+    def distribution():
+        distro = load()
+        return distro, DependencyWalker(distro)
+
+    def compact():
+        return (CompactDistro(load()),)
+    old = measure('Distribution', distribution, pkg_names)
+    new = measure('CompactDistro', compact, pkg_names)
+    for pkg_name in pkg_names:
+        for depend_type in DEPEND_TYPES:
+            try:
+                expected = old[1].get_depends(pkg_name, depend_type)
+            except Exception:
+                break
+            if new[0].get_depends(pkg_name, depend_type) != expected:
+                raise RuntimeError('The dependencies of both models differ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare listing the tags of release repositories with "git ls-remote" and
+in-process over smart HTTP, against a local stand-in of the git host:
+
+    python -m tests.benchmark_ls_remote --repos 50 --jobs 8
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
+from superflore.fetcher import Fetcher
+from superflore.TempfileManager import TempfileManager
+from tests.git_server import GitServer
+from tests.git_server import make_repo
+
+
+def run(url, repo_names, lookups, jobs, smart_http):
+    fetcher = Fetcher(smart_http=smart_http)
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        outputs = list(executor.map(
+            lambda i: fetcher.ls_remote(
+                '%s/%s' % (url, repo_names[i % len(repo_names)]), '--tags'),
+            range(lookups)))
+    secs = time.monotonic() - start
+    if fetcher.smart_http_failed:
+        raise RuntimeError('Listing the refs over HTTP failed')
+    return secs, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repos', type=int, default=20)
+    parser.add_argument('--tags', type=int, default=40,
+                        help='tags per repository')
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--jobs', type=int, default=8)
+    args = parser.parse_args()
+    with TempfileManager(None) as tmp:
+        repo_names = []
+        for i in range(args.repos):
+            repo_names.append('pkg%d-release.git' % i)
+            make_repo(
+                os.path.join(tmp, repo_names[-1]),
+                ['release/humble/pkg%d/1.0.%d-1' % (i, tag)
+                 for tag in range(args.tags)],
+                annotated=['release/humble/pkg%d/1.0.0-1' % i])
+        with GitServer(tmp) as server:
+            results = dict()
+            for name, smart_http in (('git ls-remote', False),
+                                     ('smart HTTP', True)):
+                secs, outputs = run(
+                    server.url, repo_names, args.lookups, args.jobs,
+                    smart_http)
+                results[name] = outputs
+                print('{0:>14}: {1} lookups in {2:.2f}s, {3:.1f}ms each, '
+                      '{4:.0f}/s'.format(
+                          name, args.lookups, secs,
+                          1000 * secs / args.lookups, args.lookups / secs))
+            if results['git ls-remote'] != results['smart HTTP']:
+                raise RuntimeError('The outputs of both paths differ')
+
+
+if __name__ == '__main__':
+    main()
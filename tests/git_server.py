@@ -0,0 +1,96 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A local stand-in for the smart HTTP ref listing of a git host"""
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import os
+import subprocess
+import threading
+from urllib.parse import urlparse
+
+GIT_ENV = dict(
+    os.environ, GIT_AUTHOR_NAME='superflore', GIT_AUTHOR_EMAIL='s@example.com',
+    GIT_COMMITTER_NAME='superflore', GIT_COMMITTER_EMAIL='s@example.com')
+
+
+def _git(*args, cwd=None):
+    return subprocess.check_output(
+        ('git',) + args, cwd=cwd, env=GIT_ENV).decode().strip()
+
+
+def make_repo(path, tag_names, annotated=()):
+    """Create a repository with a commit for each tag"""
+    _git('init', '-q', path)
+    for tag_name in tag_names:
+        _git('commit', '-q', '--allow-empty', '-m', tag_name, cwd=path)
+        if tag_name in annotated:
+            _git('tag', '-a', '-m', tag_name, tag_name, cwd=path)
+        else:
+            _git('tag', tag_name, cwd=path)
+    return path
+
+
+class _GitHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # the directory of the repositories
+    root = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = url.path[1:-len('/info/refs')]
+        if not url.path.endswith('/info/refs') or \
+                url.query != 'service=git-upload-pack' or \
+                not os.path.isdir(os.path.join(self.root, name)):
+            self._send(404, 'text/plain', b'not found')
+        elif name.startswith('git-only') and \
+                'Git-Protocol' not in self.headers:
+            # only the git client gets an answer, to test the fallback
+            self._send(500, 'text/plain', b'broken')
+        else:
+            refs = subprocess.check_output([
+                'git', 'upload-pack', '--stateless-rpc', '--advertise-refs',
+                os.path.join(self.root, name)])
+            self._send(
+                200, 'application/x-git-upload-pack-advertisement',
+                b'001e# service=git-upload-pack\n0000' + refs)
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GitServer:
+    """Serve the repositories in root at self.url until closed"""
+    def __init__(self, root):
+        handler = type('GitHandler', (_GitHandler,), {'root': root})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.url = 'http://127.0.0.1:%d' % self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
@@ -0,0 +1,145 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import os
+import threading
+
+from superflore.CacheBackend import get_cache_backend
+from superflore.CacheBackend import HttpCacheBackend
+from superflore.CacheBackend import LocalCacheBackend
+from superflore.CacheBackend import SharedCacheBackend
+from superflore.CacheBackend import TieredCacheBackend
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.ResolutionCache import ResolutionCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+
+class _CacheServer(BaseHTTPRequestHandler):
+    """A stand-in cache server, keeping the entries in memory"""
+    protocol_version = 'HTTP/1.1'
+    entries = dict()
+
+    def do_GET(self):
+        body = _CacheServer.entries.get(self.path)
+        self.send_response(200 if body is not None else 404)
+        body = body if body is not None else b''
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        length = int(self.headers['Content-Length'])
+        _CacheServer.entries[self.path] = self.rfile.read(length)
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCacheBackend(unittest.TestCase):
+    def _check_backend(self, backend):
+        self.assertIsNone(backend.get('srcrev', 'abcd'))
+        backend.put('srcrev', 'abcd', b'48bf1aa1')
+        self.assertEqual(backend.get('srcrev', 'abcd'), b'48bf1aa1')
+        self.assertIsNone(backend.get('package-xml', 'abcd'))
+
+    def test_local(self):
+        """Test storing entries in a local directory"""
+        with TempfileManager(None) as tmp:
+            backend = LocalCacheBackend(tmp)
+            self._check_backend(backend)
+            self.assertTrue(os.path.isfile(backend.get_path('srcrev', 'abcd')))
+            # only the published entry is left, no temporary files
+            self.assertEqual(
+                os.listdir(os.path.join(tmp, 'srcrev', 'ab')), ['abcd'])
+
+    def test_shared(self):
+        """Test storing entries in a shared directory"""
+        with TempfileManager(None) as tmp:
+            self._check_backend(get_cache_backend(tmp))
+            self.assertIsInstance(get_cache_backend(tmp), SharedCacheBackend)
+            # another machine's entry is not overwritten
+            SharedCacheBackend(tmp).put('srcrev', 'abcd', b'other')
+            self.assertEqual(
+                SharedCacheBackend(tmp).get('srcrev', 'abcd'), b'48bf1aa1')
+
+    def test_http(self):
+        """Test storing entries on a cache server"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _CacheServer)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:%d/cache/' % server.server_port
+            self.assertIsInstance(get_cache_backend(url), HttpCacheBackend)
+            self._check_backend(get_cache_backend(url))
+            self.assertIn('/cache/srcrev/abcd', _CacheServer.entries)
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        # an unreachable server is a miss
+        backend = HttpCacheBackend(url, timeout=1)
+        self.assertIsNone(backend.get('srcrev', 'abcd'))
+        backend.put('srcrev', 'abcd', b'48bf1aa1')
+        self.assertEqual(backend.failures, 2)
+
+    def test_tiered(self):
+        """Test hits of the shared cache are copied into the local one"""
+        with TempfileManager(None) as local_dir:
+            with TempfileManager(None) as shared_dir:
+                shared = SharedCacheBackend(shared_dir)
+                shared.put('srcrev', 'abcd', b'48bf1aa1')
+                local = LocalCacheBackend(local_dir)
+                backend = TieredCacheBackend([local, shared])
+                self.assertEqual(backend.get('srcrev', 'abcd'), b'48bf1aa1')
+                self.assertEqual(local.get('srcrev', 'abcd'), b'48bf1aa1')
+                backend.put('srcrev', 'ef01', b'a5be1e2c')
+                self.assertEqual(shared.get('srcrev', 'ef01'), b'a5be1e2c')
+
+    def test_shared_package_xml(self):
+        """Test sharing package.xml files through a shared cache"""
+        with TempfileManager(None) as shared_dir:
+            url = 'https://github.com/ros2-gbp/rclcpp-release.git'
+            tag = 'release/humble/rclcpp/16.0.4-1'
+            shared = SharedCacheBackend(shared_dir)
+            PackageXmlCache(shared_cache=shared).set(url, tag, '<package/>')
+            with TempfileManager(None) as cache_dir:
+                cache = PackageXmlCache(cache_dir, shared_cache=shared)
+                self.assertEqual(cache.get(url, tag), b'<package/>')
+                key = PackageXmlCache.get_key(url, tag)
+                self.assertTrue(os.path.isfile(cache.get_path(key)))
+
+    def test_shared_resolutions(self):
+        """Test sharing rosdep resolutions of the same rosdep database"""
+        with TempfileManager(None) as tmp:
+            shared = SharedCacheBackend(os.path.join(tmp, 'shared'))
+            filename = os.path.join(tmp, 'rosdep-resolutions.json')
+            ResolutionCache(filename, 'db1', shared_cache=shared).set(
+                'libfoo', 'openembedded', 'kirkstone', 'humble', ['foo'])
+            ResolutionCache(filename, 'db1', shared_cache=shared) \
+                .set_unresolved('bar', 'gentoo', '2.7', 'humble', 'no rule')
+            cache = ResolutionCache(filename, 'db1', shared_cache=shared)
+            self.assertEqual(
+                cache.get('libfoo', 'openembedded', 'kirkstone', 'humble'),
+                {'resolution': ['foo']})
+            self.assertEqual(cache.get('bar', 'gentoo', '2.7', 'humble'),
+                             {'unresolved': 'no rule'})
+            cache = ResolutionCache(filename, 'db2', shared_cache=shared)
+            self.assertIsNone(
+                cache.get('libfoo', 'openembedded', 'kirkstone', 'humble'))
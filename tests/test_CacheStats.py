@@ -0,0 +1,67 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+from superflore.CacheStats import CacheStats
+from superflore.CacheStats import cache_stats
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+
+class TestCacheStats(unittest.TestCase):
+    def test_summary(self):
+        """Test the statistics and the estimated time saved"""
+        stats = CacheStats()
+        stats.miss('SRCREV', secs=2.0, size=40)
+        stats.miss('SRCREV', secs=4.0, size=40)
+        for _ in range(6):
+            stats.hit('SRCREV', secs=0.5, size=40)
+        stats.evict('SRCREV', 2)
+        stats.hit('rosdep view')
+        summary = stats.get_summary()
+        self.assertEqual(summary['SRCREV']['hits'], 6)
+        self.assertEqual(summary['SRCREV']['misses'], 2)
+        self.assertEqual(summary['SRCREV']['evictions'], 2)
+        self.assertEqual(summary['SRCREV']['hit_bytes'], 240)
+        self.assertEqual(summary['SRCREV']['miss_bytes'], 80)
+        self.assertEqual(summary['SRCREV']['hit_rate'], 0.75)
+        # 6 hits saving 3s each, less the 3s spent on them
+        self.assertEqual(summary['SRCREV']['saved_secs'], 15.0)
+        self.assertEqual(summary['rosdep view']['hit_rate'], 1.0)
+        self.assertIsNone(summary['rosdep view']['saved_secs'])
+
+    def test_save(self):
+        """Test writing the statistics as JSON"""
+        stats = CacheStats()
+        stats.hit('package.xml', size=10)
+        with TempfileManager(None) as tmp:
+            stats.filename = os.path.join(tmp, 'stats', 'caches.json')
+            stats.save()
+            with open(stats.filename) as stats_file:
+                self.assertEqual(json.load(stats_file),
+                                 stats.get_summary())
+
+    def test_evictions(self):
+        """Test the package.xml cache reports its evictions"""
+        before = cache_stats.get_summary().get(
+            'package.xml', {'evictions': 0})['evictions']
+        cache = PackageXmlCache(max_entries=2)
+        for tag in ('a', 'b', 'c', 'd'):
+            cache.set('url', tag, b'<package/>')
+        self.assertEqual(
+            cache_stats.get_summary()['package.xml']['evictions'],
+            before + 2)
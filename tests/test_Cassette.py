@@ -0,0 +1,81 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import requests
+import rosdistro
+from superflore.Cassette import Cassette
+from superflore.Cassette import RECORD
+from superflore.Cassette import REPLAY
+from superflore.Cassette import set_cassette
+from superflore.exceptions import NoCassetteEntry
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+
+def _not_found(url):
+    response = requests.Response()
+    response.status_code = 404
+    raise requests.HTTPError('404 for ' + url, response=response)
+
+
+def _timeout(url):
+    raise requests.Timeout('timed out')
+
+
+class TestCassette(unittest.TestCase):
+    def test_record_replay(self):
+        """Test responses and definite failures are replayed"""
+        with TempfileManager(None) as tmp:
+            cassette = Cassette(tmp, RECORD)
+            self.assertEqual(
+                cassette.play('http', 'a', lambda: b'\x00body'), b'\x00body')
+            self.assertEqual(cassette.play('ls-remote', 'a', str, 'refs'),
+                             'refs')
+            with self.assertRaises(requests.HTTPError):
+                cassette.play('http', 'missing', _not_found, 'missing')
+            with self.assertRaises(requests.Timeout):
+                cassette.play('http', 'slow', _timeout, 'slow')
+            cassette = Cassette(tmp, REPLAY)
+            self.assertEqual(
+                cassette.play('http', 'a', _timeout, 'a'), b'\x00body')
+            self.assertEqual(
+                cassette.play('ls-remote', 'a', _timeout, 'a'), 'refs')
+            with self.assertRaises(requests.HTTPError) as cm:
+                cassette.play('http', 'missing', _timeout, 'missing')
+            self.assertEqual(cm.exception.response.status_code, 404)
+            with self.assertRaises(NoCassetteEntry):
+                cassette.play('http', 'slow', _timeout, 'slow')
+        with self.assertRaises(ValueError):
+            Cassette(tmp, 'rewind')
+
+    def test_rosdistro(self):
+        """Test rosdistro's index and distribution files are recorded"""
+        with TempfileManager(None) as tmp:
+            index = os.path.join(tmp, 'index.yaml')
+            with open(index, 'w') as index_file:
+                index_file.write('type: index\n')
+            url = 'file://' + index
+            cassette_dir = os.path.join(tmp, 'cassette')
+            try:
+                set_cassette(cassette_dir, RECORD)
+                self.assertEqual(rosdistro.load_url(url), 'type: index\n')
+                os.remove(index)
+                set_cassette(cassette_dir, REPLAY)
+                self.assertEqual(rosdistro.load_url(url), 'type: index\n')
+                self.assertEqual(rosdistro.load_url(url, skip_decode=True),
+                                 b'type: index\n')
+            finally:
+                set_cassette(None, None)
@@ -0,0 +1,141 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import weakref
+
+from rosdistro.dependency_walker import DependencyWalker
+from rosdistro.distribution import Distribution
+from rosdistro.distribution_file import DistributionFile
+from rosinstall_generator.distro import get_package_names
+from superflore.CompactDistro import CompactDistro
+from superflore.CompactDistro import DEPEND_TYPES
+from superflore.CompactDistro import get_dependency_walker
+from superflore.utils import get_pkg_version
+import unittest
+
+PACKAGE_XML = '''<?xml version="1.0"?>
+<package format="3">
+  <name>{0}</name>
+  <version>1.0.0</version>
+  <description>{0}</description>
+  <maintainer email="foo@example.com">Foo</maintainer>
+  <license>Apache License 2.0</license>
+  {1}
+</package>
+'''
+
+
+def make_distro(packages):
+    """
+    Return a Distribution of repositories {name: (version, {pkg_name:
+    dependencies})}
+    """
+    repositories = dict()
+    package_xmls = dict()
+    for repo_name, (version, pkgs) in packages.items():
+        repositories[repo_name] = {'release': {
+            'packages': sorted(pkgs),
+            'tags': {'release': 'release/humble/{package}/{version}'},
+            'url': 'https://github.com/ros2-gbp/%s-release.git' % repo_name,
+            'version': version}}
+        for pkg_name, depends in pkgs.items():
+            package_xmls[pkg_name] = PACKAGE_XML.format(pkg_name, depends)
+    distribution_file = DistributionFile('humble', {
+        'type': 'distribution', 'version': 2,
+        'release_platforms': {'ubuntu': ['jammy']},
+        'repositories': repositories})
+    return Distribution(
+        distribution_file,
+        [lambda _, repo, pkg_name: package_xmls.get(pkg_name)])
+
+
+class TestCompactDistro(unittest.TestCase):
+    def setUp(self):
+        self.distro = make_distro({
+            'foo': ('1.0.0-1', {
+                'foo': '<depend>foo_msgs</depend>'
+                       '<exec_depend>libyaml</exec_depend>'
+                       '<test_depend condition="$ROS_VERSION == 1">'
+                       'rostest</test_depend>'
+                       '<test_depend condition="$ROS_VERSION == 2">'
+                       'ament_lint</test_depend>',
+                'foo_msgs': '<buildtool_depend>ament_cmake'
+                            '</buildtool_depend>'}),
+            'bar': ('2.1.0-0', {'bar': '<build_depend>foo</build_depend>'}),
+            'baz': (None, {'baz': ''}),
+        })
+
+    def test_depends(self):
+        """Test the dependencies are the same as DependencyWalker's"""
+        context = {'ROS_VERSION': '2'}
+        compact = CompactDistro(self.distro, context)
+        walker = DependencyWalker(self.distro, context)
+        for pkg_name in ('foo', 'foo_msgs', 'bar'):
+            for depend_type in DEPEND_TYPES:
+                for ros_packages_only in (False, True):
+                    self.assertEqual(
+                        compact.get_depends(
+                            pkg_name, depend_type, ros_packages_only),
+                        walker.get_depends(
+                            pkg_name, depend_type, ros_packages_only))
+        self.assertEqual(compact.get_depends('foo', 'test'), {'ament_lint'})
+        # baz is not released, as with DependencyWalker
+        with self.assertRaises(AssertionError):
+            compact.get_depends('baz', 'build')
+        with self.assertRaises(KeyError):
+            compact.get_depends('qux', 'build')
+
+    def test_distro(self):
+        """Test the subset of the Distribution API used while generating"""
+        compact = CompactDistro(self.distro)
+        self.assertEqual(compact.name, 'humble')
+        self.assertEqual(compact.release_platforms, {'ubuntu': ['jammy']})
+        self.assertEqual(get_package_names(compact),
+                         get_package_names(self.distro))
+        self.assertEqual(get_pkg_version(compact, 'foo'), '1.0.0-r1')
+        self.assertEqual(get_pkg_version(compact, 'bar', is_oe=True),
+                         '2.1.0')
+        pkg = compact.release_packages['foo_msgs']
+        self.assertEqual(pkg.repository_name, 'foo')
+        repo = compact.repositories['foo'].release_repository
+        self.assertEqual(
+            repo.get_release_tag('foo_msgs'),
+            self.distro.repositories['foo'].release_repository
+            .get_release_tag('foo_msgs'))
+        self.assertEqual(repo.url,
+                         'https://github.com/ros2-gbp/foo-release.git')
+        self.assertEqual(compact.get_release_package_xml('bar'),
+                         self.distro.get_release_package_xml('bar'))
+
+    def test_source_released(self):
+        """Test the source Distribution is freed once the model is built"""
+        compact = CompactDistro(self.distro)
+        ref = weakref.ref(self.distro)
+        del self.distro
+        gc.collect()
+        self.assertIsNone(ref())
+        # the error of the unreleased package is kept without the distro
+        with self.assertRaises(AssertionError):
+            compact.get_depends('baz', 'build')
+
+    def test_get_dependency_walker(self):
+        """Test a CompactDistro is its own DependencyWalker"""
+        compact = CompactDistro(self.distro, {'ROS_VERSION': '1'})
+        self.assertIs(
+            get_dependency_walker(compact, {'ROS_VERSION': '1'}), compact)
+        with self.assertRaises(ValueError):
+            get_dependency_walker(compact, {'ROS_VERSION': '2'})
+        self.assertIsInstance(
+            get_dependency_walker(self.distro), DependencyWalker)
@@ -0,0 +1,53 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+from superflore.ConcurrencyLimit import ConcurrencyLimit
+import unittest
+
+
+class TestConcurrencyLimit(unittest.TestCase):
+    def test_increase(self):
+        """Test the limit grows by about one per round of requests"""
+        limit = ConcurrencyLimit(initial=2, maximum=4)
+        for _ in range(3):
+            limit.release(limit.acquire())
+        self.assertEqual(limit.get_limit(), 3)
+        for _ in range(20):
+            limit.release(limit.acquire())
+        self.assertEqual(limit.get_limit(), 4)
+
+    def test_decrease(self):
+        """Test rate limiting halves the limit once per burst"""
+        limit = ConcurrencyLimit(initial=8, default_pause=0.0)
+        acquired = [limit.acquire() for _ in range(4)]
+        for started in acquired:
+            limit.release(started, rate_limited=True)
+        self.assertEqual(limit.get_limit(), 4)
+        self.assertEqual(limit.backoffs, 1)
+        limit.release(limit.acquire(), rate_limited=True)
+        limit.release(limit.acquire(), rate_limited=True)
+        limit.release(limit.acquire(), rate_limited=True)
+        # but never below the minimum
+        self.assertEqual(limit.get_limit(), 1)
+        self.assertEqual(limit.lowest, 1)
+
+    def test_retry_after(self):
+        """Test requests are paused for the given time"""
+        limit = ConcurrencyLimit()
+        limit.release(limit.acquire(), rate_limited=True, retry_after=0.2)
+        start = time.monotonic()
+        limit.release(limit.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
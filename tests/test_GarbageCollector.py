@@ -0,0 +1,207 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fcntl
+import json
+import os
+import time
+
+from superflore.GarbageCollector import forget_dropped_distro
+from superflore.GarbageCollector import GarbageCollector
+from superflore.GarbageCollector import parse_size
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.SqliteCache import SqliteCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+from unittest import mock
+
+DAY = 24 * 60 * 60
+
+
+class TestGarbageCollector(unittest.TestCase):
+    def _add_entry(self, cache_dir, name, size, days_unused):
+        path = os.path.join(cache_dir, 'package-xml', name[:2], name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as entry_file:
+            entry_file.write(b'x' * size)
+        last_used = time.time() - days_unused * DAY
+        os.utime(path, (last_used, last_used))
+        return path
+
+    def test_parse_size(self):
+        """Test parsing sizes with units"""
+        self.assertEqual(parse_size('1048576'), 1048576)
+        self.assertEqual(parse_size('512K'), 512 * 1024)
+        self.assertEqual(parse_size('1.5gb'), int(1.5 * 1024 ** 3))
+        with self.assertRaises(ValueError):
+            parse_size('lots')
+
+    def test_budget(self):
+        """Test the least recently used entries are removed first"""
+        with TempfileManager(None) as cache_dir:
+            oldest = self._add_entry(cache_dir, 'aa1', 1000, 3)
+            old = self._add_entry(cache_dir, 'bb1', 1000, 2)
+            recent = self._add_entry(cache_dir, 'cc1', 1000, 1)
+            collector = GarbageCollector(cache_dir, max_bytes=2500)
+            self.assertTrue(collector.run())
+            self.assertFalse(os.path.exists(oldest))
+            self.assertTrue(os.path.exists(old))
+            self.assertTrue(os.path.exists(recent))
+            self.assertEqual(collector.removed, 1)
+            self.assertEqual(collector.reclaimed, 1000)
+
+    def test_budget_files(self):
+        """Test the single-file caches count towards the budget"""
+        with TempfileManager(None) as cache_dir:
+            old = self._add_entry(cache_dir, 'aa1', 1000, 2)
+            recent = self._add_entry(cache_dir, 'bb1', 1000, 1)
+            checksum_filename = os.path.join(cache_dir, 'checksums.sqlite')
+            with SqliteCache(checksum_filename) as checksum_cache:
+                checksum_cache['uri'] = 'a' * 64
+            collector = GarbageCollector(
+                cache_dir, checksum_filename=checksum_filename)
+            files_size = collector.get_files_size()
+            self.assertEqual(files_size, os.path.getsize(checksum_filename))
+            # both entries fit, but not with the checksum cache
+            collector.max_bytes = 1500 + files_size
+            collector.run()
+            self.assertFalse(os.path.exists(old))
+            self.assertTrue(os.path.exists(recent))
+
+    def test_max_age(self):
+        """Test entries unused for too long are removed"""
+        with TempfileManager(None) as cache_dir:
+            old = self._add_entry(cache_dir, 'aa1', 10, 8)
+            recent = self._add_entry(cache_dir, 'bb1', 10, 6)
+            GarbageCollector(cache_dir, max_age=7 * DAY).run()
+            self.assertFalse(os.path.exists(old))
+            self.assertTrue(os.path.exists(recent))
+
+    def test_in_use(self):
+        """Test recently used entries and temporary files are kept"""
+        with TempfileManager(None) as cache_dir:
+            in_use = self._add_entry(cache_dir, 'aa1', 1000, 0)
+            tmp = self._add_entry(cache_dir, 'tmp1234', 1000, 0)
+            stale_tmp = self._add_entry(cache_dir, 'tmp5678', 1000, 2)
+            GarbageCollector(cache_dir, max_bytes=0).run()
+            self.assertTrue(os.path.exists(in_use))
+            self.assertTrue(os.path.exists(tmp))
+            self.assertFalse(os.path.exists(stale_tmp))
+
+    def test_concurrent(self):
+        """Test only one process collects the garbage at a time"""
+        with TempfileManager(None) as cache_dir:
+            path = self._add_entry(cache_dir, 'aa1', 10, 10)
+            with open(os.path.join(cache_dir, 'gc.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self.assertFalse(GarbageCollector(cache_dir, max_bytes=0).run())
+            self.assertTrue(os.path.exists(path))
+
+    def test_eol(self):
+        """Test dropping the entries of an end-of-life distro"""
+        with TempfileManager(None) as cache_dir:
+            with open(os.path.join(cache_dir, 'rosdep-resolutions.json'),
+                      'w') as cache_file:
+                json.dump({'stamp': 'db1', 'entries': {
+                    'libfoo/gentoo/2.7/foxy': {'resolution': ['foo']},
+                    'libfoo/gentoo/2.7/humble': {'resolution': ['foo']},
+                }}, cache_file)
+            with open(os.path.join(cache_dir, 'negative-cache.json'),
+                      'w') as cache_file:
+                json.dump({'foxy/foo/1.0.0-1': {'time': 0, 'reason': 'x'},
+                           'humble/foo/1.0.0-1': {'time': 0, 'reason': 'x'}},
+                          cache_file)
+            srcrev_filename = os.path.join(cache_dir, 'srcrev_cache.sqlite')
+            uri = 'https://github.com/ros2-gbp/foo-release/archive/release/' \
+                '{0}/foo/1.0.0-1.tar.gz'
+            with SqliteCache(srcrev_filename) as srcrev_cache:
+                srcrev_cache[uri.format('foxy')] = 'a5be1e2c'
+                srcrev_cache[uri.format('humble')] = '48bf1aa1'
+            checksum_filename = os.path.join(
+                cache_dir, 'checksum_cache.sqlite')
+            with SqliteCache(checksum_filename) as checksum_cache:
+                checksum_cache[uri.format('foxy')] = 'a' * 64
+                checksum_cache[uri.format('humble')] = 'b' * 64
+            collector = GarbageCollector(
+                cache_dir, srcrev_filename,
+                checksum_filename=checksum_filename)
+            collector.run(eol_distros=['foxy'])
+            self.assertGreater(collector.reclaimed, 0)
+            with open(os.path.join(cache_dir, 'rosdep-resolutions.json')) \
+                    as cache_file:
+                self.assertEqual(list(json.load(cache_file)['entries']),
+                                 ['libfoo/gentoo/2.7/humble'])
+            with open(os.path.join(cache_dir, 'negative-cache.json')) \
+                    as cache_file:
+                self.assertEqual(list(json.load(cache_file)),
+                                 ['humble/foo/1.0.0-1'])
+            with SqliteCache(srcrev_filename) as srcrev_cache:
+                self.assertEqual(list(srcrev_cache), [uri.format('humble')])
+            with SqliteCache(checksum_filename) as checksum_cache:
+                self.assertEqual(list(checksum_cache),
+                                 [uri.format('humble')])
+
+    def test_eol_gentoo(self):
+        """Test the gentoo resolutions are of no end-of-life distro"""
+        with TempfileManager(None) as cache_dir:
+            filename = os.path.join(cache_dir, 'rosdep-resolutions.json')
+            with open(filename, 'w') as cache_file:
+                json.dump({'stamp': 'db1', 'entries': {
+                    'boost/gentoo/2.4.0/indigo': {'resolution': ['boost']},
+                    'boost/openembedded//foxy': {'resolution': ['boost']},
+                    'boost/openembedded//humble': {'resolution': ['boost']},
+                }}, cache_file)
+            GarbageCollector(cache_dir).run(eol_distros=['indigo', 'foxy'])
+            with open(filename) as cache_file:
+                self.assertEqual(sorted(json.load(cache_file)['entries']), [
+                    'boost/gentoo/2.4.0/indigo',
+                    'boost/openembedded//humble'])
+
+    def test_eol_once(self):
+        """Test the caches are only rewritten to drop entries, once"""
+        with TempfileManager(None) as cache_dir:
+            filename = os.path.join(cache_dir, 'rosdep-resolutions.json')
+            with open(filename, 'w') as cache_file:
+                json.dump({'stamp': 'db1', 'entries': {
+                    'boost/openembedded//humble': {'resolution': ['boost']},
+                }}, cache_file)
+            srcrev_filename = os.path.join(cache_dir, 'srcrev_cache.sqlite')
+            with SqliteCache(srcrev_filename) as srcrev_cache:
+                srcrev_cache['https://github.com/ros2-gbp/foo-release/'
+                             'archive/release/humble/foo/1.0.0-1.tar.gz'] = \
+                    '48bf1aa1'
+            inode = os.stat(filename).st_ino
+            with mock.patch.object(SqliteCache, 'vacuum') as vacuum:
+                collector = GarbageCollector(cache_dir, srcrev_filename)
+                collector.run(eol_distros=['foxy'])
+                self.assertEqual(collector.removed, 0)
+                self.assertEqual(os.stat(filename).st_ino, inode)
+                vacuum.assert_not_called()
+            # foxy is not looked for again, unless it is generated again
+            with mock.patch.object(GarbageCollector, 'drop_distro') as drop:
+                GarbageCollector(cache_dir).run(eol_distros=['foxy'])
+                drop.assert_not_called()
+                forget_dropped_distro(cache_dir, 'foxy')
+                GarbageCollector(cache_dir).run(eol_distros=['foxy'])
+                drop.assert_called_once_with('foxy')
+
+    def test_touch(self):
+        """Test using a cached package.xml marks it as recently used"""
+        with TempfileManager(None) as cache_dir:
+            PackageXmlCache(cache_dir).set('url', 'tag', b'<package/>')
+            path = PackageXmlCache(cache_dir).get_path(
+                PackageXmlCache.get_key('url', 'tag'))
+            os.utime(path, (0, 0))
+            PackageXmlCache(cache_dir).get('url', 'tag')
+            self.assertGreater(os.stat(path).st_mtime, time.time() - DAY)
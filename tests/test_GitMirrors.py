@@ -0,0 +1,69 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from git import Repo
+from superflore.GitMirrors import GitMirrors
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+
+def _make_release_repo(path):
+    """Creates a release repository with two tagged package.xml files"""
+    repo = Repo.init(path)
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'superflore')
+        config.set_value('user', 'email', 'superflore@example.com')
+    for version in ['1.0.0-1', '1.0.1-1']:
+        with open(os.path.join(path, 'package.xml'), 'w') as pkg_xml:
+            pkg_xml.write('<package>%s</package>\n' % version)
+        repo.index.add(['package.xml'])
+        repo.index.commit('Release ' + version)
+        repo.create_tag('release/lunar/my_pkg/' + version)
+    return repo
+
+
+class TestGitMirrors(unittest.TestCase):
+    def test_get_file(self):
+        """Test reading files at release tags from a mirror"""
+        with TempfileManager(None) as tmp:
+            upstream = os.path.join(tmp, 'my_repo-release')
+            _make_release_repo(upstream)
+            mirrors = GitMirrors(os.path.join(tmp, 'mirrors'))
+            self.assertEqual(
+                mirrors.get_file(upstream, 'release/lunar/my_pkg/1.0.0-1'),
+                b'<package>1.0.0-1</package>\n')
+            self.assertEqual(
+                mirrors.get_file(upstream, 'release/lunar/my_pkg/1.0.1-1'),
+                b'<package>1.0.1-1</package>\n')
+            self.assertTrue(os.path.isdir(mirrors.get_path(upstream)))
+            # unknown tags don't trigger another fetch in the same run
+            mirrors.refresh = None
+            self.assertIsNone(
+                mirrors.get_file(upstream, 'release/lunar/my_pkg/2.0.0-1'))
+            # a later run reads the existing mirror without fetching
+            mirrors = GitMirrors(os.path.join(tmp, 'mirrors'))
+            mirrors.refresh = None
+            self.assertEqual(
+                mirrors.get_file(upstream, 'release/lunar/my_pkg/1.0.0-1'),
+                b'<package>1.0.0-1</package>\n')
+
+    def test_unreachable(self):
+        """Test an unreachable repository yields no file"""
+        with TempfileManager(None) as tmp:
+            mirrors = GitMirrors(os.path.join(tmp, 'mirrors'))
+            missing = os.path.join(tmp, 'does-not-exist')
+            self.assertIsNone(mirrors.get_file(missing, 'some/tag'))
+            self.assertIn(missing, mirrors.refreshed)
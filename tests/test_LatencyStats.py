@@ -0,0 +1,41 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from superflore.LatencyStats import LatencyStats
+import unittest
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_percentiles(self):
+        """Test the nearest rank percentiles"""
+        stats = LatencyStats()
+        self.assertIsNone(stats.get_percentile('ls-remote', 95))
+        for secs in range(1, 101):
+            stats.add('ls-remote', float(secs))
+        self.assertEqual(stats.get_percentile('ls-remote', 50), 50.0)
+        self.assertEqual(stats.get_percentile('ls-remote', 95), 95.0)
+        self.assertEqual(stats.get_percentile('ls-remote', 100), 100.0)
+        self.assertIsNone(
+            stats.get_percentile('ls-remote', 95, min_samples=101))
+        summary = stats.get_summary()['ls-remote']
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['p99'], 99.0)
+
+    def test_max_samples(self):
+        """Test only the latest samples are kept"""
+        stats = LatencyStats(max_samples=10)
+        for secs in range(100):
+            stats.add('package.xml', float(secs))
+        self.assertEqual(stats.get_percentile('package.xml', 0), 90.0)
+        self.assertEqual(stats.counts['package.xml'], 100)
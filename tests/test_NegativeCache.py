@@ -0,0 +1,55 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from superflore.NegativeCache import NegativeCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+
+class TestNegativeCache(unittest.TestCase):
+    def test_ttl(self):
+        """Test entries expire after the ttl"""
+        cache = NegativeCache()
+        self.assertIsNone(cache.get('humble', 'foo', '1.0.0-1'))
+        cache.add('humble', 'foo', '1.0.0-1', 'gone')
+        self.assertEqual(cache.get('humble', 'foo', '1.0.0-1'), 'gone')
+        self.assertIsNone(cache.get('humble', 'foo', '1.0.1-1'))
+        self.assertEqual(cache.skipped, {'humble/foo/1.0.0-1': 'gone'})
+        cache.ttl = 0
+        self.assertIsNone(cache.get('humble', 'foo', '1.0.0-1'))
+
+    def test_persistent(self):
+        """Test entries are kept across runs"""
+        with TempfileManager(None) as tmp:
+            filename = os.path.join(tmp, 'negative-cache.json')
+            NegativeCache(filename).add('humble', 'foo', '1.0.0-1', 'gone')
+            self.assertEqual(
+                NegativeCache(filename).get('humble', 'foo', '1.0.0-1'),
+                'gone')
+            # expired entries are dropped when saving
+            cache = NegativeCache(filename, ttl=0)
+            cache.add('humble', 'bar', '1.0.0-1', 'gone')
+            self.assertEqual(
+                list(NegativeCache(filename).entries), [])
+
+    def test_corrupt_file(self):
+        """Test an unreadable file is ignored"""
+        with TempfileManager(None) as tmp:
+            filename = os.path.join(tmp, 'negative-cache.json')
+            with open(filename, 'w') as cache_file:
+                cache_file.write('{')
+            cache = NegativeCache(filename)
+            self.assertIsNone(cache.get('humble', 'foo', '1.0.0-1'))
@@ -0,0 +1,67 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+URL = 'https://github.com/ros2-gbp/rclcpp-release.git'
+TAG = 'release/humble/rclcpp/16.0.4-1'
+
+
+class TestPackageXmlCache(unittest.TestCase):
+    def test_memory_only(self):
+        """Test the cache without a cache directory"""
+        cache = PackageXmlCache()
+        self.assertIsNone(cache.get(URL, TAG))
+        cache.set(URL, TAG, b'<package/>')
+        self.assertEqual(cache.get(URL, TAG), b'<package/>')
+        self.assertIsNone(cache.get(URL, 'release/humble/rclcpp/16.0.5-1'))
+
+    def test_persistent(self):
+        """Test entries persist in the cache directory"""
+        with TempfileManager(None) as tmp:
+            cache = PackageXmlCache(tmp)
+            cache.set(URL, TAG, '<package>ü</package>')
+            key = PackageXmlCache.get_key(URL, TAG)
+            self.assertTrue(os.path.isfile(cache.get_path(key)))
+            # a fresh instance reads it back from disk
+            cache = PackageXmlCache(tmp)
+            self.assertEqual(
+                cache.get(URL, TAG), '<package>ü</package>'.encode('utf-8'))
+
+    def test_lru(self):
+        """Test the in-memory part is bounded"""
+        cache = PackageXmlCache(max_entries=2)
+        cache.set(URL, 'a', b'a')
+        cache.set(URL, 'b', b'b')
+        # touch 'a' so that 'b' is the least recently used entry
+        self.assertEqual(cache.get(URL, 'a'), b'a')
+        cache.set(URL, 'c', b'c')
+        self.assertEqual(len(cache.entries), 2)
+        self.assertIsNone(cache.get(URL, 'b'))
+        self.assertEqual(cache.get(URL, 'a'), b'a')
+        self.assertEqual(cache.get(URL, 'c'), b'c')
+
+    def test_corrupt_entry(self):
+        """Test an unreadable entry is treated as a miss"""
+        with TempfileManager(None) as tmp:
+            cache = PackageXmlCache(tmp)
+            cache.set(URL, TAG, b'<package/>')
+            with open(cache.get_path(PackageXmlCache.get_key(URL, TAG)),
+                      'wb') as cache_file:
+                cache_file.write(b'not gzipped')
+            self.assertIsNone(PackageXmlCache(tmp).get(URL, TAG))
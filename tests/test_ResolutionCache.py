@@ -0,0 +1,45 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from superflore.ResolutionCache import ResolutionCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+
+class TestResolutionCache(unittest.TestCase):
+    def test_persistent(self):
+        """Test resolutions are kept while the rosdep database is the same"""
+        with TempfileManager(None) as tmp:
+            filename = os.path.join(tmp, 'rosdep-resolutions.json')
+            cache = ResolutionCache(filename, '1')
+            self.assertIsNone(cache.get('cmake', 'gentoo', '2.4.0', 'humble'))
+            cache.set('cmake', 'gentoo', '2.4.0', 'humble',
+                      (['dev-util/cmake'], 'portage', 'portage'))
+            cache.set_unresolved('nope', 'gentoo', '2.4.0', 'humble',
+                                 'could not resolve package nope')
+            cache.save()
+            cache = ResolutionCache(filename, '1')
+            self.assertEqual(
+                cache.get('cmake', 'gentoo', '2.4.0', 'humble'),
+                {'resolution': [['dev-util/cmake'], 'portage', 'portage']})
+            self.assertEqual(
+                cache.get('nope', 'gentoo', '2.4.0', 'humble'),
+                {'unresolved': 'could not resolve package nope'})
+            self.assertIsNone(
+                cache.get('cmake', 'openembedded', '', 'humble'))
+            # after "rosdep update" everything is resolved again
+            cache = ResolutionCache(filename, '2')
+            self.assertIsNone(cache.get('cmake', 'gentoo', '2.4.0', 'humble'))
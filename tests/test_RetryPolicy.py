@@ -0,0 +1,104 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+
+from superflore import RetryPolicy as retry_policy
+from superflore.exceptions import NoPkgXml
+from superflore.RetryPolicy import RetryPolicy
+from superflore.RetryPolicy import set_run_budget
+import unittest
+
+
+class _Flaky:
+    """Fails the first failures calls with exception"""
+    def __init__(self, failures, exception=OSError):
+        self.failures = failures
+        self.exception = exception
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.exception('Failure')
+        return value
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        retry_policy.retry_stats.clear()
+
+    def tearDown(self):
+        set_run_budget(None)
+
+    def test_call(self):
+        """Test retrying and the per call site counters"""
+        policy = RetryPolicy('test', max_retries=3, base_secs=0.001)
+        self.assertEqual(policy.call(_Flaky(3), 'ok'), 'ok')
+        with self.assertRaises(OSError):
+            policy.call(_Flaky(4), 'ok')
+        stats = retry_policy.retry_stats['test']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['retries'], 6)
+        self.assertEqual(stats['failures'], 1)
+
+    def test_full_jitter(self):
+        """Test the delays are random, but bounded"""
+        policy = RetryPolicy('test', base_secs=1.0, max_secs=5.0)
+        for num_retry in range(1, 10):
+            delays = set(policy.get_delay(num_retry) for _ in range(20))
+            self.assertGreater(len(delays), 1)
+            for delay in delays:
+                self.assertGreaterEqual(delay, 0.0)
+                self.assertLessEqual(
+                    delay, min(5.0, 2.0 ** (num_retry - 1)))
+
+    def test_fatal(self):
+        """Test fatal and non retryable exceptions aren't retried"""
+        policy = RetryPolicy('test', base_secs=0.001)
+        flaky = _Flaky(1, NoPkgXml)
+        with self.assertRaises(NoPkgXml):
+            policy.call(flaky, 'ok')
+        self.assertEqual(flaky.calls, 1)
+        policy = RetryPolicy('test', base_secs=0.001, retryable=(OSError,))
+        flaky = _Flaky(1, ValueError)
+        with self.assertRaises(ValueError):
+            policy.call(flaky, 'ok')
+        self.assertEqual(flaky.calls, 1)
+
+    def test_budget(self):
+        """Test retries stop at the per call and per run budgets"""
+        policy = RetryPolicy('test', max_retries=100, backoff=lambda n: 0.05,
+                             budget=0.2)
+        start = time.monotonic()
+        with self.assertRaises(OSError):
+            policy.call(_Flaky(100), 'ok')
+        self.assertLess(time.monotonic() - start, 0.3)
+        set_run_budget(0)
+        flaky = _Flaky(1)
+        with self.assertRaises(OSError):
+            RetryPolicy('test', base_secs=0.001).call(flaky, 'ok')
+        self.assertEqual(flaky.calls, 1)
+
+    def test_call_async(self):
+        """Test retrying coroutines"""
+        flaky = _Flaky(2)
+
+        async def callback(value):
+            return flaky(value)
+        policy = RetryPolicy('test', base_secs=0.001)
+        self.assertEqual(
+            asyncio.run(policy.call_async(callback, 'ok')), 'ok')
+        self.assertEqual(flaky.calls, 3)
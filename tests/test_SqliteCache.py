@@ -0,0 +1,78 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import pickle
+
+from superflore.SqliteCache import SqliteCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+
+
+class TestSqliteCache(unittest.TestCase):
+    def test_cache(self):
+        """Test the entries are kept across runs"""
+        with TempfileManager(None) as tmp:
+            cache_file = os.path.join(tmp, 'my_cache.sqlite')
+            with SqliteCache(cache_file) as cache:
+                self.assertNotIn('a', cache)
+                cache['a'] = 'A'
+                cache['b'] = 'B'
+                cache['b'] = 'BB'
+                cache.update({'c': 'C', 'd': 'D'})
+                del cache['d']
+                with self.assertRaises(KeyError):
+                    cache['d']
+            with SqliteCache(cache_file) as cache:
+                self.assertEqual(dict(cache), {'a': 'A', 'b': 'BB', 'c': 'C'})
+                self.assertEqual(len(cache), 3)
+
+    def test_in_memory(self):
+        """Test the cache without a file"""
+        with SqliteCache(None) as cache:
+            cache['a'] = 'A'
+            self.assertEqual(cache['a'], 'A')
+
+    def test_incremental(self):
+        """Test entries are visible to other users right away"""
+        with TempfileManager(None) as tmp:
+            cache_file = os.path.join(tmp, 'my_cache.sqlite')
+            with SqliteCache(cache_file) as first:
+                with SqliteCache(cache_file) as second:
+                    first['a'] = 'A'
+                    self.assertEqual(second['a'], 'A')
+
+    def test_threads(self):
+        """Test the cache is shared by several threads"""
+        with TempfileManager(None) as tmp:
+            cache_file = os.path.join(tmp, 'my_cache.sqlite')
+            with SqliteCache(cache_file) as cache:
+                def add(i):
+                    cache[str(i)] = str(i)
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    list(executor.map(add, range(100)))
+                self.assertEqual(len(cache), 100)
+
+    def test_migration(self):
+        """Test the entries of a legacy pickled cache are migrated once"""
+        with TempfileManager(None) as tmp:
+            with open(os.path.join(tmp, 'my_cache.pickle'), 'wb') as legacy:
+                pickle.dump({'a': 'A'}, legacy)
+            cache_file = os.path.join(tmp, 'my_cache.sqlite')
+            with SqliteCache(cache_file) as cache:
+                self.assertEqual(dict(cache), {'a': 'A'})
+                del cache['a']
+            with SqliteCache(cache_file) as cache:
+                self.assertEqual(dict(cache), {})
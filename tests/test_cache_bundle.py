@@ -0,0 +1,157 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import tarfile
+
+from superflore import cache_bundle
+from superflore.cache_bundle import export_bundle
+from superflore.cache_bundle import import_bundle
+from superflore.distro_snapshot import get_snapshot_path
+from superflore.distro_snapshot import load_snapshot
+from superflore.distro_snapshot import save_snapshot
+from superflore.exceptions import InvalidBundle
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.ResolutionCache import ResolutionCache
+from superflore.SqliteCache import SqliteCache
+from superflore.TempfileManager import TempfileManager
+from tests.test_CompactDistro import make_distro
+import unittest
+from unittest import mock
+
+URL = 'https://github.com/ros2-gbp/rclcpp-release.git'
+TAG = 'release/humble/rclcpp/16.0.4-1'
+SRC_URI = 'https://github.com/ros2-gbp/rclcpp-release/archive/' + TAG + \
+    '.tar.gz'
+
+
+class TestCacheBundle(unittest.TestCase):
+    def _fill_caches(self, cache_dir):
+        PackageXmlCache(cache_dir).set(URL, TAG, b'<package/>')
+        resolutions = ResolutionCache(
+            os.path.join(cache_dir, 'rosdep-resolutions.json'), 'db1')
+        resolutions.set('libfoo', 'openembedded', 'kirkstone', 'humble',
+                        ['foo'])
+        resolutions.save()
+        with SqliteCache(os.path.join(cache_dir, 'srcrevs.sqlite')) as c:
+            c[SRC_URI] = '48bf1aa1cb083a884fbc8520ced00523255aeaed'
+        save_snapshot(get_snapshot_path(
+            os.path.join(cache_dir, 'distro-snapshots'), 'humble'),
+            {'name': 'humble'})
+
+    def test_export_import(self):
+        """Test seeding empty caches from a bundle"""
+        with TempfileManager(None) as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            self._fill_caches(cache_dir)
+            bundle = os.path.join(tmp, 'bundle.tar.gz')
+            self.assertEqual(export_bundle(
+                bundle, cache_dir, os.path.join(cache_dir, 'srcrevs.sqlite')),
+                4)
+            new_cache_dir = os.path.join(tmp, 'new-cache')
+            srcrev_filename = os.path.join(tmp, 'tar', 'srcrev_cache.sqlite')
+            manifest = import_bundle(bundle, new_cache_dir, srcrev_filename)
+            self.assertIsNone(manifest['distro'])
+            self.assertEqual(
+                PackageXmlCache(new_cache_dir).get(URL, TAG), b'<package/>')
+            resolutions = ResolutionCache(
+                os.path.join(new_cache_dir, 'rosdep-resolutions.json'), 'db1')
+            self.assertEqual(
+                resolutions.get('libfoo', 'openembedded', 'kirkstone',
+                                'humble'),
+                {'resolution': ['foo']})
+            with SqliteCache(srcrev_filename) as srcrev_cache:
+                self.assertEqual(
+                    srcrev_cache,
+                    {SRC_URI: '48bf1aa1cb083a884fbc8520ced00523255aeaed'})
+            self.assertEqual(load_snapshot(get_snapshot_path(
+                os.path.join(new_cache_dir, 'distro-snapshots'), 'humble')),
+                {'name': 'humble'})
+            # only the imported files are left
+            self.assertEqual(
+                sorted(os.listdir(new_cache_dir)),
+                ['distro-snapshots', 'package-xml',
+                 'rosdep-resolutions.json'])
+
+    def test_distro_bundle(self):
+        """Test a bundle of a distro has the gentoo resolutions too"""
+        with TempfileManager(None) as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            self._fill_caches(cache_dir)
+            resolutions = ResolutionCache(
+                os.path.join(cache_dir, 'rosdep-resolutions.json'), 'db1')
+            resolutions.set('libfoo', 'openembedded', '', 'jazzy', ['foo'])
+            resolutions.set('libfoo', 'gentoo', '2.4.0', 'indigo', ['foo'])
+            resolutions.save()
+            bundle = os.path.join(tmp, 'bundle.tar.gz')
+            distro = make_distro({'rclcpp': ('16.0.4-1', {'rclcpp': ''})})
+            with mock.patch.object(cache_bundle, 'get_distro',
+                                   return_value=distro):
+                export_bundle(bundle, cache_dir, distro_name='humble')
+            new_cache_dir = os.path.join(tmp, 'new-cache')
+            import_bundle(bundle, new_cache_dir)
+            with open(os.path.join(new_cache_dir,
+                                   'rosdep-resolutions.json')) as cache_file:
+                self.assertEqual(sorted(json.load(cache_file)['entries']), [
+                    'libfoo/gentoo/2.4.0/indigo',
+                    'libfoo/openembedded/kirkstone/humble'])
+
+    def test_pickled_snapshot(self):
+        """Test pickled snapshots of a bundle are never unpickled"""
+        with TempfileManager(None) as tmp:
+            data = pickle.dumps({'schema': 2, 'data': {'name': 'humble'}})
+            bundle = os.path.join(tmp, 'bundle.tar.gz')
+            manifest = json.dumps({
+                'format': 1, 'distro': None, 'created': 0, 'files': {
+                    'distro-snapshots/humble.pickle':
+                    hashlib.sha256(data).hexdigest()}}).encode()
+            with tarfile.open(bundle, 'w:gz') as tar:
+                for name, content in (
+                        ('MANIFEST.json', manifest),
+                        ('distro-snapshots/humble.pickle', data)):
+                    member = tarfile.TarInfo(name)
+                    member.size = len(content)
+                    tar.addfile(member, io.BytesIO(content))
+            new_cache_dir = os.path.join(tmp, 'new-cache')
+            import_bundle(bundle, new_cache_dir)
+            self.assertEqual(os.listdir(new_cache_dir), [])
+
+    def test_corrupt_bundle(self):
+        """Test a bundle with a wrong checksum is not imported at all"""
+        with TempfileManager(None) as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            self._fill_caches(cache_dir)
+            bundle = os.path.join(tmp, 'bundle.tar.gz')
+            export_bundle(bundle, cache_dir)
+            corrupt = os.path.join(tmp, 'corrupt.tar.gz')
+            with tarfile.open(bundle, 'r:gz') as tar:
+                with tarfile.open(corrupt, 'w:gz') as corrupt_tar:
+                    for member in tar:
+                        data = tar.extractfile(member)
+                        if member.name == 'rosdep-resolutions.json':
+                            data = io.BytesIO()
+                            member.size = 0
+                        corrupt_tar.addfile(member, data)
+            new_cache_dir = os.path.join(tmp, 'new-cache')
+            with self.assertRaises(InvalidBundle):
+                import_bundle(corrupt, new_cache_dir)
+            self.assertEqual(os.listdir(new_cache_dir), [])
+            with open(corrupt, 'wb') as corrupt_file:
+                corrupt_file.write(b'not a bundle')
+            with self.assertRaises(InvalidBundle):
+                import_bundle(corrupt, new_cache_dir)
@@ -0,0 +1,194 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import os
+import threading
+
+from rosdistro.dependency_walker import DependencyWalker
+from superflore import distro_snapshot
+from superflore import manifest_provider
+from superflore.distro_snapshot import get_distro
+from superflore.distro_snapshot import get_light_distro
+from superflore.distro_snapshot import read_snapshot
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.TempfileManager import TempfileManager
+import unittest
+from unittest import mock
+
+INDEX = '''%YAML 1.1
+---
+type: index
+version: 4
+distributions:
+  humble:
+    distribution: [humble/distribution.yaml]
+    distribution_cache: {0}/humble-cache.yaml.gz
+    distribution_status: active
+    distribution_type: ros2
+    python_version: 3
+'''
+DISTRIBUTION = '''%YAML 1.1
+---
+type: distribution
+version: 2
+release_platforms:
+  ubuntu: [jammy]
+repositories:
+  foo:
+    release:
+      packages: [foo, foo_msgs]
+      tags:
+        release: release/humble/{package}/{version}
+      url: https://github.com/ros2-gbp/foo-release.git
+      version: 1.0.0-1
+'''
+CACHE = '''type: cache
+version: 2
+name: humble
+distribution_file:
+- type: distribution
+  version: 2
+  release_platforms:
+    ubuntu: [jammy]
+  repositories:
+    foo:
+      release:
+        packages: [foo]
+        tags:
+          release: release/humble/{{package}}/{{version}}
+        url: https://github.com/ros2-gbp/foo-release.git
+        version: {0}
+release_package_xmls: {{}}
+'''
+PACKAGE_XML = b'''<?xml version="1.0"?>
+<package format="3">
+  <name>foo</name>
+  <version>1.0.0</version>
+  <description>Foo</description>
+  <maintainer email="foo@example.com">Foo</maintainer>
+  <license>Apache License 2.0</license>
+  <depend>foo_msgs</depend>
+  <exec_depend>libyaml</exec_depend>
+</package>
+'''
+
+
+class _CacheHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    body = None
+    etag = None
+    requests = []
+
+    def do_GET(self):
+        _CacheHandler.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDistroSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _CacheHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        _CacheHandler.requests = []
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        distro_snapshot.set_snapshot_dir(None)
+
+    def _publish(self, version, etag):
+        _CacheHandler.body = gzip.compress(CACHE.format(version).encode())
+        _CacheHandler.etag = etag
+
+    def test_conditional_get(self):
+        """Test the cache is only downloaded and parsed when it changed"""
+        with TempfileManager(None) as tmp:
+            with open(os.path.join(tmp, 'index-v4.yaml'), 'w') as index:
+                index.write(INDEX.format(
+                    'http://127.0.0.1:%d' % self.server.server_port))
+            distro_snapshot.set_snapshot_dir(tmp)
+            path = os.path.join(tmp, 'distro-snapshots', 'humble.pickle')
+            with mock.patch.dict(os.environ, {
+                    'ROSDISTRO_INDEX_URL':
+                    'file://' + os.path.join(tmp, 'index-v4.yaml')}):
+                self._publish('1.0.0-1', '"v1"')
+                distro = get_distro('humble')
+                self.assertEqual(
+                    distro.repositories['foo'].release_repository.version,
+                    '1.0.0-1')
+                self.assertEqual(read_snapshot(path)['etag'], '"v1"')
+                # unchanged: not downloaded again
+                distro = get_distro('humble')
+                self.assertEqual(
+                    distro.repositories['foo'].release_repository.version,
+                    '1.0.0-1')
+                # same content under a new ETag: not parsed again
+                self._publish('1.0.0-1', '"v2"')
+                with mock.patch.object(
+                        distro_snapshot, '_parse_cache') as parse_cache:
+                    get_distro('humble')
+                    parse_cache.assert_not_called()
+                self.assertEqual(read_snapshot(path)['etag'], '"v2"')
+                self._publish('1.1.0-1', '"v3"')
+                distro = get_distro('humble')
+                self.assertEqual(
+                    distro.repositories['foo'].release_repository.version,
+                    '1.1.0-1')
+        self.assertEqual(_CacheHandler.requests,
+                         [None, '"v1"', '"v1"', '"v2"'])
+
+
+class TestLightDistro(unittest.TestCase):
+    def test_light_distro(self):
+        """Test loading only distribution.yaml and the needed package.xml"""
+        with TempfileManager(None) as tmp:
+            os.makedirs(os.path.join(tmp, 'humble'))
+            with open(os.path.join(tmp, 'index-v4.yaml'), 'w') as index:
+                index.write(INDEX.format('http://127.0.0.1:9'))
+            with open(os.path.join(tmp, 'humble', 'distribution.yaml'),
+                      'w') as distribution:
+                distribution.write(DISTRIBUTION)
+            package_xml_cache = PackageXmlCache()
+            package_xml_cache.set(
+                'https://github.com/ros2-gbp/foo-release.git',
+                'release/humble/foo/1.0.0-1', PACKAGE_XML)
+            with mock.patch.dict(os.environ, {
+                    'ROSDISTRO_INDEX_URL':
+                    'file://' + os.path.join(tmp, 'index-v4.yaml')}), \
+                    mock.patch.object(manifest_provider, 'package_xml_cache',
+                                      package_xml_cache):
+                distro = get_light_distro('humble')
+                self.assertEqual(sorted(distro.release_packages),
+                                 ['foo', 'foo_msgs'])
+                walker = DependencyWalker(distro)
+                self.assertEqual(walker.get_depends('foo', 'build'),
+                                 {'foo_msgs'})
+                self.assertEqual(walker.get_depends('foo', 'exec'),
+                                 {'foo_msgs', 'libyaml'})
@@ -0,0 +1,264 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import os
+import threading
+import time
+
+import requests
+from superflore.exceptions import HostUnavailable
+from superflore.fetcher import CircuitBreaker
+from superflore.fetcher import Fetcher
+from superflore.fetcher import parse_ref_advertisement
+from superflore.TempfileManager import TempfileManager
+from tests.git_server import GitServer
+from tests.git_server import make_repo
+import unittest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    active = 0
+    max_active = 0
+    throttled = 0
+    stalled = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path == '/trickle':
+            # 32 KiB at 4 KiB every 0.1s
+            self.send_response(200)
+            self.send_header('Content-Length', str(32 * 1024))
+            self.end_headers()
+            for _ in range(8):
+                self.wfile.write(b'x' * 4096)
+                self.wfile.flush()
+                time.sleep(0.1)
+            return
+        if self.path == '/stalled':
+            with _Handler.lock:
+                stall = _Handler.stalled > 0
+                _Handler.stalled -= 1
+            if stall:
+                time.sleep(1)
+        with _Handler.lock:
+            _Handler.active += 1
+            _Handler.max_active = max(_Handler.max_active, _Handler.active)
+        time.sleep(0.05)
+        with _Handler.lock:
+            _Handler.active -= 1
+        if self.path == '/missing':
+            body = b'not found'
+            self.send_response(404)
+        elif self.path == '/throttled' and _Handler.throttled:
+            _Handler.throttled -= 1
+            body = b'slow down'
+            self.send_response(429)
+            self.send_header('Retry-After', '0.1')
+        elif self.path == '/broken':
+            body = b'broken'
+            self.send_response(503)
+        else:
+            body = self.path.encode()
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFetcher(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.base = 'http://127.0.0.1:%d' % self.server.server_port
+        self.host = '127.0.0.1:%d' % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_get(self):
+        """Test fetching files and the per-host statistics"""
+        fetcher = Fetcher()
+        self.assertEqual(fetcher.get(self.base + '/a/package.xml'),
+                         b'/a/package.xml')
+        with self.assertRaises(requests.HTTPError):
+            fetcher.get(self.base + '/missing')
+        stats = fetcher.get_host_stats()[self.host]
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['failures'], 1)
+        self.assertGreater(stats['max_secs'], 0.0)
+
+    def test_sha256(self):
+        """Test the sha256 of a response read in chunks"""
+        fetcher = Fetcher()
+        self.assertEqual(fetcher.sha256(self.base + '/trickle'),
+                         hashlib.sha256(b'x' * 32 * 1024).hexdigest())
+        with self.assertRaises(requests.HTTPError):
+            fetcher.sha256(self.base + '/missing')
+
+    def test_per_host_limit(self):
+        """Test concurrent requests to a host are bounded"""
+        _Handler.max_active = 0
+        fetcher = Fetcher(max_per_host=2)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bodies = list(executor.map(
+                fetcher.get,
+                [self.base + '/%d' % i for i in range(8)]))
+        self.assertEqual(bodies, [('/%d' % i).encode() for i in range(8)])
+        self.assertLessEqual(_Handler.max_active, 2)
+        self.assertEqual(fetcher.get_host_stats()[self.host]['requests'], 8)
+
+    def test_circuit_breaker(self):
+        """Test a failing host is suspended, but not for missing files"""
+        fetcher = Fetcher(
+            circuit_breaker=CircuitBreaker(threshold=2, cooldown=0.2))
+        for _ in range(3):
+            with self.assertRaises(requests.HTTPError):
+                fetcher.get(self.base + '/missing')
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                fetcher.get(self.base + '/broken')
+        with self.assertRaises(HostUnavailable):
+            fetcher.get(self.base + '/a')
+        self.assertEqual(fetcher.get_host_stats()[self.host]['rejected'], 1)
+        # after the cooldown a single request is let through again
+        time.sleep(0.2)
+        with self.assertRaises(requests.HTTPError):
+            fetcher.get(self.base + '/broken')
+        with self.assertRaises(HostUnavailable):
+            fetcher.get(self.base + '/a')
+        time.sleep(0.2)
+        self.assertEqual(fetcher.get(self.base + '/a'), b'/a')
+        self.assertEqual(fetcher.get(self.base + '/a'), b'/a')
+
+    def test_half_open(self):
+        """Test a single probe request is let through after the cooldown"""
+        breaker = CircuitBreaker(threshold=2, cooldown=0.2)
+        for _ in range(2):
+            breaker.check('host')
+            breaker.record('host', True)
+        with self.assertRaises(HostUnavailable):
+            breaker.check('host')
+        time.sleep(0.2)
+        breaker.check('host')
+        # the other requests wait for the result of the probe
+        with self.assertRaises(HostUnavailable):
+            breaker.check('host')
+        breaker.record('host', False)
+        breaker.check('host')
+        breaker.check('host')
+        # a probe which is never recorded is replaced after the cooldown
+        for _ in range(2):
+            breaker.record('host', True)
+        time.sleep(0.2)
+        breaker.check('host')
+        with self.assertRaises(HostUnavailable):
+            breaker.check('host')
+        time.sleep(0.2)
+        breaker.check('host')
+
+    def test_rate_limited(self):
+        """Test rate limited requests lower the concurrency and are retried"""
+        fetcher = Fetcher(initial_per_host=4)
+        _Handler.throttled = 2
+        start = time.monotonic()
+        self.assertEqual(fetcher.get(self.base + '/throttled'), b'/throttled')
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        stats = fetcher.get_host_stats()[self.host]
+        self.assertEqual(stats['rate_limited'], 2)
+        self.assertEqual(stats['lowest_limit'], 1)
+        # gives up after rate_limit_retries
+        fetcher = Fetcher(rate_limit_retries=0)
+        _Handler.throttled = 1
+        with self.assertRaises(requests.HTTPError):
+            fetcher.get(self.base + '/throttled')
+
+    def test_timeout(self):
+        """Test a response taking too long in total is abandoned"""
+        fetcher = Fetcher(timeouts={'trickle': 0.3})
+        with self.assertRaises(requests.Timeout):
+            fetcher.get(self.base + '/trickle', op='trickle')
+        self.assertEqual(
+            len(Fetcher().get(self.base + '/trickle', op='trickle')),
+            32 * 1024)
+
+    def test_hedge(self):
+        """Test a slow request is hedged with a second one"""
+        fetcher = Fetcher(hedge=True)
+        for _ in range(20):
+            fetcher.get(self.base + '/a', op='test')
+        _Handler.stalled = 1
+        start = time.monotonic()
+        self.assertEqual(
+            fetcher.get(self.base + '/stalled', op='test'), b'/stalled')
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(fetcher.hedge_stats['test', 'hedged'], 1)
+        self.assertEqual(fetcher.hedge_stats['test', 'won'], 1)
+        self.assertEqual(fetcher.latency_stats.counts['test'], 21)
+
+
+class TestSmartHttp(unittest.TestCase):
+    def test_ls_remote(self):
+        """Test listing refs in-process gives the output of git"""
+        with TempfileManager(None) as tmp:
+            make_repo(os.path.join(tmp, 'foo-release.git'),
+                      ['release/humble/foo/1.0.0-1',
+                       'release/humble/foo/1.1.0-1'],
+                      annotated=['release/humble/foo/1.1.0-1'])
+            with GitServer(tmp) as server:
+                url = server.url + '/foo-release.git'
+                for refs in ((), ('--tags',),
+                             ('refs/tags/release/humble/foo/1.1.0-1',),
+                             ('--tags', '--refs', 'foo/*')):
+                    fetcher = Fetcher()
+                    self.assertEqual(
+                        fetcher.ls_remote(url, *refs),
+                        Fetcher(smart_http=False).ls_remote(url, *refs))
+                    self.assertFalse(fetcher.smart_http_failed)
+
+    def test_fallback(self):
+        """Test git is used when listing refs over HTTP fails"""
+        with TempfileManager(None) as tmp:
+            make_repo(os.path.join(tmp, 'git-only.git'), ['1.0.0'])
+            with GitServer(tmp) as server:
+                fetcher = Fetcher()
+                self.assertIn('\trefs/tags/1.0.0', fetcher.ls_remote(
+                    server.url + '/git-only.git', '--tags'))
+                self.assertEqual(len(fetcher.smart_http_failed), 1)
+
+    def test_parse(self):
+        """Test parsing a ref advertisement"""
+        commit = '48bf1aa1cb083a884fbc8520ced00523255aeaed'
+        def pkt_line(line):
+            return b'%04x' % (len(line) + 4) + line
+
+        self.assertEqual(parse_ref_advertisement(
+            pkt_line(b'# service=git-upload-pack\n') + b'0000' +
+            pkt_line(commit.encode() + b' refs/tags/1.0.0\0side-band\n') +
+            pkt_line(commit.encode() + b' refs/tags/1.0.0^{}\n') + b'0000'),
+            [(commit, 'refs/tags/1.0.0'), (commit, 'refs/tags/1.0.0^{}')])
+        for data in (b'', commit.encode() + b'\trefs/tags/1.0.0\n',
+                     b'001e# service=git-upload-pack\n0000003f'):
+            with self.assertRaises(ValueError):
+                parse_ref_advertisement(data)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import re
+import time
 
 from rosinstall_generator.distro import get_distro
 from superflore.exceptions import UnknownBuildType
@@ -51,6 +52,18 @@ def _create_if_p2os(overlay, pkg, distro, preserve_existing, collector):
     return True, True, pkg
 
 
+def _slow_if_p2os(overlay, pkg, distro, preserve_existing, collector):
+    """Finish the p2os packages last, and fail some of them"""
+    if 'p2os' in pkg:
+        time.sleep(0.1)
+        collector.append(pkg)
+        if 'msgs' in pkg:
+            return False, True, pkg
+        return True, False, pkg
+    collector.append(pkg)
+    return True, pkg, pkg
+
+
 def _raise_exceptions(overlay, pkg, distro, preserve_existing, collector):
     """Raise exceptions"""
     collector.append(pkg)
@@ -130,3 +143,19 @@ class TestGenerateInstallers(unittest.TestCase):
                 print(ret.groups())
                 self.assertIn('p2os', ret.group(0))
         self.assertTrue(found)
+
+    def test_parallel_generation(self):
+        """Tests generation on a worker pool matches a serial run"""
+        distro = get_distro('lunar')
+        serial_acc = list()
+        serial = generate_installers(
+            distro, None, _slow_if_p2os, True, serial_acc
+        )
+        parallel_acc = list()
+        parallel = generate_installers(
+            distro, None, _slow_if_p2os, True, parallel_acc, jobs=4
+        )
+        # every package was generated exactly once
+        self.assertEqual(sorted(serial_acc), sorted(parallel_acc))
+        # installers, broken packages and changes are identical
+        self.assertEqual(serial, parallel)
@@ -0,0 +1,160 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from superflore import manifest_provider
+from superflore.exceptions import NoPkgXml
+from superflore.manifest_provider import fetch_package_xml
+from superflore.manifest_provider import get_package_xml
+from superflore.manifest_provider import set_cache_dir
+from superflore.manifest_provider import set_manifest_provider
+from superflore.TempfileManager import TempfileManager
+import unittest
+from unittest import mock
+
+
+class _Repo:
+    url = 'https://github.com/ros-gbp/my_repo-release.git'
+    version = '1.2.3-1'
+    tags = {'release': 'release/lunar/{package}/{version}'}
+
+    def get_release_tag(self, pkg_name):
+        return 'release/lunar/{0}/{1}'.format(pkg_name, self.version)
+
+
+class _RosPackage:
+    def __init__(self, name, repo_url=None):
+        self.name = name
+        self.repository = _Repo()
+        if repo_url:
+            self.repository.url = repo_url
+
+
+class _Fetcher:
+    """Stands in for the HTTP fetcher, serving only the given URLs"""
+    def __init__(self, urls):
+        self.urls = urls
+        self.fetched = []
+
+    def get(self, url, op=None):
+        self.fetched.append(url)
+        if url not in self.urls:
+            raise OSError('404 for ' + url)
+        return b'<package>fetched</package>'
+
+
+RAW_URL = 'https://raw.github.com/ros-gbp/my_repo-release/'
+
+
+class _Distro:
+    name = 'lunar'
+
+    def __init__(self, package_xmls):
+        self.package_xmls = package_xmls
+
+    def get_release_package_xml(self, pkg_name):
+        return self.package_xmls.get(pkg_name)
+
+
+class TestManifestProvider(unittest.TestCase):
+    def setUp(self):
+        set_cache_dir(None)
+        manifest_provider.manifest_stats.clear()
+        self.fetcher = _Fetcher([
+            RAW_URL + 'release/lunar/my_pkg/1.2.3-1/package.xml',
+            RAW_URL + 'release/missing_pkg/1.2.3/package.xml',
+        ])
+        self.patcher = mock.patch.object(
+            manifest_provider, 'fetcher', self.fetcher)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        set_manifest_provider(manifest_provider.NETWORK)
+
+    def test_fetch(self):
+        """Test fetching package.xml files from GitHub"""
+        self.assertEqual(fetch_package_xml(_RosPackage('my_pkg'), 'lunar'),
+                         b'<package>fetched</package>')
+        # falls back to the legacy tag layout
+        self.assertEqual(
+            fetch_package_xml(_RosPackage('missing_pkg'), 'lunar'),
+            b'<package>fetched</package>')
+        self.assertEqual(len(self.fetcher.fetched), 3)
+        with self.assertRaises(RuntimeError):
+            fetch_package_xml(_RosPackage('other_pkg'), 'lunar')
+        with self.assertRaises(NoPkgXml):
+            fetch_package_xml(
+                _RosPackage('my_pkg', 'https://gitlab.com/my_repo.git'),
+                'lunar')
+
+    def test_network(self):
+        """Test fetched package.xml files are only fetched once"""
+        ros_pkg = _RosPackage('my_pkg')
+        distro = _Distro({'my_pkg': '<package>cached</package>'})
+        for _ in range(3):
+            self.assertEqual(get_package_xml(distro, ros_pkg),
+                             b'<package>fetched</package>')
+        self.assertEqual(len(self.fetcher.fetched), 1)
+        self.assertEqual(manifest_provider.manifest_stats['network'], 1)
+        self.assertEqual(
+            manifest_provider.manifest_stats['package.xml cache'], 2)
+
+    def test_negative_cache(self):
+        """Test unfetchable package.xml files are remembered across runs"""
+        ros_pkg = _RosPackage('my_pkg', 'https://gitlab.com/my_repo.git')
+        distro = _Distro({})
+        with TempfileManager(None) as cache_dir:
+            set_cache_dir(cache_dir)
+            with self.assertRaises(NoPkgXml):
+                get_package_xml(distro, ros_pkg, max_retries=0)
+            set_cache_dir(cache_dir)
+            with self.assertRaises(NoPkgXml) as cm:
+                get_package_xml(distro, ros_pkg, max_retries=0)
+            self.assertIn('non-GitHub', cm.exception.message)
+            self.assertEqual(
+                manifest_provider.manifest_stats['skipped as unfetchable'], 1)
+            self.assertEqual(
+                list(manifest_provider.negative_cache.skipped),
+                ['lunar/my_pkg/1.2.3-1'])
+            # expired entries are retried
+            set_cache_dir(cache_dir, negative_cache_ttl=0)
+            with self.assertRaises(NoPkgXml):
+                get_package_xml(distro, ros_pkg, max_retries=0)
+            self.assertEqual(
+                manifest_provider.manifest_stats['skipped as unfetchable'], 1)
+
+    def test_distribution_cache(self):
+        """Test package.xml files are served from the distribution cache"""
+        set_manifest_provider(manifest_provider.DISTRIBUTION_CACHE)
+        distro = _Distro({'my_pkg': '<package>cached</package>'})
+        ros_pkg = _RosPackage('my_pkg')
+        self.assertEqual(get_package_xml(distro, ros_pkg),
+                         b'<package>cached</package>')
+        self.assertEqual(self.fetcher.fetched, [])
+        # packages missing from the cache fall back to the network
+        missing_pkg = _RosPackage('missing_pkg')
+        self.assertEqual(get_package_xml(distro, missing_pkg),
+                         b'<package>fetched</package>')
+        self.assertEqual(len(self.fetcher.fetched), 2)
+        self.assertEqual(
+            manifest_provider.manifest_stats['distribution cache'], 1)
+        self.assertEqual(manifest_provider.manifest_stats['network'], 1)
+
+    def test_unknown_provider(self):
+        """Test an unknown provider is rejected"""
+        with self.assertRaises(ValueError):
+            set_manifest_provider('carrier-pigeon')
+        # the git mirrors are kept in the cache directory
+        with self.assertRaises(ValueError):
+            set_manifest_provider(manifest_provider.GIT_MIRROR)
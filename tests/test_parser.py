@@ -16,6 +16,7 @@ import sys
 
 from superflore.parser import get_parser
 import unittest
+from unittest import mock
 
 
 class TestParserSetup(unittest.TestCase):
@@ -35,3 +36,14 @@ class TestParserSetup(unittest.TestCase):
         self.assertIn('upstream_repo', ret)
         self.assertIn('upstream_branch', ret)
         self.assertIn('skip_keys', ret)
+        self.assertIn('jobs', ret)
+
+    def test_jobs(self):
+        """Tests --jobs only accepts positive numbers"""
+        with mock.patch.object(sys, 'argv', ['superflore']):
+            p = get_parser('test parser')
+        self.assertEqual(p.parse_args(['--jobs', '4']).jobs, 4)
+        for jobs in ('0', '-2', 'many'):
+            with mock.patch('sys.stderr'):
+                with self.assertRaises(SystemExit):
+                    p.parse_args(['--jobs', jobs])
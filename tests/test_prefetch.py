@@ -0,0 +1,173 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import requests
+from superflore import manifest_provider
+from superflore import prefetch
+from superflore import rosdep_support
+from superflore.exceptions import UnresolvedDependency
+from superflore.generators.bitbake import yocto_recipe
+from superflore.generators.bitbake.yocto_recipe import yoctoRecipe
+from superflore.manifest_provider import set_cache_dir
+from superflore.PackageXmlCache import PackageXmlCache
+from superflore.prefetch import prefetch_package_xmls
+from superflore.prefetch import prefetch_rosdep_resolutions
+from superflore.prefetch import prefetch_srcrevs
+from superflore.ResolutionCache import ResolutionCache
+from superflore.SqliteCache import SqliteCache
+from superflore.TempfileManager import TempfileManager
+from tests.test_CompactDistro import make_distro
+import unittest
+from unittest import mock
+
+URL = 'https://github.com/ros2-gbp/{0}-release.git'
+RAW_URL = 'https://raw.github.com/ros2-gbp/foo-release/' \
+    'release/humble/{0}/1.0.0-1/package.xml'
+SRCREVS = {
+    'release/humble/foo/1.0.0-1': '48bf1aa1cb083a884fbc8520ced00523255aeaed',
+    'release/humble/foo_msgs/1.0.0-1':
+        'a5be1e2c1f8d0b3e57d2c3c9a4f5e1b7c2d30e41',
+}
+
+
+class _Fetcher:
+    """Serves the package.xml files and tags of the foo repository only"""
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, op=None):
+        self.calls.append(url)
+        for pkg_name in ('foo', 'foo_msgs'):
+            if url == RAW_URL.format(pkg_name):
+                return ('<package>%s</package>' % pkg_name).encode()
+        response = requests.Response()
+        response.status_code = 404
+        raise requests.HTTPError('404 for ' + url, response=response)
+
+    def ls_remote(self, repo_url, *refs, **kwargs):
+        self.calls.append(repo_url)
+        if 'foo-release' not in repo_url:
+            return ''
+        return '\n'.join('{0}\trefs/tags/{1}'.format(srcrev, tag_name)
+                         for tag_name, srcrev in sorted(SRCREVS.items()))
+
+
+def _resolve(key, os_name, os_version, ros_distro, ignored):
+    if key == 'libmissing':
+        raise UnresolvedDependency(
+            'could not resolve package {} for os {}.'.format(key, os_name))
+    return ['%s@%s' % (key, os_name)], os_name, os_name
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.distro = make_distro({
+            'foo': ('1.0.0-1', {
+                'foo': '<depend>foo_msgs</depend>'
+                       '<exec_depend>libyaml</exec_depend>'
+                       '<exec_depend>libmissing</exec_depend>',
+                'foo_msgs': ''}),
+            'gone': ('2.0.0-1', {'gone': ''}),
+        })
+        self.pkg_names = ['foo', 'foo_msgs', 'gone']
+        self.fetcher = _Fetcher()
+        patchers = [
+            mock.patch.object(manifest_provider, 'fetcher', self.fetcher),
+            mock.patch.object(yocto_recipe, 'fetcher', self.fetcher),
+            mock.patch.object(prefetch, 'warn'),
+            mock.patch.dict(rosdep_support.resolutions, clear=True),
+            mock.patch.object(
+                rosdep_support, '_resolve_rosdep_key', _resolve),
+        ]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+            patcher.start()
+        self.warn = prefetch.warn
+        yoctoRecipe.srcrev_repos.clear()
+        self.addCleanup(yoctoRecipe.srcrev_repos.clear)
+        self.addCleanup(set_cache_dir, None)
+
+    def _warnings(self):
+        return [call[0][0] for call in self.warn.call_args_list]
+
+    def test_package_xmls(self):
+        """Test the package.xml files are cached, and failures reported"""
+        with TempfileManager(None) as cache_dir:
+            set_cache_dir(cache_dir)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                prefetch_package_xmls(self.distro, self.pkg_names, executor)
+            cache = PackageXmlCache(cache_dir)
+            self.assertEqual(
+                cache.get(URL.format('foo'), 'release/humble/foo/1.0.0-1'),
+                b'<package>foo</package>')
+            self.assertEqual(
+                cache.get(URL.format('foo'),
+                          'release/humble/foo_msgs/1.0.0-1'),
+                b'<package>foo_msgs</package>')
+            self.assertIsNone(
+                cache.get(URL.format('gone'), 'release/humble/gone/2.0.0-1'))
+        warnings = self._warnings()
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("package.xml files of 'gone'", warnings[0])
+
+    def test_srcrevs(self):
+        """Test the SRCREVs are cached, and missing tags reported"""
+        with TempfileManager(None) as tmp:
+            with SqliteCache(os.path.join(tmp, 'srcrev_cache.sqlite')) \
+                    as srcrev_cache:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    prefetch_srcrevs(self.distro, self.pkg_names,
+                                     srcrev_cache, executor)
+                self.assertEqual(sorted(srcrev_cache.values()),
+                                 sorted(SRCREVS.values()))
+        # a single git ls-remote per repository
+        self.assertEqual(sorted(self.fetcher.calls), [
+            'https://github.com/ros2-gbp/foo-release',
+            'https://github.com/ros2-gbp/gone-release'])
+        warnings = self._warnings()
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("SRCREV repositories of 'gone'", warnings[0])
+
+    def test_rosdep_resolutions(self):
+        """Test the rosdep resolutions are cached, unresolved ones too"""
+        with TempfileManager(None) as cache_dir:
+            cache = ResolutionCache(
+                os.path.join(cache_dir, 'rosdep-resolutions.json'), 'db1')
+            with mock.patch.object(
+                    rosdep_support, 'resolution_cache', cache):
+                prefetch_rosdep_resolutions(self.distro, self.pkg_names)
+            self.assertEqual(
+                cache.get('libyaml', 'openembedded', '', 'humble'),
+                {'resolution': [['libyaml@openembedded'], 'openembedded',
+                                'openembedded']})
+            self.assertIn('unresolved', cache.get(
+                'libmissing', 'openembedded', '', 'humble'))
+            self.assertIsNotNone(
+                cache.get('libyaml', 'gentoo', '2.4.0', 'indigo'))
+            # only the system dependencies are resolved
+            self.assertIsNone(
+                cache.get('foo_msgs', 'openembedded', '', 'humble'))
+        self.assertEqual(self._warnings(), [])
+
+    def test_rosdep_failure(self):
+        """Test a broken rosdep database is reported, not raised"""
+        with mock.patch.object(rosdep_support, '_resolve_rosdep_key',
+                               side_effect=OSError('no rosdep database')):
+            prefetch_rosdep_resolutions(self.distro, self.pkg_names)
+        warnings = self._warnings()
+        self.assertEqual(len(warnings), 1)
+        self.assertIn('no rosdep database', warnings[0])
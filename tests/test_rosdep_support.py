@@ -0,0 +1,90 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from rosdep2 import create_default_installer_context
+from superflore import rosdep_support
+from superflore.exceptions import UnresolvedDependency
+from superflore.rosdep_support import get_os_installer
+from superflore.rosdep_support import resolve_rosdep_key
+import unittest
+from unittest import mock
+
+
+class TestRosdepSupport(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        patchers = [
+            mock.patch.dict(rosdep_support.resolutions, clear=True),
+            mock.patch.dict(rosdep_support.os_installers, clear=True),
+            mock.patch.object(rosdep_support, 'resolution_cache', None),
+            mock.patch.object(
+                rosdep_support, '_resolve_rosdep_key', self._resolve),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _resolve(self, key, os_name, os_version, ros_distro, ignored):
+        with self.lock:
+            self.calls.append((key, os_name, os_version, ros_distro))
+        time.sleep(0.01)
+        if key == 'p2os_msgs':
+            raise UnresolvedDependency(
+                'could not resolve package p2os_msgs for os openembedded.')
+        return ['lib%s@meta-oe' % key], 'openembedded', 'openembedded'
+
+    def test_memoized(self):
+        """Test each key is resolved once, even from several threads"""
+        keys = ['tinyxml2', 'boost', 'p2os_msgs'] * 10
+        resolved = dict()
+        unresolved = set()
+
+        def resolve(key):
+            try:
+                resolved[key] = resolve_rosdep_key(
+                    key, 'openembedded', '', 'humble')
+            except UnresolvedDependency as e:
+                unresolved.add(e.message)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(resolve, keys))
+        self.assertEqual(sorted(self.calls), [
+            ('boost', 'openembedded', '', 'humble'),
+            ('p2os_msgs', 'openembedded', '', 'humble'),
+            ('tinyxml2', 'openembedded', '', 'humble')])
+        self.assertEqual(resolved['tinyxml2'][0], ['libtinyxml2@meta-oe'])
+        self.assertEqual(unresolved, {
+            'could not resolve package p2os_msgs for os openembedded.'})
+        # another distro is resolved again
+        resolve_rosdep_key('boost', 'openembedded', '', 'jazzy')
+        self.assertEqual(len(self.calls), 4)
+
+    def test_os_installer(self):
+        """Test a single installer context is created for each OS"""
+        with mock.patch.object(
+                rosdep_support, 'create_default_installer_context',
+                side_effect=create_default_installer_context) as create:
+            installer, installer_keys, default_key = \
+                get_os_installer('gentoo')
+            self.assertIn(default_key, installer_keys)
+            self.assertIs(get_os_installer('gentoo')[0], installer)
+            with self.assertRaises(KeyError):
+                get_os_installer('Windoughs8')
+            with self.assertRaises(KeyError):
+                get_os_installer('Windoughs8')
+        self.assertEqual(create.call_count, 2)
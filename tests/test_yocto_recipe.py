@@ -0,0 +1,195 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+
+from rosdistro.release_repository_specification import \
+    ReleaseRepositorySpecification
+from superflore.CacheStats import CacheStats
+from superflore.generators.bitbake import yocto_recipe
+from superflore.generators.bitbake.gen_packages import prefetch_checksums
+from superflore.generators.bitbake.gen_packages import prefetch_srcrevs
+from superflore.generators.bitbake.yocto_recipe import yoctoRecipe
+import unittest
+from unittest import mock
+
+REPO = 'github.com/ros2-gbp/ament_lint-release'
+TAGS = {
+    'release/humble/ament_lint/0.12.4-1':
+        '48bf1aa1cb083a884fbc8520ced00523255aeaed',
+    'release/humble/ament_copyright/0.12.4-1':
+        'a5be1e2c1f8d0b3e57d2c3c9a4f5e1b7c2d30e41',
+}
+
+
+class _Fetcher:
+    def __init__(self):
+        self.calls = []
+
+    def ls_remote(self, repo_url, *refs, **kwargs):
+        self.calls.append((repo_url,) + refs)
+        lines = []
+        for tag_name, srcrev in sorted(TAGS.items()):
+            lines.append('{0}\trefs/tags/{1}'.format(srcrev, tag_name))
+            lines.append('{0}\trefs/tags/{1}^{{}}'.format(
+                'f' * 40, tag_name))
+        return '\n'.join(lines)
+
+    def sha256(self, url, **kwargs):
+        self.calls.append((url,))
+        if 'bogus' in url:
+            raise RuntimeError('404 Client Error')
+        return hashlib.sha256(url.encode()).hexdigest()
+
+
+PACKAGE_XML = b'''<?xml version="1.0"?>
+<package format="3">
+  <name>ament_lint</name>
+  <version>0.12.4</version>
+  <description>Ament lint</description>
+  <maintainer email="foo@example.com">Foo</maintainer>
+  <license>Apache License 2.0</license>
+  <export><build_type>ament_python</build_type></export>
+</package>
+'''
+
+
+class _Distro:
+    """The release packages and repositories of a distribution"""
+    name = 'humble'
+
+    def __init__(self, packages):
+        self.release_packages = dict()
+        self.repositories = dict()
+        for repo_name, (version, pkg_names) in packages.items():
+            repo = ReleaseRepositorySpecification(repo_name, {
+                'url': 'https://%s.git' % REPO, 'version': version,
+                'tags': {'release': 'release/humble/{package}/{version}'},
+                'packages': pkg_names})
+            self.repositories[repo_name] = _Repository(repo)
+            for pkg_name in pkg_names:
+                self.release_packages[pkg_name] = _Package(repo_name)
+
+
+class _Repository:
+    def __init__(self, release_repository):
+        self.release_repository = release_repository
+
+
+class _Package:
+    def __init__(self, repository_name):
+        self.repository_name = repository_name
+
+
+class TestYoctoRecipe(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = _Fetcher()
+        self.patcher = mock.patch.object(
+            yocto_recipe, 'fetcher', self.fetcher)
+        self.patcher.start()
+        yoctoRecipe.srcrev_repos.discard(REPO)
+
+    def tearDown(self):
+        self.patcher.stop()
+        yoctoRecipe.srcrev_repos.discard(REPO)
+
+    def test_fetch_srcrevs(self):
+        """Test looking up several tags with one git ls-remote"""
+        srcrevs = yoctoRecipe.fetch_srcrevs(
+            REPO, list(TAGS) + ['release/humble/bogus/1.0.0-1'])
+        self.assertEqual(srcrevs, TAGS)
+        self.assertEqual(self.fetcher.calls, [('https://' + REPO, '--tags')])
+
+    def test_fill_srcrev_cache(self):
+        """Test a repository is looked up once for all its packages"""
+        tag_names = {'https://%s/archive/%s.tar.gz' % (REPO, tag_name):
+                     tag_name for tag_name in TAGS}
+        srcrev_cache = dict()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(
+                lambda _: yoctoRecipe.fill_srcrev_cache(
+                    srcrev_cache, REPO, tag_names), range(8)))
+        self.assertEqual(len(self.fetcher.calls), 1)
+        self.assertEqual(
+            srcrev_cache,
+            {src_uri: TAGS[tag_name]
+             for src_uri, tag_name in tag_names.items()})
+
+    def test_fill_srcrev_cache_missing(self):
+        """Test a missing tag is left to count as a miss when looked up"""
+        tag_names = {'https://%s/archive/%s.tar.gz' % (REPO, tag_name):
+                     tag_name for tag_name in TAGS}
+        tag_names['bogus.tar.gz'] = 'release/humble/bogus/1.0.0-1'
+        stats = CacheStats()
+        with mock.patch.object(yocto_recipe, 'cache_stats', stats):
+            missing = yoctoRecipe.fill_srcrev_cache(
+                dict(), REPO, tag_names)
+        self.assertEqual(missing, ['release/humble/bogus/1.0.0-1'])
+        self.assertEqual(stats.get_summary()['SRCREV']['misses'], 2)
+
+    def test_prefetch_srcrevs(self):
+        """Test the SRCREVs are looked up and the failures reported"""
+        distro = _Distro({'ament_lint': (
+            '0.12.4-1', ['ament_lint', 'ament_copyright', 'ament_bogus'])})
+        srcrev_cache = dict()
+        failed = prefetch_srcrevs(
+            distro, ['ament_lint', 'ament_copyright'], srcrev_cache, jobs=2)
+        self.assertEqual(failed, 1)
+        self.assertEqual(len(self.fetcher.calls), 1)
+        self.assertEqual(sorted(srcrev_cache.values()), sorted(TAGS.values()))
+
+    def _get_recipe_text(self):
+        src_uri = 'https://%s/archive/release/humble/ament_lint/' \
+            '0.12.4-1.tar.gz' % REPO
+        distro = _Distro({'ament_lint': ('0.12.4-1', ['ament_lint'])})
+        with mock.patch.object(
+                yocto_recipe, 'get_distros',
+                return_value={'humble': {'distribution_type': 'ros2'}}):
+            recipe = yoctoRecipe(
+                'ament_lint', 1, 'ament_lint', PACKAGE_XML, distro, src_uri,
+                {src_uri: TAGS['release/humble/ament_lint/0.12.4-1']}, [])
+            return src_uri, recipe.get_recipe_text('Open Robotics')
+
+    def test_recipe_sha256(self):
+        """Test the recipe has the sha256 of its archive when cached"""
+        src_uri, text = self._get_recipe_text()
+        self.assertIn('# matches with: ' + src_uri + '\n', text)
+        self.assertNotIn('# sha256sum:', text)
+        yoctoRecipe.checksum_cache = dict()
+        try:
+            src_uri, text = self._get_recipe_text()
+        finally:
+            yoctoRecipe.checksum_cache = None
+        self.assertIn(
+            '# matches with: {0}\n# sha256sum: {1}\n'.format(
+                src_uri, hashlib.sha256(src_uri.encode()).hexdigest()),
+            text)
+
+    def test_prefetch_checksums(self):
+        """Test the sha256 of the release archives are computed once"""
+        distro = _Distro({'ament_lint': (
+            '0.12.4-1', ['ament_lint', 'ament_copyright', 'ament_bogus'])})
+        yoctoRecipe.checksum_cache = dict()
+        try:
+            failed = prefetch_checksums(
+                distro, ['ament_lint', 'ament_copyright', 'ament_bogus'],
+                jobs=2)
+            self.assertEqual(failed, 1)
+            self.assertEqual(len(yoctoRecipe.checksum_cache), 2)
+            for src_uri, sha256 in yoctoRecipe.checksum_cache.items():
+                self.assertEqual(yoctoRecipe.get_sha256(src_uri), sha256)
+            self.assertEqual(len(self.fetcher.calls), 3)
+        finally:
+            yoctoRecipe.checksum_cache = None